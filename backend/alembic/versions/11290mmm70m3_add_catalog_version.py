@@ -0,0 +1,58 @@
+"""Add catalog version counter with change notifications
+
+Revision ID: 11290mmm70m3
+Revises: 10189lll60l2
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '11290mmm70m3'
+down_revision = '10189lll60l2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Single-row counter that every catalog write bumps
+    op.create_table(
+        "catalog_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="1"),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO catalog_version (id, version) VALUES (1, 1)")
+
+    # Bump the version and notify listening workers once per write statement
+    # (NOTIFY is delivered when the writing transaction commits)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        DECLARE
+            new_version BIGINT;
+        BEGIN
+            UPDATE catalog_version
+            SET version = version + 1, updated_at = now()
+            WHERE id = 1
+            RETURNING version INTO new_version;
+            PERFORM pg_notify('catalog_changed', new_version::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for table in ("memberships", "benefits"):
+        op.execute(f"""
+            CREATE TRIGGER {table}_catalog_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+        """)
+
+
+def downgrade() -> None:
+    for table in ("memberships", "benefits"):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_catalog_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_catalog_version()")
+    op.drop_table("catalog_version")
@@ -0,0 +1,50 @@
+"""Add daily analytics rollup tables
+
+Revision ID: 12301nnn80n4
+Revises: 11290mmm70m3
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '12301nnn80n4'
+down_revision = '11290mmm70m3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_daily_counts",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("event_name", sa.String(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("events", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "event_name", "source"),
+    )
+    op.create_table(
+        "analytics_daily_users",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("users_hll", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.create_table(
+        "affiliate_click_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("item_type", sa.String(), nullable=False),
+        sa.Column("item_id", sa.String(), nullable=False),
+        sa.Column("item_name", sa.String(), nullable=True),
+        sa.Column("clicks", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("users_hll", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "item_type", "item_id"),
+    )
+    # Historical rows are filled by scripts/backfill_analytics_rollups.py
+
+
+def downgrade() -> None:
+    op.drop_table("affiliate_click_daily")
+    op.drop_table("analytics_daily_users")
+    op.drop_table("analytics_daily_counts")
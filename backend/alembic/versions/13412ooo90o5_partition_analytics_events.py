@@ -0,0 +1,157 @@
+"""Partition analytics_events by month
+
+Revision ID: 13412ooo90o5
+Revises: 12301nnn80n4
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '13412ooo90o5'
+down_revision = '12301nnn80n4'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = "id, event_name, user_id, source, created_at, payload"
+
+LEGACY_INDEXES = (
+    "ix_analytics_events_id",
+    "ix_analytics_events_event_name",
+    "ix_analytics_events_user_id",
+    "ix_analytics_events_created_at",
+    "idx_events_name_date",
+    "idx_events_user_date",
+)
+
+
+def upgrade() -> None:
+    # Keep the old table (and its id sequence) aside while the data is copied
+    op.execute("ALTER TABLE analytics_events RENAME TO analytics_events_legacy")
+    op.execute(
+        "ALTER TABLE analytics_events_legacy "
+        "RENAME CONSTRAINT analytics_events_pkey TO analytics_events_legacy_pkey"
+    )
+    for index in LEGACY_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY NONE")
+
+    # The partition key must be part of the primary key. The single-column
+    # event_name/user_id/created_at indexes are dropped: the composite indexes
+    # cover the same lookups and partition pruning replaces the created_at index.
+    op.execute("""
+        CREATE TABLE analytics_events (
+            id INTEGER NOT NULL DEFAULT nextval('analytics_events_id_seq'),
+            event_name VARCHAR NOT NULL,
+            user_id INTEGER,
+            source VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            payload JSONB,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY analytics_events.id")
+    op.execute("CREATE INDEX idx_events_name_date ON analytics_events (event_name, created_at)")
+    op.execute("CREATE INDEX idx_events_user_date ON analytics_events (user_id, created_at)")
+
+    # Catches events outside every monthly partition (e.g. skewed clocks)
+    op.execute("CREATE TABLE analytics_events_default PARTITION OF analytics_events DEFAULT")
+
+    # Create (idempotently) the partition for the month containing month_start.
+    # Rows that already landed in the default partition for that month are
+    # moved into the new partition before it is attached.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_analytics_partition(month_start DATE) RETURNS TEXT AS $$
+        DECLARE
+            start_ts TIMESTAMP := date_trunc('month', month_start);
+            end_ts TIMESTAMP := date_trunc('month', month_start) + INTERVAL '1 month';
+            part TEXT := 'analytics_events_y' || to_char(month_start, 'YYYY')
+                         || 'm' || to_char(month_start, 'MM');
+        BEGIN
+            PERFORM pg_advisory_xact_lock(hashtext('analytics_events_partitions'));
+            IF to_regclass(part) IS NOT NULL THEN
+                RETURN part;
+            END IF;
+
+            IF EXISTS (
+                SELECT 1 FROM analytics_events_default
+                WHERE created_at >= start_ts AND created_at < end_ts
+            ) THEN
+                EXECUTE format('CREATE TABLE %I (LIKE analytics_events INCLUDING DEFAULTS)', part);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM analytics_events_default '
+                    'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    start_ts, end_ts, part
+                );
+                EXECUTE format(
+                    'ALTER TABLE analytics_events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    part, start_ts, end_ts
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF analytics_events FOR VALUES FROM (%L) TO (%L)',
+                    part, start_ts, end_ts
+                );
+            END IF;
+            RETURN part;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Partitions for all existing data plus the next two months
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start DATE;
+        BEGIN
+            month_start := date_trunc(
+                'month', COALESCE((SELECT min(created_at) FROM analytics_events_legacy), now())
+            );
+            WHILE month_start <= date_trunc('month', now()) + INTERVAL '2 months' LOOP
+                PERFORM create_analytics_partition(month_start);
+                month_start := month_start + INTERVAL '1 month';
+            END LOOP;
+        END;
+        $$;
+    """)
+
+    op.execute(
+        f"INSERT INTO analytics_events ({COLUMNS}) SELECT {COLUMNS} FROM analytics_events_legacy"
+    )
+    op.execute("DROP TABLE analytics_events_legacy")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE analytics_events RENAME TO analytics_events_partitioned")
+    for index in ("idx_events_name_date", "idx_events_user_date"):
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_partitioned")
+
+    op.execute("""
+        CREATE TABLE analytics_events (
+            id INTEGER NOT NULL DEFAULT nextval('analytics_events_id_seq'),
+            event_name VARCHAR NOT NULL,
+            user_id INTEGER,
+            source VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            payload JSONB,
+            CONSTRAINT analytics_events_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("ALTER SEQUENCE analytics_events_id_seq OWNED BY analytics_events.id")
+    op.execute(
+        f"INSERT INTO analytics_events ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM analytics_events_partitioned"
+    )
+    op.execute("DROP TABLE analytics_events_partitioned CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS create_analytics_partition(DATE)")
+
+    op.create_index("ix_analytics_events_id", "analytics_events", ["id"])
+    op.create_index("ix_analytics_events_event_name", "analytics_events", ["event_name"])
+    op.create_index("ix_analytics_events_user_id", "analytics_events", ["user_id"])
+    op.create_index("ix_analytics_events_created_at", "analytics_events", ["created_at"])
+    op.create_index("idx_events_name_date", "analytics_events", ["event_name", "created_at"])
+    op.create_index("idx_events_user_date", "analytics_events", ["user_id", "created_at"])
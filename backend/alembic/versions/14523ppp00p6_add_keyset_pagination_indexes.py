@@ -0,0 +1,27 @@
+"""Add indexes backing keyset pagination
+
+Revision ID: 14523ppp00p6
+Revises: 13412ooo90o5
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '14523ppp00p6'
+down_revision = '13412ooo90o5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Admin user list pages by (created_at, id) descending
+    op.create_index("idx_users_created_id", "users", ["created_at", "id"])
+    # Benefit lists filtered by membership page by id
+    op.create_index("idx_benefits_membership_id", "benefits", ["membership_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_benefits_membership_id", table_name="benefits")
+    op.drop_index("idx_users_created_id", table_name="users")
@@ -0,0 +1,52 @@
+"""Add statement_jobs table
+
+Revision ID: 15634qqq10q7
+Revises: 14523ppp00p6
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '15634qqq10q7'
+down_revision = '14523ppp00p6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'statement_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('stage', sa.String(), nullable=False, server_default='queued'),
+        sa.Column('subscriptions_total', sa.Integer(), nullable=True),
+        sa.Column(
+            'results',
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'[]'::jsonb"),
+        ),
+        sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    # Listing a user's recent jobs
+    op.create_index('idx_statement_jobs_user_created', 'statement_jobs', ['user_id', 'created_at'])
+    # Finding stale queued/running jobs after a restart
+    op.create_index('idx_statement_jobs_status_updated', 'statement_jobs', ['status', 'updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_statement_jobs_status_updated', table_name='statement_jobs')
+    op.drop_index('idx_statement_jobs_user_created', table_name='statement_jobs')
+    op.drop_table('statement_jobs')
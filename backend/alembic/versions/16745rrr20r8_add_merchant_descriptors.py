@@ -0,0 +1,38 @@
+"""Add merchant_descriptors table
+
+Revision ID: 16745rrr20r8
+Revises: 15634qqq10q7
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '16745rrr20r8'
+down_revision = '15634qqq10q7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'merchant_descriptors',
+        sa.Column('descriptor', sa.String(), nullable=False),
+        sa.Column('membership_id', sa.Integer(), nullable=False),
+        sa.Column('frequency', sa.String(), nullable=True),
+        sa.Column('confirmations', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['membership_id'], ['memberships.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('descriptor'),
+    )
+    op.create_index(
+        'ix_merchant_descriptors_membership_id', 'merchant_descriptors', ['membership_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_merchant_descriptors_membership_id', table_name='merchant_descriptors')
+    op.drop_table('merchant_descriptors')
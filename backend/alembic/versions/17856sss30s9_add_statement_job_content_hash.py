@@ -0,0 +1,38 @@
+"""Add content_hash to statement_jobs
+
+Revision ID: 17856sss30s9
+Revises: 16745rrr20r8
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '17856sss30s9'
+down_revision = '16745rrr20r8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('statement_jobs', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index(
+        'idx_statement_jobs_user_hash',
+        'statement_jobs',
+        ['user_id', 'content_hash', 'created_at'],
+    )
+    op.create_index(
+        'uq_statement_jobs_user_hash_active',
+        'statement_jobs',
+        ['user_id', 'content_hash'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_statement_jobs_user_hash_active', table_name='statement_jobs')
+    op.drop_index('idx_statement_jobs_user_hash', table_name='statement_jobs')
+    op.drop_column('statement_jobs', 'content_hash')
@@ -0,0 +1,68 @@
+"""Use a sequence for the catalog version
+
+The catalog_version row update serialized every memberships/benefits writer
+on one row lock until commit. nextval() takes no lock and is not rolled back,
+so concurrent writers (bulk imports, discovery) no longer wait on each other.
+
+Revision ID: 18967ttt40t0
+Revises: 17856sss30s9
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '18967ttt40t0'
+down_revision = '17856sss30s9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE catalog_version_seq")
+    op.execute(
+        "SELECT setval('catalog_version_seq', "
+        "COALESCE((SELECT version FROM catalog_version WHERE id = 1), 1))"
+    )
+    # An empty payload lets Postgres fold the notifications of one transaction
+    # into a single one, delivered on commit
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM nextval('catalog_version_seq');
+            PERFORM pg_notify('catalog_changed', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP TABLE catalog_version")
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE TABLE catalog_version (
+            id INTEGER PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 1,
+            updated_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute(
+        "INSERT INTO catalog_version (id, version) "
+        "SELECT 1, last_value FROM catalog_version_seq"
+    )
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+        DECLARE
+            new_version BIGINT;
+        BEGIN
+            UPDATE catalog_version
+            SET version = version + 1, updated_at = now()
+            WHERE id = 1
+            RETURNING version INTO new_version;
+            PERFORM pg_notify('catalog_changed', new_version::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("DROP SEQUENCE catalog_version_seq")
@@ -2,21 +2,60 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy import func, or_
 
 from app.core.db import get_db
-from app.core.auth import get_current_user, require_role
-from app.models import User, Benefit, Membership, UserMembership, AnalyticsEvent
+from app.core.auth import get_current_user, invalidate_principal, require_role
+from app.core.pagination import keyset_page, parse_fields
+from app.models import User, Benefit, Membership, UserMembership
 from app.schemas import UserRead, AdminUserUpdate, UserListResponse
 from app.services.benefit_discovery_cron import discover_benefits_for_memberships_without_benefits
-from app.services.membership_tiers import get_plan_tier
+from app.services.user_benefits import count_user_benefits, load_user_benefit_graph
+from app.services.catalog import get_catalog
+from app.services.catalog_import import approve_pending_benefits, import_catalog, iter_catalog_records
+from app.services.analytics_rollups import read_affiliate_report, read_overview, window_start
 from app.data.uk_memberships import UK_MEMBERSHIPS
-import json
 from pathlib import Path
 from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
+# Fields selectable with `fields=` on the list endpoints (default: all)
+USER_LIST_FIELDS = (
+    "id",
+    "email",
+    "role",
+    "is_active",
+    "created_at",
+    "memberships_count",
+    "benefits_count",
+)
+USER_COUNT_FIELDS = ("memberships_count", "benefits_count")
+MEMBERSHIP_LIST_FIELDS = (
+    "id",
+    "name",
+    "provider_name",
+    "plan_name",
+    "affiliate_id",
+    "affiliate_url",
+    "commission_type",
+    "partner_name",
+    "commission_notes",
+)
+BENEFIT_LIST_FIELDS = (
+    "id",
+    "title",
+    "membership_id",
+    "membership_name",
+    "vendor_name",
+    "category",
+    "affiliate_id",
+    "affiliate_url",
+    "commission_type",
+    "partner_name",
+    "commission_notes",
+)
+
 
 @router.get("/stats")
 def get_admin_stats(
@@ -65,21 +104,31 @@ def get_admin_stats(
     dependencies=[Depends(require_role("admin"))],
 )
 def list_users(
-    page: int = Query(1, ge=1),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
     page_size: int = Query(20, ge=1, le=100),
+    fields: str | None = Query(
+        None, description=f"Comma-separated subset of: {', '.join(USER_LIST_FIELDS)}"
+    ),
     search: str | None = Query(None),
     role: str | None = Query(None),
     is_active: bool | None = Query(None),
+    include_total: bool = Query(False, description="Also count all matching users"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List all users with counts (admin only). Supports pagination, search, and filtering."""
-    query = db.query(User)
+    """
+    List users with counts (admin only), newest first.
+
+    Keyset paginated: pass the returned next_cursor to get the following page.
+    Supports search, filtering and a `fields` projection.
+    """
+    selected = parse_fields(fields, USER_LIST_FIELDS)
+    filters = []
 
     # Apply search filter
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        filters.append(
             or_(
                 User.email.ilike(search_term),
             )
@@ -87,58 +136,49 @@ def list_users(
 
     # Apply role filter
     if role:
-        query = query.filter(User.role == role)
+        filters.append(User.role == role)
 
     # Apply active status filter
     if is_active is not None:
-        query = query.filter(User.is_active == is_active)
-
-    # Get total count
-    total = query.count()
+        filters.append(User.is_active == is_active)
+
+    columns = [f for f in selected if f not in USER_COUNT_FIELDS]
+    users, next_cursor = keyset_page(
+        db,
+        User,
+        fields=list(dict.fromkeys(["id", *columns])),
+        key=["created_at", "id"],
+        filters=filters,
+        cursor=cursor,
+        limit=page_size,
+        descending=True,
+    )
 
-    # Apply pagination
-    offset = (page - 1) * page_size
-    users = query.order_by(User.created_at.desc()).offset(offset).limit(page_size).all()
+    # Get membership/benefit counts for the whole page in one query (only if requested)
+    counts = {}
+    if any(f in USER_COUNT_FIELDS for f in selected):
+        counts = count_user_benefits(db, [user["id"] for user in users])
 
-    # Get counts for each user
     users_with_counts = []
     for user in users:
-        # Get membership count
-        memberships_count = (
-            db.query(UserMembership).filter(UserMembership.user_id == user.id).count()
-        )
-
-        # Get benefits count (approved benefits from user's memberships)
-        membership_ids_query = db.query(UserMembership.membership_id).filter(
-            UserMembership.user_id == user.id
-        )
-        benefits_count = (
-            db.query(Benefit)
-            .filter(
-                Benefit.membership_id.in_(membership_ids_query),
-                Benefit.validation_status == "approved",
-            )
-            .count()
-        )
-
-        users_with_counts.append(
-            {
-                "id": user.id,
-                "email": user.email,
-                "role": user.role,
-                "is_active": user.is_active,
-                "created_at": user.created_at.isoformat() if user.created_at else None,
-                "memberships_count": memberships_count,
-                "benefits_count": benefits_count,
-            }
-        )
+        memberships_count, benefits_count = counts.get(user["id"], (0, 0))
+        values = {
+            **user,
+            "memberships_count": memberships_count,
+            "benefits_count": benefits_count,
+        }
+        if values.get("created_at"):
+            values["created_at"] = values["created_at"].isoformat()
+        users_with_counts.append({f: values[f] for f in selected})
 
-    return {
+    response = {
         "users": users_with_counts,
-        "total": total,
-        "page": page,
+        "next_cursor": next_cursor,
         "page_size": page_size,
     }
+    if include_total:
+        response["total"] = db.query(func.count(User.id)).filter(*filters).scalar()
+    return response
 
 
 @router.get(
@@ -159,30 +199,12 @@ def get_user(
         )
 
     # Get user memberships with benefits
-    user_memberships = (
-        db.query(UserMembership, Membership)
-        .join(Membership, UserMembership.membership_id == Membership.id)
-        .filter(UserMembership.user_id == user_id)
-        .all()
-    )
+    graph = load_user_benefit_graph(db, user_id)
 
     # Build memberships with their benefits
     memberships_with_benefits = []
-    total_benefits = 0
-
-    for um, membership in user_memberships:
-        # Get benefits for this membership
-        benefits = (
-            db.query(Benefit)
-            .filter(
-                Benefit.membership_id == membership.id,
-                Benefit.validation_status == "approved",
-            )
-            .all()
-        )
-
-        total_benefits += len(benefits)
-
+    for membership in graph.memberships:
+        benefits = graph.benefits_by_membership[membership.id]
         memberships_with_benefits.append(
             {
                 "id": membership.id,
@@ -190,8 +212,7 @@ def get_user(
                 "provider_name": membership.provider_name,
                 "plan_name": membership.plan_name,
                 "provider_slug": membership.provider_slug,
-                "plan_slug": membership.plan_slug,
-                "added_at": um.created_at.isoformat() if um.created_at else None,
+                "added_at": None,  # user_memberships has no timestamp column
                 "benefits": [
                     {
                         "id": benefit.id,
@@ -214,8 +235,8 @@ def get_user(
         "is_active": user.is_active,
         "created_at": user.created_at.isoformat() if user.created_at else None,
         "memberships": memberships_with_benefits,
-        "memberships_count": len(user_memberships),
-        "benefits_count": total_benefits,
+        "memberships_count": len(graph.memberships),
+        "benefits_count": graph.benefits_count,
     }
 
 
@@ -253,6 +274,7 @@ def update_user(
 
     db.commit()
     db.refresh(user)
+    invalidate_principal(user.id)
 
     return user
 
@@ -263,16 +285,7 @@ def approve_all_benefits(
     current_user: User = Depends(get_current_user),
 ):
     """Approve all pending benefits (temporary dev endpoint)."""
-    pending_benefits = (
-        db.query(Benefit).filter(Benefit.validation_status != "approved").all()
-    )
-
-    count = len(pending_benefits)
-
-    for benefit in pending_benefits:
-        benefit.validation_status = "approved"
-
-    db.commit()
+    count = approve_pending_benefits(db)
 
     return {"message": f"Approved {count} benefits", "count": count}
 
@@ -288,146 +301,46 @@ def seed_benefits(
     if not seed_file.exists():
         raise HTTPException(status_code=404, detail="Seed file not found")
 
-    with open(seed_file, "r") as f:
-        seed_data = json.load(f)
-
-    added_count = 0
-    updated_count = 0
-
-    for membership_data in seed_data.get("memberships", []):
-        # Find membership by slug
-        membership = (
-            db.query(Membership)
-            .filter(Membership.provider_slug == membership_data["provider_slug"])
-            .first()
-        )
-
-        if not membership:
-            continue  # Skip if membership doesn't exist
-
-        # Add benefits
-        for benefit_data in membership_data.get("benefits", []):
-            # Check if benefit already exists
-            existing = (
-                db.query(Benefit)
-                .filter(
-                    Benefit.membership_id == membership.id,
-                    Benefit.title == benefit_data["title"],
-                )
-                .first()
-            )
-
-            if existing:
-                # Update existing
-                existing.description = benefit_data.get("description")
-                existing.category = benefit_data.get("category")
-                existing.vendor_domain = benefit_data.get("vendor_domain")
-                existing.validation_status = "approved"
-                updated_count += 1
-            else:
-                # Create new
-                new_benefit = Benefit(
-                    membership_id=membership.id,
-                    title=benefit_data["title"],
-                    description=benefit_data.get("description"),
-                    category=benefit_data.get("category"),
-                    vendor_domain=benefit_data.get("vendor_domain"),
-                    source_url=benefit_data.get("source_url"),
-                    validation_status="approved",
-                )
-                db.add(new_benefit)
-                added_count += 1
-
-    db.commit()
+    # Only benefits of memberships that already exist are loaded; the
+    # membership rows themselves are left untouched
+    summary = import_catalog(
+        db,
+        iter_catalog_records(seed_file),
+        create_memberships=False,
+        update_memberships=False,
+    )
 
     return {
-        "message": f"Loaded seed data: {added_count} new, {updated_count} updated",
-        "added": added_count,
-        "updated": updated_count,
+        "message": f"Loaded seed data: {summary.benefits_added} new, {summary.benefits_updated} updated",
+        "added": summary.benefits_added,
+        "updated": summary.benefits_updated,
+        "summary": summary.to_dict(),
     }
 
 
 @router.post("/seed-uk-memberships")
 def seed_uk_memberships(
+    dry_run: bool = Query(False, description="Only report what would change"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("admin")),
 ):
     """Seed common UK memberships and their benefits into the catalog (admin only)."""
-    added_memberships = 0
-    added_benefits = 0
-
-    for membership_data in UK_MEMBERSHIPS:
-        # Check if membership already exists
-        existing = (
-            db.query(Membership)
-            .filter(Membership.provider_slug == membership_data["provider_slug"])
-            .first()
-        )
-
-        if existing:
-            # Skip existing memberships - do not add or update
-            continue
-
-        # Create new membership only if it doesn't exist
-        plan_tier = get_plan_tier(
-            membership_data.get("provider_name", ""),
-            membership_data.get("plan_name", "")
-        )
-        membership = Membership(
-            name=membership_data["name"],
-            provider_slug=membership_data["provider_slug"],
-            provider_name=membership_data.get("provider_name"),
-            plan_name=membership_data.get("plan_name"),
-            plan_tier=plan_tier,
-            is_catalog=True,  # Mark as catalog item
-            status="active",  # Set as active
-        )
-        db.add(membership)
-        db.flush()  # Get the ID
-        added_memberships += 1
-
-        # Process benefits if provided
-        benefits = membership_data.get("benefits", [])
-        for benefit_data in benefits:
-            # Check if benefit already exists
-            existing_benefit = (
-                db.query(Benefit)
-                .filter(
-                    Benefit.membership_id == membership.id,
-                    Benefit.title == benefit_data["title"]
-                )
-                .first()
-            )
-
-            if existing_benefit:
-                # Skip existing benefits - do not add or update
-                continue
-
-            # Create new benefit only if it doesn't exist
-            new_benefit = Benefit(
-                membership_id=membership.id,
-                title=benefit_data["title"],
-                description=benefit_data.get("description"),
-                vendor_domain=benefit_data.get("vendor_domain"),
-                category=benefit_data.get("category"),
-                source_url=benefit_data.get("source_url"),
-                validation_status="approved",  # Auto-approve seeded benefits
-            )
-            db.add(new_benefit)
-            added_benefits += 1
-
-    db.commit()
+    # Existing memberships are skipped entirely - not added to or updated
+    summary = import_catalog(db, UK_MEMBERSHIPS, update_existing=False, dry_run=dry_run)
+    added_memberships = summary.memberships_added
+    added_benefits = summary.benefits_added
 
     return {
         "message": f"Seeded UK memberships: {added_memberships} added (skipped existing). Benefits: {added_benefits} added (skipped existing).",
         "memberships": {
             "added": added_memberships,
-            "skipped": len(UK_MEMBERSHIPS) - added_memberships,
+            "skipped": summary.memberships_skipped,
             "total": len(UK_MEMBERSHIPS),
         },
         "benefits": {
             "added": added_benefits,
         },
+        "dry_run": dry_run,
     }
 
 
@@ -441,19 +354,24 @@ def seed_uk_memberships(
     dependencies=[Depends(require_role("admin"))],
 )
 def list_memberships(
-    page: int = Query(1, ge=1),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
     page_size: int = Query(50, ge=1, le=100),
+    fields: str | None = Query(
+        None, description=f"Comma-separated subset of: {', '.join(MEMBERSHIP_LIST_FIELDS)}"
+    ),
     search: str | None = Query(None),
     has_affiliate: bool | None = Query(None),
+    include_total: bool = Query(False, description="Also count all matching memberships"),
     db: Session = Depends(get_db),
 ):
-    """List all memberships with affiliate info (admin only)."""
-    query = db.query(Membership)
+    """List all memberships with affiliate info (admin only), keyset paginated by id."""
+    selected = parse_fields(fields, MEMBERSHIP_LIST_FIELDS)
+    filters = []
 
     # Search filter
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        filters.append(
             or_(
                 Membership.name.ilike(search_term),
                 Membership.provider_name.ilike(search_term),
@@ -462,33 +380,28 @@ def list_memberships(
 
     # Affiliate filter
     if has_affiliate is True:
-        query = query.filter(Membership.affiliate_id.isnot(None))
+        filters.append(Membership.affiliate_id.isnot(None))
     elif has_affiliate is False:
-        query = query.filter(Membership.affiliate_id.is_(None))
-
-    total = query.count()
-    offset = (page - 1) * page_size
-    memberships = query.offset(offset).limit(page_size).all()
+        filters.append(Membership.affiliate_id.is_(None))
+
+    memberships, next_cursor = keyset_page(
+        db,
+        Membership,
+        fields=selected,
+        key=["id"],
+        filters=filters,
+        cursor=cursor,
+        limit=page_size,
+    )
 
-    return {
-        "memberships": [
-            {
-                "id": m.id,
-                "name": m.name,
-                "provider_name": m.provider_name,
-                "plan_name": m.plan_name,
-                "affiliate_id": m.affiliate_id,
-                "affiliate_url": m.affiliate_url,
-                "commission_type": m.commission_type,
-                "partner_name": m.partner_name,
-                "commission_notes": m.commission_notes,
-            }
-            for m in memberships
-        ],
-        "total": total,
-        "page": page,
+    response = {
+        "memberships": memberships,
+        "next_cursor": next_cursor,
         "page_size": page_size,
     }
+    if include_total:
+        response["total"] = db.query(func.count(Membership.id)).filter(*filters).scalar()
+    return response
 
 
 @router.patch(
@@ -536,20 +449,25 @@ def update_membership_affiliate(
     dependencies=[Depends(require_role("admin"))],
 )
 def list_benefits(
-    page: int = Query(1, ge=1),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
     page_size: int = Query(50, ge=1, le=100),
+    fields: str | None = Query(
+        None, description=f"Comma-separated subset of: {', '.join(BENEFIT_LIST_FIELDS)}"
+    ),
     search: str | None = Query(None),
     membership_id: int | None = Query(None),
     has_affiliate: bool | None = Query(None),
+    include_total: bool = Query(False, description="Also count all matching benefits"),
     db: Session = Depends(get_db),
 ):
-    """List all benefits with affiliate info (admin only)."""
-    query = db.query(Benefit)
+    """List all benefits with affiliate info (admin only), keyset paginated by id."""
+    selected = parse_fields(fields, BENEFIT_LIST_FIELDS)
+    filters = []
 
     # Search filter
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        filters.append(
             or_(
                 Benefit.title.ilike(search_term),
                 Benefit.vendor_name.ilike(search_term),
@@ -558,52 +476,42 @@ def list_benefits(
 
     # Membership filter
     if membership_id:
-        query = query.filter(Benefit.membership_id == membership_id)
+        filters.append(Benefit.membership_id == membership_id)
 
     # Affiliate filter
     if has_affiliate is True:
-        query = query.filter(Benefit.affiliate_id.isnot(None))
+        filters.append(Benefit.affiliate_id.isnot(None))
     elif has_affiliate is False:
-        query = query.filter(Benefit.affiliate_id.is_(None))
-
-    total = query.count()
-    offset = (page - 1) * page_size
-    benefits = query.offset(offset).limit(page_size).all()
-
-    # Get membership names
-    membership_ids = list(set([b.membership_id for b in benefits]))
-    memberships_map = (
-        {
-            m.id: m.name
-            for m in db.query(Membership)
-            .filter(Membership.id.in_(membership_ids))
-            .all()
-        }
-        if membership_ids
-        else {}
+        filters.append(Benefit.affiliate_id.is_(None))
+
+    columns = [f for f in selected if f != "membership_name"]
+    if "membership_name" in selected and "membership_id" not in columns:
+        columns.append("membership_id")
+    benefits, next_cursor = keyset_page(
+        db,
+        Benefit,
+        fields=columns,
+        key=["id"],
+        filters=filters,
+        cursor=cursor,
+        limit=page_size,
     )
 
-    return {
-        "benefits": [
-            {
-                "id": b.id,
-                "title": b.title,
-                "membership_id": b.membership_id,
-                "membership_name": memberships_map.get(b.membership_id),
-                "vendor_name": b.vendor_name,
-                "category": b.category,
-                "affiliate_id": b.affiliate_id,
-                "affiliate_url": b.affiliate_url,
-                "commission_type": b.commission_type,
-                "partner_name": b.partner_name,
-                "commission_notes": b.commission_notes,
-            }
-            for b in benefits
-        ],
-        "total": total,
-        "page": page,
+    # Membership names come from the in-memory catalog snapshot
+    if "membership_name" in selected:
+        memberships_by_id = get_catalog().memberships_by_id
+        for benefit in benefits:
+            membership = memberships_by_id.get(benefit["membership_id"])
+            benefit["membership_name"] = membership.name if membership else None
+
+    response = {
+        "benefits": [{f: b[f] for f in selected} for b in benefits],
+        "next_cursor": next_cursor,
         "page_size": page_size,
     }
+    if include_total:
+        response["total"] = db.query(func.count(Benefit.id)).filter(*filters).scalar()
+    return response
 
 
 @router.patch(
@@ -659,51 +567,21 @@ def get_analytics_overview(
     days: int = Query(7, ge=1, le=90),
     db: Session = Depends(get_db),
 ):
-    """Get analytics overview for admin dashboard."""
-    start_date = datetime.utcnow() - timedelta(days=days)
-
-    # Total events
-    total_events = (
-        db.query(AnalyticsEvent).filter(AnalyticsEvent.created_at >= start_date).count()
-    )
-
-    # Events by type
-    from sqlalchemy import func
-
-    events_by_type = (
-        db.query(
-            AnalyticsEvent.event_name, func.count(AnalyticsEvent.id).label("count")
-        )
-        .filter(AnalyticsEvent.created_at >= start_date)
-        .group_by(AnalyticsEvent.event_name)
-        .all()
-    )
-
-    # Daily active users
-    daily_active_users = (
-        db.query(func.count(func.distinct(AnalyticsEvent.user_id)))
-        .filter(
-            AnalyticsEvent.created_at >= start_date, AnalyticsEvent.user_id.isnot(None)
-        )
-        .scalar()
-    )
+    """
+    Get analytics overview for admin dashboard.
 
-    # Affiliate clicks
-    affiliate_clicks = (
-        db.query(AnalyticsEvent)
-        .filter(
-            AnalyticsEvent.event_name == "affiliate_click",
-            AnalyticsEvent.created_at >= start_date,
-        )
-        .count()
-    )
+    Read from the daily rollups; the window is the last `days` UTC calendar
+    days including today, and daily_active_users is a HyperLogLog estimate of
+    distinct users over the window.
+    """
+    overview = read_overview(db, window_start(days))
 
     return {
         "period_days": days,
-        "total_events": total_events,
-        "daily_active_users": daily_active_users,
-        "affiliate_clicks": affiliate_clicks,
-        "events_by_type": {e.event_name: e.count for e in events_by_type},
+        "total_events": overview["total_events"],
+        "daily_active_users": overview["unique_users"],
+        "affiliate_clicks": overview["affiliate_clicks"],
+        "events_by_type": overview["events_by_type"],
     }
 
 
@@ -715,58 +593,8 @@ def get_affiliate_report(
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db),
 ):
-    """Get affiliate performance report."""
-    start_date = datetime.utcnow() - timedelta(days=days)
-
-    # Affiliate clicks by benefit/membership
-    from sqlalchemy import func
-
-    affiliate_events = (
-        db.query(AnalyticsEvent)
-        .filter(
-            AnalyticsEvent.event_name == "affiliate_click",
-            AnalyticsEvent.created_at >= start_date,
-        )
-        .all()
-    )
-
-    # Group by item
-    clicks_by_item = {}
-    for event in affiliate_events:
-        payload = event.payload or {}
-        item_type = payload.get("type", "unknown")  # 'benefit' or 'membership'
-        item_id = payload.get("id")
-        item_name = payload.get("name", "Unknown")
-
-        key = f"{item_type}_{item_id}"
-        if key not in clicks_by_item:
-            clicks_by_item[key] = {
-                "type": item_type,
-                "id": item_id,
-                "name": item_name,
-                "clicks": 0,
-                "unique_users": set(),
-            }
-
-        clicks_by_item[key]["clicks"] += 1
-        if event.user_id:
-            clicks_by_item[key]["unique_users"].add(event.user_id)
-
-    # Format report
-    report = []
-    for item in clicks_by_item.values():
-        report.append(
-            {
-                "type": item["type"],
-                "id": item["id"],
-                "name": item["name"],
-                "total_clicks": item["clicks"],
-                "unique_users": len(item["unique_users"]),
-            }
-        )
-
-    # Sort by clicks
-    report.sort(key=lambda x: x["total_clicks"], reverse=True)
+    """Get affiliate performance report (from the daily affiliate click rollup)."""
+    report = read_affiliate_report(db, window_start(days))
 
     return {
         "period_days": days,
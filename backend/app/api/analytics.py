@@ -1,17 +1,17 @@
 """Analytics API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
 
-from app.core.db import get_db
 from app.core.auth import get_current_user
-from app.models import User, AnalyticsEvent
+from app.models import User
+from app.services.event_buffer import EventBufferFull, event_buffer, event_row
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
+MAX_BATCH_EVENTS = 500
+
 
 class EventCreate(BaseModel):
     event_name: str  # 'login', 'affiliate_click', 'membership_added', etc.
@@ -19,22 +19,45 @@ class EventCreate(BaseModel):
     payload: Optional[Dict[str, Any]] = None  # Additional event data
 
 
+class EventBatch(BaseModel):
+    events: List[EventCreate] = Field(..., min_length=1, max_length=MAX_BATCH_EVENTS)
+
+
+def _enqueue(events: List[EventCreate], user_id: int) -> None:
+    rows = [event_row(e.event_name, user_id, e.source, e.payload) for e in events]
+    try:
+        event_buffer.enqueue(rows)
+    except EventBufferFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analytics ingestion is busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
 @router.post("/event")
 def track_event(
     event: EventCreate,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Track an analytics event."""
-    analytics_event = AnalyticsEvent(
-        event_name=event.event_name,
-        user_id=current_user.id,
-        source=event.source or "web",
-        payload=event.payload,
-        created_at=datetime.utcnow(),
-    )
-
-    db.add(analytics_event)
-    db.commit()
+    """Track an analytics event (buffered, written in the next flush)."""
+    _enqueue([event], current_user.id)
 
     return {"message": "Event tracked successfully", "event_name": event.event_name}
+
+
+@router.post("/events", status_code=status.HTTP_202_ACCEPTED)
+def track_events(
+    batch: EventBatch,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Track a batch of analytics events.
+
+    Clients should queue events locally and send them here in batches of up to
+    500 rather than calling /event for each one. Returns 503 with Retry-After
+    when the ingestion buffer is full.
+    """
+    _enqueue(batch.events, current_user.id)
+
+    return {"message": "Events accepted", "accepted": len(batch.events)}
@@ -7,7 +7,7 @@ import uuid
 from jose import JWTError
 
 from app.core.db import get_db
-from app.core.auth import get_current_user, get_optional_user
+from app.core.auth import get_current_user, get_optional_user, invalidate_principal
 from app.core.security import (
     hash_password,
     verify_password,
@@ -87,6 +87,9 @@ def login(
     db.add(session)
     db.commit()
 
+    # Start the new session from the user's current role/status
+    invalidate_principal(user.id)
+
     return TokenOut(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -150,6 +153,8 @@ def refresh_token(refresh_in: RefreshIn, db: Session = Depends(get_db)):
         db.add(new_session)
         db.commit()
 
+        invalidate_principal(user.id)
+
         return TokenOut(
             access_token=access_token,
             refresh_token=new_refresh_token,
@@ -195,6 +200,8 @@ def logout(
     except Exception:
         pass  # Silently fail for logout
 
+    invalidate_principal(current_user.id)
+
     return None
 
 
@@ -1,14 +1,18 @@
 """Benefits API endpoints."""
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.core.db import get_db
-from app.schemas import BenefitRead
+from app.core.pagination import keyset_page, parse_fields
+from app.schemas import BenefitFields, BenefitRead
 from app.models import Benefit
 
 router = APIRouter(prefix="/api/benefits", tags=["benefits"])
 
+BENEFIT_FIELDS = tuple(BenefitRead.model_fields)
+DEFAULT_PAGE_SIZE = 100
+
 
 @router.get("/{benefit_id}", response_model=BenefitRead)
 def get_benefit(benefit_id: int, db: Session = Depends(get_db)):
@@ -21,24 +25,48 @@ def get_benefit(benefit_id: int, db: Session = Depends(get_db)):
     return benefit
 
 
-@router.get("", response_model=List[BenefitRead])
+@router.get("", response_model=List[BenefitFields], response_model_exclude_unset=True)
 def get_benefits(
+    response: Response,
     ids: Optional[List[int]] = Query(None, description="Benefit IDs to fetch"),
     membership_id: Optional[int] = Query(None, description="Membership ID to filter by"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=500, description=f"Page size (default {DEFAULT_PAGE_SIZE} when paging)"
+    ),
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated subset of: {', '.join(BENEFIT_FIELDS)}"
+    ),
     db: Session = Depends(get_db),
 ):
-    """Get multiple benefits by IDs or by membership ID."""
-    query = db.query(Benefit)
-    
+    """
+    Get multiple benefits by IDs or by membership ID, ordered by id.
+
+    Without limit or cursor all matching benefits are returned. With either,
+    results are keyset paginated: when more benefits match, the cursor for the
+    next page is returned in the X-Next-Cursor header.
+    """
+    selected = parse_fields(fields, BENEFIT_FIELDS)
+
     if ids:
-        query = query.filter(Benefit.id.in_(ids))
+        filters = [Benefit.id.in_(ids)]
     elif membership_id:
-        query = query.filter(Benefit.membership_id == membership_id)
+        filters = [Benefit.membership_id == membership_id]
     else:
         raise HTTPException(
             status_code=400,
             detail="Either 'ids' or 'membership_id' query parameter is required"
         )
-    
-    benefits = query.all()
+
+    benefits, next_cursor = keyset_page(
+        db,
+        Benefit,
+        fields=selected,
+        key=["id"],
+        filters=filters,
+        cursor=cursor,
+        limit=limit or (DEFAULT_PAGE_SIZE if cursor else None),
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return benefits
@@ -1,14 +1,15 @@
 """Chat API endpoints for conversational benefits assistant."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.auth import get_current_user
-from app.core.db import get_db
+from app.core.auth import get_current_user_async
+from app.core.db import get_async_db
 from app.schemas.chat import ChatRequest, ChatResponse, BenefitReference
 from app.services.chat_service import generate_chat_response
+from app.services.user_benefits import load_user_benefit_graph_async
 from app.models.user import User
-from app.models.membership import Membership
 from app.models.benefit import Benefit
 from app.models.user_membership import UserMembership
 
@@ -19,8 +20,8 @@ router = APIRouter(prefix="/api/chat", tags=["chat"])
 @router.post("/", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Conversational chat endpoint for benefits questions.
@@ -35,28 +36,17 @@ async def chat(
     """
 
     # Get user's memberships and benefits
-    user_memberships = (
-        db.query(UserMembership).filter(UserMembership.user_id == current_user.id).all()
-    )
+    graph = await load_user_benefit_graph_async(db, current_user.id)
+    membership_ids = graph.membership_ids
 
-    if not user_memberships:
+    if not membership_ids:
         return ChatResponse(
             message="You don't have any memberships yet! Add your memberships to discover benefits and I'll help you make the most of them. 💎",
             related_benefits=[],
         )
 
-    membership_ids = [um.membership_id for um in user_memberships]
-
-    # Get all approved benefits for user's memberships
-    benefits_query = (
-        db.query(Benefit, Membership)
-        .join(Membership, Benefit.membership_id == Membership.id)
-        .filter(
-            Benefit.membership_id.in_(membership_ids),
-            Benefit.validation_status == "approved",
-        )
-        .all()
-    )
+    # All approved benefits for user's memberships
+    benefits_query = graph.benefit_pairs()
 
     if not benefits_query:
         return ChatResponse(
@@ -65,7 +55,7 @@ async def chat(
         )
 
     # Generate response (now with intelligent upgrade detection)
-    response_data = generate_chat_response(
+    response_data = await generate_chat_response(
         user_message=request.message,
         conversation_history=[msg.dict() for msg in request.conversation_history],
         user_benefits=benefits_query,
@@ -83,26 +73,27 @@ async def chat(
 
 @router.get("/hello")
 async def hello(
-    current_user: User = Depends(get_current_user), db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get a personalized greeting message for the chat.
     Returns a context-aware introduction based on user's memberships.
     """
-    user_memberships = (
-        db.query(UserMembership)
-        .filter(UserMembership.user_id == current_user.id)
-        .count()
+    user_memberships = await db.scalar(
+        select(func.count())
+        .select_from(UserMembership)
+        .where(UserMembership.user_id == current_user.id)
     )
 
-    benefits_count = (
-        db.query(Benefit)
+    benefits_count = await db.scalar(
+        select(func.count())
+        .select_from(Benefit)
         .join(UserMembership, Benefit.membership_id == UserMembership.membership_id)
-        .filter(
+        .where(
             UserMembership.user_id == current_user.id,
             Benefit.validation_status == "approved",
         )
-        .count()
     )
 
     if user_memberships == 0:
@@ -2,14 +2,17 @@
 
 from typing import Dict, Any
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, HttpUrl
 
-from app.core.db import get_db
-from app.core.auth import get_current_user
-from app.models import User, UserMembership, Benefit, Membership
+from app.core.db import get_async_db
+from app.core.auth import get_current_user_async
+from app.core.config import settings
+from app.core.deadline import Deadline, DeadlineExceeded
+from app.models import User
 from app.services.page_scraper import scrape_page_metadata
 from app.services.semantic_matcher import find_semantic_matches, generate_user_message
+from app.services.user_benefits import load_user_benefit_graph_async
 
 
 router = APIRouter(prefix="/api/check-semantic", tags=["check-semantic"])
@@ -25,8 +28,8 @@ class SemanticCheckRequest(BaseModel):
 @router.post("")
 async def check_semantic(
     request: SemanticCheckRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Dict[str, Any]:
     """
     Semantic check: Scrape page, match benefits using embeddings, generate AI message.
@@ -37,7 +40,11 @@ async def check_semantic(
     3. Generates user-friendly message with mini LLM
 
     Cost: ~$0.0006 per unique URL (cached for 10 minutes)
+
+    The whole pipeline shares one latency budget (CHECK_SEMANTIC_BUDGET_S);
+    each stage gets what is left and falls back to deterministic output.
     """
+    deadline = Deadline(settings.check_semantic_budget_s)
     try:
         print(f"\n🔍 SEMANTIC CHECK START")
         print(f"   URL: {request.url}")
@@ -45,7 +52,7 @@ async def check_semantic(
 
         # Step 1: Scrape page metadata
         print(f"   📄 Scraping page metadata...")
-        metadata = await scrape_page_metadata(request.url)
+        metadata = await scrape_page_metadata(request.url, deadline=deadline)
         print(f"   ✅ Metadata scraped: {list(metadata.keys())}")
 
         if metadata.get("llm_inferred"):
@@ -57,14 +64,11 @@ async def check_semantic(
 
         # Step 2: Get user's benefits
         print(f"   🔍 Fetching user memberships...")
-        user_memberships = (
-            db.query(UserMembership)
-            .filter(UserMembership.user_id == current_user.id)
-            .all()
-        )
-        print(f"   ✅ Found {len(user_memberships)} memberships")
+        graph = await load_user_benefit_graph_async(db, current_user.id)
+        membership_ids = graph.membership_ids
+        print(f"   ✅ Found {len(membership_ids)} memberships")
 
-        if not user_memberships:
+        if not membership_ids:
             print(f"   ⚠️  No memberships found")
             return {
                 "success": True,
@@ -75,26 +79,9 @@ async def check_semantic(
                 "matches": [],
             }
 
-        membership_ids = [um.membership_id for um in user_memberships]
-
         # Get approved benefits with membership info
         print(f"   🎁 Fetching benefits for {len(membership_ids)} memberships...")
-        benefits_with_membership = []
-        for membership_id in membership_ids:
-            membership = db.query(Membership).get(membership_id)
-            if membership:
-                benefits = (
-                    db.query(Benefit)
-                    .filter(
-                        Benefit.membership_id == membership_id,
-                        Benefit.validation_status == "approved",
-                    )
-                    .all()
-                )
-
-                for benefit in benefits:
-                    benefits_with_membership.append((benefit, membership))
-
+        benefits_with_membership = graph.benefit_pairs()
         print(f"   ✅ Found {len(benefits_with_membership)} approved benefits")
 
         if not benefits_with_membership:
@@ -115,12 +102,15 @@ async def check_semantic(
             benefits_with_membership,
             top_k=5,
             threshold=0.7,  # 70% similarity minimum for higher relevance
+            deadline=deadline,
         )
         print(f"   ✅ Found {len(semantic_matches)} matches")
 
         # Step 4: Generate user message with mini LLM
         print(f"   💬 Generating AI message...")
-        result = await generate_user_message(metadata, semantic_matches)
+        result = await generate_user_message(
+            metadata, semantic_matches, deadline=deadline
+        )
         print(f"   ✅ Result: has_matches={result.get('has_matches')}")
 
         # Add metadata to response
@@ -136,6 +126,18 @@ async def check_semantic(
         print(f"   🎉 SEMANTIC CHECK COMPLETE\n")
         return result
 
+    except DeadlineExceeded as e:
+        print(f"   ⏱️ SEMANTIC CHECK OUT OF BUDGET: {e}\n")
+        return {
+            "success": True,
+            "url": request.url,
+            "domain": "",
+            "has_matches": False,
+            "timed_out": True,
+            "message": "Benefit check took too long for this page",
+            "matches": [],
+        }
+
     except Exception as e:
         print(f"\n   ❌❌❌ EXCEPTION: {type(e).__name__}: {str(e)}\n")
         import traceback
@@ -155,6 +157,7 @@ async def check_semantic(
 def get_status():
     """Get semantic matching system status."""
     from app.services.semantic_matcher import embedding_cache, match_cache
+    from app.services.message_templates import message_stats
 
     return {
         "status": "operational",
@@ -162,4 +165,5 @@ def get_status():
         "match_cache_size": len(match_cache),
         "embedding_cache_max": embedding_cache.maxsize,
         "match_cache_max": match_cache.maxsize,
+        "messages": message_stats.to_dict(),
     }
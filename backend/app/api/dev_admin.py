@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, invalidate_principal
 from app.models.user import User
 
 router = APIRouter(prefix="/api/dev", tags=["dev"])
@@ -43,17 +43,19 @@ def make_me_admin(
             },
         }
 
-    # Update role
-    current_user.role = "admin"
+    # Update role (current_user is a cached principal, so load the row)
+    user = db.query(User).filter(User.id == current_user.id).first()
+    user.role = "admin"
     db.commit()
-    db.refresh(current_user)
+    db.refresh(user)
+    invalidate_principal(user.id)
 
     return {
-        "message": f"✅ {current_user.email} is now an admin! Please log out and log back in to see the Admin link.",
+        "message": f"✅ {user.email} is now an admin! Please log out and log back in to see the Admin link.",
         "user": {
-            "id": current_user.id,
-            "email": current_user.email,
-            "role": current_user.role,
+            "id": user.id,
+            "email": user.email,
+            "role": user.role,
         },
     }
 
@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 
 from app.core.db import get_db
 from app.core.auth import get_current_user
+from app.core.config import settings
+from app.core.deadline import Deadline
 from app.models import User
 from app.schemas.llm import (
     LLMRecommendationIn,
@@ -31,6 +33,7 @@ def get_llm_recommendations(
     This endpoint uses GPT-4o-mini to analyze the user's memberships and benefits,
     providing intelligent recommendations for optimization.
     """
+    deadline = Deadline(settings.llm_recommendations_budget_s)
     try:
         context_dict = None
         if request.context:
@@ -45,7 +48,8 @@ def get_llm_recommendations(
         recommendations, relevant_benefits = generate_llm_recommendations(
             db,
             current_user.id,
-            context_dict
+            context_dict,
+            deadline=deadline,
         )
         
         return LLMRecommendationOut(
@@ -74,6 +78,7 @@ def smart_add_membership(
     Uses LLM to analyze if the candidate membership duplicates existing coverage
     or if the user has better alternatives already.
     """
+    deadline = Deadline(settings.smart_add_budget_s)
     try:
         if request.user_id != current_user.id:
             raise HTTPException(
@@ -84,7 +89,8 @@ def smart_add_membership(
         result = smart_add_check(
             db,
             current_user.id,
-            request.candidate_membership_slug
+            request.candidate_membership_slug,
+            deadline=deadline,
         )
         
         return SmartAddOut(**result)
@@ -0,0 +1,39 @@
+"""Metrics API endpoints."""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from app.core import llm_metrics
+from app.core.auth import require_role
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(require_role("admin"))],
+)
+
+
+@router.get("/llm")
+def get_llm_metrics(
+    format: str = Query("json", pattern="^(json|prometheus)$"),
+):
+    """
+    LLM call metrics for this worker, labelled by call site and model.
+
+    Includes latency and token histograms, estimated cost, retries,
+    cache hits and fallback usage. Use format=prometheus for the text
+    exposition format.
+    """
+    if format == "prometheus":
+        return PlainTextResponse(
+            llm_metrics.render_prometheus(),
+            media_type="text/plain; version=0.0.4",
+        )
+    return llm_metrics.snapshot()
+
+
+@router.post("/llm/reset")
+def reset_llm_metrics():
+    """Clear LLM call metrics for this worker."""
+    llm_metrics.reset()
+    return {"status": "reset"}
@@ -20,6 +20,7 @@ from app.api import (
     analytics,
     dev_admin,
     bank_statement,
+    metrics,
 )
 
 api_router = APIRouter()
@@ -44,6 +45,7 @@ api_router.include_router(benefits.router)
 api_router.include_router(ai.router)
 api_router.include_router(chat.router)
 api_router.include_router(analytics.router)
+api_router.include_router(metrics.router)
 
 # Bank Statement Processing
 api_router.include_router(bank_statement.router)
@@ -1,12 +1,19 @@
 """Authentication dependencies and utilities."""
 
+import threading
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import JWTError
 
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, get_async_db, get_db
 from app.core.security import decode_token
 from app.models import User, UserRole
 
@@ -15,29 +22,152 @@ from app.models import User, UserRole
 security = HTTPBearer()
 
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Authenticated user as seen by request handlers.
+
+    Carries the User attributes endpoints read (same names), but is not bound
+    to a database session - load the User row to modify it.
+    """
+
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+    created_at: datetime
+
+
+_PRINCIPAL_COLUMNS = (User.id, User.email, User.role, User.is_active, User.created_at)
+
+# user_id -> Principal. Invalidated in-process when a user's role or status
+# changes; other workers pick up the change when the TTL expires.
+principal_cache = TTLCache(maxsize=10000, ttl=settings.principal_cache_ttl_s)
+_principal_lock = threading.Lock()
+
+
+def _cached_principal(user_id: int) -> Optional[Principal]:
+    with _principal_lock:
+        return principal_cache.get(user_id)
+
+
+def _cache_principal(row) -> Optional[Principal]:
+    if row is None:
+        return None
+    principal = Principal(*row)
+    with _principal_lock:
+        principal_cache[principal.id] = principal
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop a cached principal after the user's role or active status changed."""
+    with _principal_lock:
+        principal_cache.pop(user_id, None)
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """Return the user's principal from the cache, loading it on a miss."""
+    principal = _cached_principal(user_id)
+    if principal is None:
+        principal = _cache_principal(
+            db.execute(select(*_PRINCIPAL_COLUMNS).where(User.id == user_id)).first()
+        )
+    return principal
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
     """
     Dependency to get the current authenticated user from JWT token.
 
+    The user's role and status come from a short-TTL principal cache, so a
+    request normally costs only the token signature check.
+
+    Args:
+        credentials: Bearer token from Authorization header
+        db: Database session (only used on a cache miss)
+
+    Returns:
+        Current user principal
+
+    Raises:
+        HTTPException: 401 if token is invalid or user not found
+    """
+    user_id = _user_id_from_credentials(credentials)
+    return _ensure_active(load_principal(db, user_id))
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """
+    Async variant of get_current_user for endpoints using get_async_db.
+
+    Args:
+        credentials: Bearer token from Authorization header
+        db: Async database session (only used on a cache miss)
+
+    Returns:
+        Current user principal
+
+    Raises:
+        HTTPException: 401 if token is invalid or user not found
+    """
+    user_id = _user_id_from_credentials(credentials)
+    principal = _cached_principal(user_id)
+    if principal is None:
+        principal = await _load_principal_async(db, user_id)
+    return _ensure_active(principal)
+
+
+async def get_current_user_streaming(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> Principal:
+    """
+    Variant of get_current_user_async for streaming responses.
+
+    A yield dependency such as get_async_db is only torn down once the response
+    finishes, so a long-lived stream would keep its pooled connection checked
+    out. This one loads a principal on a cache miss with a short-lived session.
+
     Args:
         credentials: Bearer token from Authorization header
-        db: Database session
 
     Returns:
-        Current user object
+        Current user principal
 
     Raises:
         HTTPException: 401 if token is invalid or user not found
     """
-    credentials_exception = HTTPException(
+    user_id = _user_id_from_credentials(credentials)
+    principal = _cached_principal(user_id)
+    if principal is None:
+        async with AsyncSessionLocal() as db:
+            principal = await _load_principal_async(db, user_id)
+    return _ensure_active(principal)
+
+
+async def _load_principal_async(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    result = await db.execute(select(*_PRINCIPAL_COLUMNS).where(User.id == user_id))
+    return _cache_principal(result.first())
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _user_id_from_credentials(credentials: HTTPAuthorizationCredentials) -> int:
+    """Decode an access token and return its user ID (raises 401 if invalid)."""
+    credentials_exception = _credentials_exception()
+
     try:
         token = credentials.credentials
         payload = decode_token(token)
@@ -54,10 +184,13 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    # Get user from database
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    return int(user_id)
+
+
+def _ensure_active(user: Optional[Principal]) -> Principal:
+    """Reject missing (401) and inactive (403) users."""
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
     # Check if user is active
     if not user.is_active:
@@ -69,8 +202,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     Dependency to ensure user is active.
     """
@@ -95,7 +228,7 @@ def require_role(required_role: UserRole):
         Dependency function
     """
 
-    async def check_role(current_user: User = Depends(get_current_user)):
+    async def check_role(current_user: Principal = Depends(get_current_user)):
         if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -115,7 +248,7 @@ async def get_optional_user(
         HTTPBearer(auto_error=False)
     ),
     db: Session = Depends(get_db),
-) -> Optional[User]:
+) -> Optional[Principal]:
     """
     Dependency to optionally get current user (doesn't fail if no token).
 
@@ -135,7 +268,7 @@ async def get_optional_user(
         if not user_id:
             return None
 
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        user = load_principal(db, int(user_id))
         return user if user and user.is_active else None
 
     except JWTError:
@@ -15,6 +15,40 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str
+    async_database_url: str = ""  # Defaults to DATABASE_URL with the asyncpg driver
+    async_db_pool_size: int = 10
+    async_db_max_overflow: int = 10
+
+    # In-memory catalog snapshot
+    catalog_poll_interval_s: float = 5.0  # Version check interval when not LISTENing
+    catalog_max_age_s: float = 300.0  # Rebuild at least this often regardless
+
+    # Buffered analytics ingestion
+    analytics_flush_size: int = 500  # Flush once this many events are buffered
+    analytics_flush_interval_s: float = 2.0  # ...or at least this often
+    analytics_max_pending: int = 20000  # Buffer capacity before producers wait
+    analytics_enqueue_timeout_s: float = 1.0  # Max wait for room before rejecting
+    analytics_flush_max_retries: int = 5  # Consecutive failed flushes before events are dropped
+    analytics_partitions_ahead: int = 2  # Monthly partitions created in advance
+    analytics_retention_months: int = 13  # Raw events kept besides the current month
+
+    # Bank statement uploads (PDF extraction runs in a process pool)
+    statement_max_upload_mb: int = 20  # Larger uploads are rejected with 413
+    statement_subscription_concurrency: int = 4  # Subscriptions validated/discovered at once
+    statement_job_concurrency: int = 2  # Statements processed at once per API worker
+    statement_job_poll_interval_s: float = 1.0  # Job progress check interval for event streams
+    statement_job_heartbeat_s: float = 30.0  # Live jobs refresh updated_at this often
+    statement_job_stale_s: float = 120.0  # Unfinished jobs without a heartbeat this long are failed
+    statement_result_ttl_s: float = 604800.0  # Completed results reused for re-uploads of the same file
+    statement_llm_chunk_tokens: int = 1000  # Input token budget per LLM extraction chunk
+    statement_llm_concurrency: int = 4  # LLM extraction chunks in flight per API worker
+    descriptor_min_confirmations: int = 2  # Confirmed matches before a descriptor skips the LLM
+    descriptor_cache_ttl_s: float = 300.0  # How long learned descriptors are cached per worker
+    recurrence_min_confidence: float = 0.9  # Detected recurring payments below this go to the LLM
+    pdf_pool_workers: int = 2  # Worker processes per API worker
+    pdf_pages_per_job: int = 8  # Pages per extraction job; longer PDFs are split
+    pdf_job_timeout_s: float = 30.0  # Max time per extraction job
+    pdf_job_memory_mb: int = 512  # Address-space cap per worker process
 
     # OpenAI
     openai_api_key: str = ""
@@ -24,6 +58,12 @@ class Settings(BaseSettings):
     openai_timeout_s: float = 15.0
     openai_max_retries: int = 0
 
+    # Latency budgets (seconds) for LLM-backed endpoints
+    llm_recommendations_budget_s: float = 12.0
+    smart_add_budget_s: float = 12.0
+    check_semantic_budget_s: float = 8.0
+    llm_hedge_after_s: float = 0.0  # Send a duplicate LLM request after this delay (0 = off)
+
     # Search & AI
     search_provider: str = "duckduckgo"
     ai_max_pages: int = 5
@@ -32,6 +72,7 @@ class Settings(BaseSettings):
     jwt_secret: str = DEFAULT_JWT_SECRET
     access_ttl_min: str = "30"
     refresh_ttl_days: str = "30"
+    principal_cache_ttl_s: float = 30.0  # How long role/active status may be cached per worker
 
     # Admin user (for seeding)
     admin_email: str = "admin@vogoplus.app"
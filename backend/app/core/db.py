@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
 
@@ -7,6 +9,26 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _async_database_url(database_url: str) -> str:
+    """Swap the sync Postgres driver in DATABASE_URL for asyncpg."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+async_engine = create_async_engine(
+    settings.async_database_url or _async_database_url(settings.database_url),
+    echo=settings.sql_echo,
+    pool_size=settings.async_db_pool_size,
+    max_overflow=settings.async_db_max_overflow,
+    pool_pre_ping=True,
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+
+
 def get_db():
     """Dependency to get database session."""
     db = SessionLocal()
@@ -14,3 +36,23 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session (for async def endpoints)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def run_with_session(fn, *args, **kwargs):
+    """
+    Call fn(db, *args, **kwargs) with a dedicated sync session.
+
+    Lets async endpoints run sync services (GPT validation, benefit discovery)
+    in a worker thread via asyncio.to_thread without sharing their AsyncSession.
+    """
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
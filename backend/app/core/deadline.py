@@ -0,0 +1,156 @@
+"""Latency budgets and hedged calls for LLM-backed endpoints.
+
+An endpoint creates a Deadline from its budget and passes it down through its
+pipeline stages. Each stage asks the deadline for the time it has left and
+switches to its deterministic fallback once the budget is spent.
+"""
+
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional, TypeVar
+
+from app.core import llm_metrics
+from app.core.config import settings
+
+T = TypeVar("T")
+
+# Worker threads for hedged (duplicate) LLM requests
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage cannot finish within the remaining latency budget."""
+
+
+class Deadline:
+    """A fixed point in time by which an endpoint must respond."""
+
+    def __init__(self, budget_s: float):
+        self.budget_s = budget_s
+        self.expires_at = time.monotonic() + budget_s
+
+    def remaining(self) -> float:
+        """Seconds left in the budget (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Remaining budget, optionally capped by a stage's own timeout."""
+        remaining = self.remaining()
+        return min(remaining, cap) if cap is not None else remaining
+
+    def check(self, stage: str) -> None:
+        """Raise DeadlineExceeded if the budget is already spent."""
+        if self.expired:
+            raise DeadlineExceeded(f"Latency budget of {self.budget_s}s spent before {stage}")
+
+
+def _stage_timeout(deadline: Optional[Deadline]) -> float:
+    if deadline is None:
+        return settings.openai_timeout_s
+    return deadline.timeout(settings.openai_timeout_s)
+
+
+def hedged_call(
+    fn: Callable[[float], T],
+    deadline: Optional[Deadline] = None,
+    hedge_after_s: Optional[float] = None,
+    call_site: str = "unknown",
+    model: str = "unknown",
+) -> T:
+    """
+    Run a blocking LLM call within the deadline, optionally hedging it.
+
+    If the first request has not completed after hedge_after_s, an identical
+    second request is sent and whichever succeeds first wins.
+
+    Args:
+        fn: Callable taking the per-request timeout in seconds
+        deadline: Latency budget for the call (None = client default timeout)
+        hedge_after_s: Delay before sending the hedge (None/0 = settings default)
+        call_site: Metrics label for the caller
+        model: Metrics label for the model
+
+    Returns:
+        Result of the first successful request
+
+    Raises:
+        DeadlineExceeded: If the budget is spent before any request succeeds
+    """
+    if deadline is not None:
+        deadline.check(call_site)
+    hedge_after_s = hedge_after_s or settings.llm_hedge_after_s
+
+    timeout = _stage_timeout(deadline)
+    if not hedge_after_s or timeout <= hedge_after_s:
+        return fn(timeout)
+
+    primary = _hedge_pool.submit(fn, timeout)
+    done, _ = wait([primary], timeout=hedge_after_s)
+    if done:
+        return primary.result()
+
+    llm_metrics.record_hedge(call_site, model)
+    pending = {primary, _hedge_pool.submit(fn, _stage_timeout(deadline))}
+    error: Optional[BaseException] = None
+    while pending:
+        wait_s = deadline.remaining() if deadline is not None else None
+        done, pending = wait(pending, timeout=wait_s, return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded(f"{call_site} did not respond within its budget")
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+async def hedged_call_async(
+    fn: Callable[[float], T],
+    deadline: Optional[Deadline] = None,
+    hedge_after_s: Optional[float] = None,
+    call_site: str = "unknown",
+    model: str = "unknown",
+) -> T:
+    """
+    Async variant of hedged_call that runs the blocking call off the event loop.
+
+    See hedged_call for argument semantics.
+    """
+    if deadline is not None:
+        deadline.check(call_site)
+    hedge_after_s = hedge_after_s or settings.llm_hedge_after_s
+
+    timeout = _stage_timeout(deadline)
+    primary = asyncio.ensure_future(asyncio.to_thread(fn, timeout))
+    pending = {primary}
+
+    if hedge_after_s and timeout > hedge_after_s:
+        done, _ = await asyncio.wait(pending, timeout=hedge_after_s)
+        if not done:
+            llm_metrics.record_hedge(call_site, model)
+            pending.add(
+                asyncio.ensure_future(asyncio.to_thread(fn, _stage_timeout(deadline)))
+            )
+
+    error: Optional[BaseException] = None
+    while pending:
+        wait_s = deadline.remaining() if deadline is not None else None
+        done, pending = await asyncio.wait(
+            pending, timeout=wait_s, return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            for task in pending:
+                task.cancel()
+            raise DeadlineExceeded(f"{call_site} did not respond within its budget")
+        for task in done:
+            if task.exception() is None:
+                for other in pending:
+                    other.cancel()
+                return task.result()
+            error = task.exception()
+    raise error
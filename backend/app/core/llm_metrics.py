@@ -0,0 +1,252 @@
+"""In-process instrumentation for OpenAI calls.
+
+Every LLM/embedding call site records its latency, token usage, estimated
+cost, retries, cache hits and fallbacks here, labelled by call site and model.
+Metrics are kept per worker process and exposed via /api/metrics.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_S = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+# USD per 1M tokens: (prompt, completion)
+MODEL_PRICING_PER_1M = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o-mini-search-preview": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds (Prometheus semantics)."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list:
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(bounds, self.cumulative())),
+            "sum": round(self.sum, 6),
+            "count": self.count,
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+        }
+
+
+class CallSiteMetrics:
+    """Metrics for a single (call_site, model) label pair."""
+
+    def __init__(self):
+        self.latency_s = Histogram(LATENCY_BUCKETS_S)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens = Histogram(TOKEN_BUCKETS)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.hedges = 0
+        self.cost_usd = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "fallbacks": self.fallbacks,
+            "hedges": self.hedges,
+            "cost_usd": round(self.cost_usd, 6),
+            "latency_seconds": self.latency_s.to_dict(),
+            "prompt_tokens": self.prompt_tokens.to_dict(),
+            "completion_tokens": self.completion_tokens.to_dict(),
+        }
+
+
+_lock = threading.Lock()
+_metrics: Dict[Tuple[str, str], CallSiteMetrics] = {}
+
+
+def _get(call_site: str, model: str) -> CallSiteMetrics:
+    key = (call_site, model or "unknown")
+    metrics = _metrics.get(key)
+    if metrics is None:
+        metrics = _metrics.setdefault(key, CallSiteMetrics())
+    return metrics
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimate USD cost of a call from token usage."""
+    prompt_price, completion_price = MODEL_PRICING_PER_1M.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def observe_call(
+    call_site: str,
+    model: str,
+    duration_s: float,
+    usage: Any = None,
+    error: bool = False,
+) -> None:
+    """Record one completed (or failed) API call."""
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+
+    with _lock:
+        metrics = _get(call_site, model)
+        metrics.calls += 1
+        metrics.latency_s.observe(duration_s)
+        if error:
+            metrics.errors += 1
+        if usage is not None:
+            metrics.prompt_tokens.observe(prompt_tokens)
+            metrics.completion_tokens.observe(completion_tokens)
+            metrics.cost_usd += estimate_cost(model, prompt_tokens, completion_tokens)
+
+
+def record_retry(call_site: str, model: str) -> None:
+    with _lock:
+        _get(call_site, model).retries += 1
+
+
+def record_cache_hit(call_site: str, model: str) -> None:
+    with _lock:
+        _get(call_site, model).cache_hits += 1
+
+
+def record_fallback(call_site: str, model: str) -> None:
+    with _lock:
+        _get(call_site, model).fallbacks += 1
+
+
+def record_hedge(call_site: str, model: str) -> None:
+    with _lock:
+        _get(call_site, model).hedges += 1
+
+
+def chat_completion(call_site: str, client, **kwargs):
+    """
+    Call client.chat.completions.create and record metrics for it.
+
+    Args:
+        call_site: Label identifying the calling code (e.g. "chat_service")
+        client: OpenAI client instance
+        **kwargs: Passed through to chat.completions.create
+
+    Returns:
+        The OpenAI response object
+    """
+    model = kwargs.get("model", "unknown")
+    start = time.perf_counter()
+    try:
+        response = client.chat.completions.create(**kwargs)
+    except Exception:
+        observe_call(call_site, model, time.perf_counter() - start, error=True)
+        raise
+    observe_call(
+        call_site, model, time.perf_counter() - start, getattr(response, "usage", None)
+    )
+    return response
+
+
+def embedding(call_site: str, client, **kwargs):
+    """Call client.embeddings.create and record metrics for it."""
+    model = kwargs.get("model", "unknown")
+    start = time.perf_counter()
+    try:
+        response = client.embeddings.create(**kwargs)
+    except Exception:
+        observe_call(call_site, model, time.perf_counter() - start, error=True)
+        raise
+    observe_call(
+        call_site, model, time.perf_counter() - start, getattr(response, "usage", None)
+    )
+    return response
+
+
+def snapshot() -> Dict[str, Any]:
+    """Return all metrics as a JSON-serializable dict."""
+    with _lock:
+        items = [
+            {"call_site": call_site, "model": model, **metrics.to_dict()}
+            for (call_site, model), metrics in sorted(_metrics.items())
+        ]
+    return {
+        "call_sites": items,
+        "total_calls": sum(i["calls"] for i in items),
+        "total_cost_usd": round(sum(i["cost_usd"] for i in items), 6),
+    }
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = []
+
+    def _histogram(name: str, help_text: str, attr: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (call_site, model), metrics in sorted(_metrics.items()):
+            hist: Histogram = getattr(metrics, attr)
+            labels = f'call_site="{call_site}",model="{model}"'
+            bounds = [str(b) for b in hist.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, hist.cumulative()):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+    def _counter(name: str, help_text: str, attr: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for (call_site, model), metrics in sorted(_metrics.items()):
+            labels = f'call_site="{call_site}",model="{model}"'
+            lines.append(f"{name}{{{labels}}} {getattr(metrics, attr)}")
+
+    with _lock:
+        _histogram("llm_request_duration_seconds", "LLM call latency", "latency_s")
+        _histogram("llm_prompt_tokens", "Prompt tokens per LLM call", "prompt_tokens")
+        _histogram(
+            "llm_completion_tokens", "Completion tokens per LLM call", "completion_tokens"
+        )
+        _counter("llm_requests_total", "LLM calls made", "calls")
+        _counter("llm_errors_total", "LLM calls that raised", "errors")
+        _counter("llm_retries_total", "LLM call retries", "retries")
+        _counter("llm_cache_hits_total", "LLM responses served from cache", "cache_hits")
+        _counter("llm_fallbacks_total", "Deterministic fallbacks used", "fallbacks")
+        _counter("llm_hedges_total", "Hedged duplicate LLM requests sent", "hedges")
+        _counter("llm_cost_usd_total", "Estimated LLM spend in USD", "cost_usd")
+
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Clear all recorded metrics."""
+    with _lock:
+        _metrics.clear()
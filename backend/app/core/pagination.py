@@ -0,0 +1,130 @@
+"""Keyset (cursor) pagination and sparse fieldsets for list endpoints.
+
+Pages are fetched with `WHERE (k1, k2) > (:last_k1, :last_k2) ORDER BY k1, k2
+LIMIT n` instead of OFFSET, so every page costs the same index range scan no
+matter how deep the client has paged. The position of the last row is handed
+back to the client as an opaque cursor.
+
+`fields=id,title,...` limits the selected columns to the ones the client asked
+for (the keyset columns are always fetched to build the next cursor).
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """
+    Parse a comma-separated `fields` parameter.
+
+    Args:
+        fields: Requested fields (None or empty for all allowed fields)
+        allowed: Fields the endpoint can return, in response order
+
+    Returns:
+        Requested fields in response order
+
+    Raises:
+        HTTPException: 400 if an unknown field is requested
+    """
+    if not fields:
+        return list(allowed)
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. "
+            f"Allowed: {', '.join(allowed)}",
+        )
+    return [f for f in allowed if f in requested]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Iterable[Any]) -> str:
+    """Encode the keyset values of the last row on a page as an opaque cursor."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = [_decode_value(v) for v in json.loads(raw)]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    if len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def keyset_page(
+    db: Session,
+    model,
+    fields: Sequence[str],
+    key: Sequence[str],
+    filters: Sequence = (),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = 50,
+    descending: bool = False,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of rows as dicts containing only the requested columns.
+
+    Args:
+        db: Database session
+        model: Mapped model class to select from
+        fields: Column names to return
+        key: Unique, indexed column names that define the order (e.g. ["created_at", "id"])
+        filters: WHERE criteria
+        cursor: Cursor from the previous page (None for the first page)
+        limit: Page size (None for all remaining rows)
+        descending: Page from the highest key down
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+    """
+    selected = list(dict.fromkeys([*fields, *key]))
+    key_columns = [getattr(model, name) for name in key]
+    stmt = select(*[getattr(model, name) for name in selected]).where(*filters)
+
+    if cursor:
+        after = tuple_(*key_columns)
+        values = tuple_(*decode_cursor(cursor, len(key)))
+        stmt = stmt.where(after < values if descending else after > values)
+
+    order = [c.desc() if descending else c.asc() for c in key_columns]
+    stmt = stmt.order_by(*order)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+    rows = db.execute(stmt).mappings().all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][name] for name in key)
+
+    return [{name: row[name] for name in fields} for row in rows], next_cursor
@@ -0,0 +1,19 @@
+"""Vendors that operate under several registrable domains.
+
+A benefit recorded against any of a vendor's domains applies on all of them.
+Rows in the vendors table with the same name are merged with these groups.
+"""
+
+VENDOR_ALIASES = {
+    "Amazon": ["amazon.co.uk", "amazon.com", "amazon.de", "amazon.fr", "amzn.to"],
+    "eBay": ["ebay.co.uk", "ebay.com"],
+    "Expedia": ["expedia.co.uk", "expedia.com"],
+    "Deliveroo": ["deliveroo.co.uk", "deliveroo.com"],
+    "Google": ["google.com", "google.co.uk"],
+    "Microsoft": ["microsoft.com", "xbox.com"],
+    "Disney+": ["disneyplus.com", "disney.co.uk"],
+    "Tesco": ["tesco.com", "tesco.ie"],
+    "American Express": ["americanexpress.com", "amex.co.uk"],
+    "British Airways": ["britishairways.com", "ba.com"],
+    "Trainline": ["thetrainline.com", "trainline.com"],
+}
@@ -5,7 +5,14 @@ from app.models.benefit import Benefit
 from app.models.user_membership import UserMembership
 from app.models.vendor import Vendor
 from app.models.recommendation import Recommendation, RecommendationKind
-from app.models.analytics import AnalyticsEvent
+from app.models.analytics import (
+    AnalyticsEvent,
+    AnalyticsDailyCount,
+    AnalyticsDailyUsers,
+    AffiliateClickDaily,
+)
+from app.models.statement_job import StatementJob
+from app.models.merchant_descriptor import MerchantDescriptor
 
 __all__ = [
     "User",
@@ -18,4 +25,9 @@ __all__ = [
     "Recommendation",
     "RecommendationKind",
     "AnalyticsEvent",
+    "AnalyticsDailyCount",
+    "AnalyticsDailyUsers",
+    "AffiliateClickDaily",
+    "StatementJob",
+    "MerchantDescriptor",
 ]
@@ -1,22 +1,57 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy import BigInteger, Column, Date, DateTime, Index, Integer, LargeBinary, String
 from sqlalchemy.dialects.postgresql import JSONB
 from app.core.db import Base
 
 
 class AnalyticsEvent(Base):
+    """Raw events, range-partitioned by month on created_at (see analytics_partitions)."""
+
     __tablename__ = "analytics_events"
 
-    id = Column(Integer, primary_key=True, index=True)
-    event_name = Column(
-        String, nullable=False, index=True
-    )  # 'login', 'affiliate_click', etc.
-    user_id = Column(Integer, nullable=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_name = Column(String, nullable=False)  # 'login', 'affiliate_click', etc.
+    user_id = Column(Integer, nullable=True)
     source = Column(String, nullable=True)  # 'web', 'extension', 'api'
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    # Partition key, so part of the primary key
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
     payload = Column(JSONB, nullable=True)  # Additional event data
 
     __table_args__ = (
         Index("idx_events_name_date", "event_name", "created_at"),
         Index("idx_events_user_date", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+
+
+class AnalyticsDailyCount(Base):
+    """Events per UTC day, event name and source (maintained on ingest)."""
+
+    __tablename__ = "analytics_daily_counts"
+
+    day = Column(Date, primary_key=True)
+    event_name = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)  # '' when the event had no source
+    events = Column(BigInteger, nullable=False, default=0)
+
+
+class AnalyticsDailyUsers(Base):
+    """HyperLogLog sketch of the distinct users seen per UTC day."""
+
+    __tablename__ = "analytics_daily_users"
+
+    day = Column(Date, primary_key=True)
+    users_hll = Column(LargeBinary, nullable=False)
+
+
+class AffiliateClickDaily(Base):
+    """Affiliate clicks per UTC day and clicked item, with a distinct-user sketch."""
+
+    __tablename__ = "affiliate_click_daily"
+
+    day = Column(Date, primary_key=True)
+    item_type = Column(String, primary_key=True)  # 'benefit', 'membership', 'unknown'
+    item_id = Column(String, primary_key=True)  # payload id as text, '' if missing
+    item_name = Column(String, nullable=True)
+    clicks = Column(BigInteger, nullable=False, default=0)
+    users_hll = Column(LargeBinary, nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Float, Index
 from app.core.db import Base
 
 
@@ -28,3 +28,6 @@ class Benefit(Base):
     partner_name = Column(String, nullable=True)  # Affiliate network/partner name
     commission_notes = Column(Text, nullable=True)  # Commission details
 
+    __table_args__ = (
+        Index("idx_benefits_membership_id", "membership_id", "id"),
+    )
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from app.core.db import Base
+
+
+class MerchantDescriptor(Base):
+    """Learned mapping from a normalized statement descriptor to a membership."""
+
+    __tablename__ = "merchant_descriptors"
+
+    descriptor = Column(String, primary_key=True)  # See merchant_descriptors.normalize_descriptor
+    membership_id = Column(
+        Integer, ForeignKey("memberships.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    frequency = Column(String, nullable=True)  # 'monthly', 'annual'
+    confirmations = Column(Integer, nullable=False, default=1)  # Net confirmed matches
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
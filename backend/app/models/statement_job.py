@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB
+from app.core.db import Base
+
+
+class StatementJob(Base):
+    """Background processing of one uploaded bank statement (see statement_jobs)."""
+
+    __tablename__ = "statement_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, handed to the client
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    filename = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the uploaded file
+    status = Column(String, nullable=False, default="queued")  # queued, running, completed, failed
+    stage = Column(String, nullable=False, default="queued")  # Current step, see STAGES
+    subscriptions_total = Column(Integer, nullable=True)  # Known once the statement is analyzed
+    results = Column(JSONB, nullable=False, default=list)  # Per-subscription outcomes so far
+    result = Column(JSONB, nullable=True)  # Final upload response once completed
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_statement_jobs_user_created", "user_id", "created_at"),
+        Index("idx_statement_jobs_status_updated", "status", "updated_at"),
+        Index("idx_statement_jobs_user_hash", "user_id", "content_hash", "created_at"),
+        # At most one in-flight job per statement, so concurrent duplicate
+        # uploads attach to the same job
+        Index(
+            "uq_statement_jobs_user_hash_active",
+            "user_id",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
@@ -9,7 +9,7 @@ from app.schemas.auth import (
     UserUpdate,
 )
 from app.schemas.membership import MembershipCreate, MembershipRead
-from app.schemas.benefit import BenefitCreate, BenefitRead
+from app.schemas.benefit import BenefitCreate, BenefitFields, BenefitRead
 from app.schemas.user_membership import UserMembershipCreate, UserMembershipRead
 from app.schemas.vendor import VendorCreate, VendorRead
 from app.schemas.recommendation import Recommendation
@@ -27,6 +27,7 @@ __all__ = [
     "MembershipRead",
     "BenefitCreate",
     "BenefitRead",
+    "BenefitFields",
     "UserMembershipCreate",
     "UserMembershipRead",
     "VendorCreate",
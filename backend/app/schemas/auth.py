@@ -62,9 +62,9 @@ class AdminUserUpdate(BaseModel):
 
 
 class UserListResponse(BaseModel):
-    """Schema for paginated user list."""
+    """Schema for keyset-paginated user list."""
 
     users: list[UserRead]
-    total: int
-    page: int
+    next_cursor: Optional[str] = None
     page_size: int
+    total: Optional[int] = None
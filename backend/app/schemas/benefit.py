@@ -25,3 +25,14 @@ class BenefitRead(BaseModel):
     
     model_config = {"from_attributes": True}
 
+
+class BenefitFields(BaseModel):
+    """A benefit restricted to the columns requested with `fields=` (unset ones are omitted)."""
+    id: Optional[int] = None
+    membership_id: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    vendor_domain: Optional[str] = None
+    category: Optional[str] = None
+    source_url: Optional[str] = None
+    expires_at: Optional[datetime] = None
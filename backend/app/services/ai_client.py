@@ -7,6 +7,7 @@ except ImportError:
     orjson = None
 from cachetools import TTLCache
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
 
 # Get shared OpenAI client
 client = get_openai_client()
@@ -47,11 +48,14 @@ def _call(
 
     # Check cache
     if key in cache:
+        llm_metrics.record_cache_hit("ai_client", model)
         return cache[key]
 
     # Call API
     try:
-        response = client.chat.completions.create(
+        response = llm_metrics.chat_completion(
+            "ai_client",
+            client,
             model=model,
             messages=messages,
             temperature=temperature,
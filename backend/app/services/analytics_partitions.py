@@ -0,0 +1,144 @@
+"""Monthly partition maintenance for analytics_events.
+
+analytics_events is range-partitioned by month on created_at, so inserts and
+recent-window queries only touch the current month's small partition and old
+data is removed by dropping whole partitions instead of DELETE + vacuum.
+
+- ensure_partitions() creates the partitions for the current month and the
+  next few months (run at startup and by the daily retention job). Events
+  outside every partition land in analytics_events_default and are moved out
+  when their month's partition is created.
+- apply_retention() drops (or detaches) partitions older than the retention
+  window, but only once the daily rollups account for every event in them.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, text
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import AnalyticsDailyCount
+from app.services.analytics_rollups import backfill_rollups
+
+
+_PARTITION_NAME = re.compile(r"^analytics_events_y(\d{4})m(\d{2})$")
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _current_month() -> date:
+    return datetime.utcnow().date().replace(day=1)
+
+
+def ensure_partitions(months_ahead: Optional[int] = None) -> List[str]:
+    """
+    Create the monthly partitions from the current month up to months_ahead.
+
+    Args:
+        months_ahead: Future months to pre-create (default: analytics_partitions_ahead)
+
+    Returns:
+        Names of the partitions ensured
+    """
+    if months_ahead is None:
+        months_ahead = settings.analytics_partitions_ahead
+    month = _current_month()
+    names = []
+    with engine.begin() as conn:
+        for offset in range(months_ahead + 1):
+            names.append(
+                conn.execute(
+                    text("SELECT create_analytics_partition(:month)"),
+                    {"month": _add_months(month, offset)},
+                ).scalar()
+            )
+    return names
+
+
+def list_partitions(conn) -> Dict[str, date]:
+    """Monthly partitions currently attached to analytics_events (name -> month)."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'analytics_events'::regclass"
+        )
+    ).scalars()
+    partitions = {}
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return partitions
+
+
+def _rolled_up(conn, name: str, month: date) -> bool:
+    next_month = _add_months(month, 1)
+    raw = conn.execute(text(f'SELECT count(*) FROM "{name}"')).scalar()
+    rolled = conn.execute(
+        select(func.coalesce(func.sum(AnalyticsDailyCount.events), 0)).where(
+            AnalyticsDailyCount.day >= month,
+            AnalyticsDailyCount.day < next_month,
+        )
+    ).scalar()
+    return raw == rolled
+
+
+def apply_retention(
+    retention_months: Optional[int] = None, detach_only: bool = False, dry_run: bool = False
+) -> Dict[str, List[str]]:
+    """
+    Drop or detach analytics_events partitions older than the retention window.
+
+    A partition is only removed once the daily rollups hold exactly as many
+    events as it does; otherwise its month is re-rolled up from the raw events
+    first, so dashboards keep their history after the raw data is gone.
+
+    Args:
+        retention_months: Whole months of raw events to keep besides the current
+            one (default: analytics_retention_months)
+        detach_only: Detach partitions (keeping them as standalone tables to
+            archive) instead of dropping them
+        dry_run: Only report what would be removed
+
+    Returns:
+        Dict with the "removed" and "rolled_up" partition names
+    """
+    if retention_months is None:
+        retention_months = settings.analytics_retention_months
+    cutoff = _add_months(_current_month(), -retention_months)
+
+    with engine.connect() as conn:
+        expired = sorted(
+            (month, name) for name, month in list_partitions(conn).items() if month < cutoff
+        )
+
+    result = {"removed": [], "rolled_up": []}
+    for month, name in expired:
+        with engine.connect() as conn:
+            complete = _rolled_up(conn, name, month)
+        if not complete:
+            print(f"📊 Rolling up {name} before retention")
+            result["rolled_up"].append(name)
+            if not dry_run:
+                backfill_rollups(month, _add_months(month, 1) - timedelta(days=1))
+
+        if dry_run:
+            print(f"🔍 [DRY RUN] Would {'detach' if detach_only else 'drop'} {name}")
+            result["removed"].append(name)
+            continue
+
+        with engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE analytics_events DETACH PARTITION "{name}"'))
+            if not detach_only:
+                conn.execute(text(f'DROP TABLE "{name}"'))
+        print(f"🗑️  {'Detached' if detach_only else 'Dropped'} {name}")
+        result["removed"].append(name)
+
+    return result
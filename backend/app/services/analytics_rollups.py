@@ -0,0 +1,323 @@
+"""Daily analytics rollups maintained from the event stream.
+
+Every event buffer flush folds its events into three rollup tables in the same
+transaction as the raw INSERT, so the rollups stay consistent with
+analytics_events:
+
+- analytics_daily_counts: events per day, event name and source
+- analytics_daily_users: HyperLogLog sketch of distinct users per day
+- affiliate_click_daily: affiliate clicks per day and item, with a user sketch
+
+Admin dashboards read the rollups, whose size grows with days x distinct keys
+rather than with raw event volume. backfill_rollups() rebuilds them from
+analytics_events for historical days.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.db import engine
+from app.models import (
+    AffiliateClickDaily,
+    AnalyticsDailyCount,
+    AnalyticsDailyUsers,
+    AnalyticsEvent,
+)
+from app.services.hll import HyperLogLog
+
+
+AFFILIATE_CLICK = "affiliate_click"
+
+_EMPTY_SKETCH = HyperLogLog().to_bytes()
+
+
+@dataclass
+class _ItemClicks:
+    name: Optional[str] = None
+    clicks: int = 0
+    users: HyperLogLog = field(default_factory=HyperLogLog)
+
+
+@dataclass
+class RollupDelta:
+    """Rollup increments accumulated from a batch of events."""
+
+    counts: Dict[Tuple[date, str, str], int] = field(default_factory=dict)
+    users: Dict[date, HyperLogLog] = field(default_factory=dict)
+    clicks: Dict[Tuple[date, str, str], _ItemClicks] = field(default_factory=dict)
+
+    def add(self, event: Mapping[str, Any]) -> None:
+        day = event["created_at"].date()
+        user_id = event.get("user_id")
+
+        count_key = (day, event["event_name"], event.get("source") or "")
+        self.counts[count_key] = self.counts.get(count_key, 0) + 1
+
+        if user_id is not None:
+            self.users.setdefault(day, HyperLogLog()).add(user_id)
+
+        if event["event_name"] == AFFILIATE_CLICK:
+            payload = event.get("payload") or {}
+            item_id = payload.get("id")
+            item_key = (
+                day,
+                str(payload.get("type") or "unknown"),
+                "" if item_id is None else str(item_id),
+            )
+            item = self.clicks.setdefault(item_key, _ItemClicks())
+            item.name = payload.get("name") or item.name
+            item.clicks += 1
+            if user_id is not None:
+                item.users.add(user_id)
+
+
+def aggregate_events(events: Iterable[Mapping[str, Any]]) -> RollupDelta:
+    """Fold analytics_events rows (column dicts) into rollup increments."""
+    delta = RollupDelta()
+    for event in events:
+        delta.add(event)
+    return delta
+
+
+def apply_rollups(conn, delta: RollupDelta) -> None:
+    """
+    Add rollup increments inside the caller's transaction.
+
+    Counters are upserted with ON CONFLICT ... DO UPDATE. Sketches cannot be
+    merged in SQL, so their rows are created if missing and then locked with
+    SELECT ... FOR UPDATE, merged and written back. Tables are always touched
+    in the same order as the backfill's LOCK TABLE to avoid deadlocks.
+    """
+    if delta.counts:
+        table = AnalyticsDailyCount.__table__
+        stmt = insert(table).values(
+            [
+                {"day": day, "event_name": name, "source": source, "events": n}
+                for (day, name, source), n in delta.counts.items()
+            ]
+        )
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.day, table.c.event_name, table.c.source],
+                set_={"events": table.c.events + stmt.excluded.events},
+            )
+        )
+
+    if delta.users:
+        table = AnalyticsDailyUsers.__table__
+        conn.execute(
+            insert(table)
+            .values([{"day": day, "users_hll": _EMPTY_SKETCH} for day in delta.users])
+            .on_conflict_do_nothing()
+        )
+        current = conn.execute(
+            select(table.c.day, table.c.users_hll)
+            .where(table.c.day.in_(list(delta.users)))
+            .with_for_update()
+        ).all()
+        conn.execute(
+            update(table)
+            .where(table.c.day == bindparam("b_day"))
+            .values(users_hll=bindparam("b_hll")),
+            [
+                {
+                    "b_day": day,
+                    "b_hll": HyperLogLog(sketch).merge(delta.users[day]).to_bytes(),
+                }
+                for day, sketch in current
+            ],
+        )
+
+    if delta.clicks:
+        table = AffiliateClickDaily.__table__
+        conn.execute(
+            insert(table)
+            .values(
+                [
+                    {
+                        "day": day,
+                        "item_type": item_type,
+                        "item_id": item_id,
+                        "users_hll": _EMPTY_SKETCH,
+                    }
+                    for day, item_type, item_id in delta.clicks
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        key = tuple_(table.c.day, table.c.item_type, table.c.item_id)
+        current = conn.execute(
+            select(
+                table.c.day,
+                table.c.item_type,
+                table.c.item_id,
+                table.c.item_name,
+                table.c.clicks,
+                table.c.users_hll,
+            )
+            .where(key.in_(list(delta.clicks)))
+            .with_for_update()
+        ).all()
+        params = []
+        for day, item_type, item_id, name, clicks, sketch in current:
+            item = delta.clicks[(day, item_type, item_id)]
+            params.append(
+                {
+                    "b_day": day,
+                    "b_type": item_type,
+                    "b_id": item_id,
+                    "b_name": item.name or name,
+                    "b_clicks": clicks + item.clicks,
+                    "b_hll": HyperLogLog(sketch).merge(item.users).to_bytes(),
+                }
+            )
+        conn.execute(
+            update(table)
+            .where(
+                table.c.day == bindparam("b_day"),
+                table.c.item_type == bindparam("b_type"),
+                table.c.item_id == bindparam("b_id"),
+            )
+            .values(
+                item_name=bindparam("b_name"),
+                clicks=bindparam("b_clicks"),
+                users_hll=bindparam("b_hll"),
+            ),
+            params,
+        )
+
+
+def window_start(days: int) -> date:
+    """First UTC day of a window of `days` calendar days ending today."""
+    return (datetime.utcnow() - timedelta(days=days - 1)).date()
+
+
+def read_overview(db: Session, start_day: date) -> Dict[str, Any]:
+    """
+    Event totals and distinct users since start_day, from the rollups.
+
+    Returns:
+        Dict with total_events, unique_users, affiliate_clicks and events_by_type
+    """
+    rows = db.execute(
+        select(AnalyticsDailyCount.event_name, func.sum(AnalyticsDailyCount.events))
+        .where(AnalyticsDailyCount.day >= start_day)
+        .group_by(AnalyticsDailyCount.event_name)
+    ).all()
+    events_by_type = {name: int(n) for name, n in rows}
+
+    users = HyperLogLog()
+    for (sketch,) in db.execute(
+        select(AnalyticsDailyUsers.users_hll).where(AnalyticsDailyUsers.day >= start_day)
+    ):
+        users.merge(HyperLogLog(sketch))
+
+    return {
+        "total_events": sum(events_by_type.values()),
+        "unique_users": users.count(),
+        "affiliate_clicks": events_by_type.get(AFFILIATE_CLICK, 0),
+        "events_by_type": events_by_type,
+    }
+
+
+def read_affiliate_report(db: Session, start_day: date) -> List[Dict[str, Any]]:
+    """
+    Affiliate clicks and distinct users per item since start_day, most clicked first.
+
+    Returns:
+        List of dicts with type, id, name, total_clicks and unique_users
+    """
+    items: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    rows = db.execute(
+        select(
+            AffiliateClickDaily.item_type,
+            AffiliateClickDaily.item_id,
+            AffiliateClickDaily.item_name,
+            AffiliateClickDaily.clicks,
+            AffiliateClickDaily.users_hll,
+        )
+        .where(AffiliateClickDaily.day >= start_day)
+        .order_by(AffiliateClickDaily.day)
+    )
+    for item_type, item_id, name, clicks, sketch in rows:
+        item = items.setdefault(
+            (item_type, item_id),
+            {"name": None, "clicks": 0, "users": HyperLogLog()},
+        )
+        item["name"] = name or item["name"]
+        item["clicks"] += clicks
+        item["users"].merge(HyperLogLog(sketch))
+
+    report = [
+        {
+            "type": item_type,
+            "id": int(item_id) if item_id.isdigit() else (item_id or None),
+            "name": item["name"] or "Unknown",
+            "total_clicks": item["clicks"],
+            "unique_users": item["users"].count(),
+        }
+        for (item_type, item_id), item in items.items()
+    ]
+    report.sort(key=lambda x: x["total_clicks"], reverse=True)
+    return report
+
+
+def backfill_rollups(start_day: date, end_day: date, batch_size: int = 5000) -> int:
+    """
+    Rebuild the rollups for [start_day, end_day] from analytics_events.
+
+    Each day is rebuilt in its own transaction holding EXCLUSIVE locks on the
+    rollup tables, so concurrent flushes wait and then add their increments on
+    top of the rebuilt rows - nothing is counted twice or missed.
+
+    Args:
+        start_day: First UTC day to rebuild
+        end_day: Last UTC day to rebuild (inclusive)
+        batch_size: Rows fetched per round trip while streaming events
+
+    Returns:
+        Number of events folded into the rollups
+    """
+    columns = (
+        AnalyticsEvent.event_name,
+        AnalyticsEvent.user_id,
+        AnalyticsEvent.source,
+        AnalyticsEvent.payload,
+        AnalyticsEvent.created_at,
+    )
+    total = 0
+    day = start_day
+    while day <= end_day:
+        day_start = datetime.combine(day, time.min)
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "LOCK TABLE analytics_daily_counts, analytics_daily_users, "
+                    "affiliate_click_daily IN EXCLUSIVE MODE"
+                )
+            )
+            for model in (AnalyticsDailyCount, AnalyticsDailyUsers, AffiliateClickDaily):
+                conn.execute(delete(model).where(model.day == day))
+
+            delta = RollupDelta()
+            events = 0
+            result = conn.execution_options(yield_per=batch_size).execute(
+                select(*columns).where(
+                    AnalyticsEvent.created_at >= day_start,
+                    AnalyticsEvent.created_at < day_start + timedelta(days=1),
+                )
+            )
+            for event in result.mappings():
+                delta.add(event)
+                events += 1
+            apply_rollups(conn, delta)
+
+        print(f"📊 Rolled up {events} events for {day.isoformat()}")
+        total += events
+        day += timedelta(days=1)
+    return total
@@ -2,17 +2,145 @@
 
 import io
 import re
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, Tuple, TypeVar
 from datetime import datetime
+from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
+from app.services.membership_name_index import get_membership_name_index
+from app.services.merchant_descriptors import lookup_descriptors, normalize_descriptor
+from app.services.pdf_pool import PAGE_BREAK
+from app.services.recurrence import detect_recurring
+from app.services.transaction_tokenizer import tokenize_transactions
 
 try:
     import pdfplumber
 except ImportError:
     pdfplumber = None
 
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
 openai_client = get_openai_client()
 
+T = TypeVar("T")
+
+# Worker threads for concurrent per-chunk LLM calls (shared by all statements)
+_llm_pool = ThreadPoolExecutor(
+    max_workers=settings.statement_llm_concurrency, thread_name_prefix="statement-llm"
+)
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of text for the extraction model (about 4 chars/token without tiktoken)."""
+    global _encoding
+    if _encoding is None:
+        try:
+            _encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def _pack(pieces: List[str], budget: int) -> List[Tuple[int, int]]:
+    """Greedily group consecutive pieces into (start, end) ranges under a token budget."""
+    ranges = []
+    start = 0
+    used = 0
+    for i, piece in enumerate(pieces):
+        tokens = estimate_tokens(piece) + 1
+        if i > start and used + tokens > budget:
+            ranges.append((start, i))
+            start, used = i, 0
+        used += tokens
+    if start < len(pieces):
+        ranges.append((start, len(pieces)))
+    return ranges
+
+
+def chunk_statement_text(text: str, max_tokens: Optional[int] = None) -> List[str]:
+    """
+    Split statement text into chunks under a token budget.
+    
+    Whole pages are kept together where they fit; longer pages are split
+    between lines, so a transaction is never cut in half.
+    
+    Args:
+        text: Extracted statement text (pages separated by PAGE_BREAK)
+        max_tokens: Budget per chunk (default: statement_llm_chunk_tokens)
+        
+    Returns:
+        Non-empty chunks in statement order
+    """
+    budget = max_tokens or settings.statement_llm_chunk_tokens
+    pieces: List[str] = []
+    for page in text.split(PAGE_BREAK):
+        page = page.strip("\n")
+        if not page.strip():
+            continue
+        if estimate_tokens(page) <= budget:
+            pieces.append(page)
+        else:
+            pieces.extend(line for line in page.split("\n") if line.strip())
+    return ["\n".join(pieces[start:end]) for start, end in _pack(pieces, budget)]
+
+
+# The JSON for a transaction is about twice as long as its statement line
+OUTPUT_TOKENS_PER_INPUT_TOKEN = 3
+MAX_OUTPUT_TOKENS = 16000  # gpt-4o-mini completion limit (16,384)
+
+
+def _response_text(response) -> str:
+    """Content of a chat completion; a response cut off at max_tokens is an error."""
+    choice = response.choices[0]
+    if choice.finish_reason == "length":
+        raise ValueError("LLM response was truncated at max_tokens")
+    return choice.message.content.strip()
+
+
+def map_chunks(fn: Callable[[str], T], chunks: List[str]) -> List[Any]:
+    """Run fn over chunks concurrently; each result is fn's return value or its exception."""
+    if len(chunks) == 1:
+        try:
+            return [fn(chunks[0])]
+        except Exception as e:
+            return [e]
+    futures = [_llm_pool.submit(fn, chunk) for chunk in chunks]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def merge_subscriptions(subscriptions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Dedupe subscriptions found in several chunks, keeping the most confident of each."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for subscription in subscriptions:
+        name = subscription.get('membership_name')
+        if not name:
+            continue
+        key = normalize_descriptor(str(name)) or str(name).lower()
+        current = merged.get(key)
+        if current is None or _confidence(subscription) > _confidence(current):
+            merged[key] = subscription
+    return list(merged.values())
+
+
+def _confidence(subscription: Dict[str, Any]) -> float:
+    try:
+        return float(subscription.get('confidence') or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
 
 def extract_text_from_pdf(pdf_file) -> str:
     """
@@ -37,7 +165,7 @@ def extract_text_from_pdf(pdf_file) -> str:
             for page in pdf.pages:
                 page_text = page.extract_text()
                 if page_text:
-                    text += page_text + "\n"
+                    text += page_text + "\n" + PAGE_BREAK
     except Exception as e:
         raise ValueError(f"Failed to parse PDF: {str(e)}")
     
@@ -50,8 +178,7 @@ def extract_transactions(text: str) -> List[Dict[str, Any]]:
     
     Looks for patterns like:
     - Date + Description + Amount
-    - Recurring monthly charges
-    - Subscription payments
+    - Description + Amount (when the statement has no dated lines)
     
     Args:
         text: Extracted text from PDF
@@ -59,149 +186,19 @@ def extract_transactions(text: str) -> List[Dict[str, Any]]:
     Returns:
         List of potential transactions with date, description, amount
     """
-    transactions = []
-    
-    # Common date patterns (DD/MM/YYYY, DD-MM-YYYY, DD MMM YYYY, etc.)
-    date_patterns = [
-        r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}',  # DD/MM/YYYY or DD-MM-YYYY
-        r'\d{1,2}\s+\w{3}\s+\d{4}',  # DD MMM YYYY
-        r'\d{4}[/-]\d{1,2}[/-]\d{1,2}',  # YYYY/MM/DD
-        r'\d{1,2}\s+\w{3}',  # DD MMM (without year)
-    ]
-    
-    # Amount patterns (currency symbols, negative/positive)
-    amount_patterns = [
-        r'[£$€]\s*\d+\.\d{2}',  # £12.99, $9.99, €5.00
-        r'-\s*[£$€]\s*\d+\.\d{2}',  # -£12.99 (debit)
-        r'\d+\.\d{2}\s*[£$€]',  # 12.99£
-        r'\(\d+\.\d{2}\)',  # (12.99) negative amount
-        r'[£$€]\s*\d+,\d{2}',  # £12,99 (comma decimal)
-        r'\d+\.\d{2}',  # Just numbers with decimal (12.99)
-        r'\d+,\d{2}',  # Just numbers with comma (12,99)
-    ]
-    
-    lines = text.split('\n')
-    
-    # Try to find transactions line by line
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line or len(line) < 10:
-            continue
-        
-        # Look for date + description + amount pattern
-        for date_pattern in date_patterns:
-            date_match = re.search(date_pattern, line)
-            if date_match:
-                for amount_pattern in amount_patterns:
-                    amount_match = re.search(amount_pattern, line)
-                    if amount_match:
-                        # Extract date
-                        date_str = date_match.group()
-                        
-                        # Extract amount
-                        amount_str = amount_match.group()
-                        # Clean amount - handle both comma and dot decimals
-                        amount_clean = re.sub(r'[£$€\s()]', '', amount_str)
-                        # Replace comma with dot for decimal
-                        amount_clean = amount_clean.replace(',', '.')
-                        # Handle negative
-                        is_negative = '-' in amount_str or '(' in amount_str
-                        amount_clean = amount_clean.replace('-', '')
-                        
-                        try:
-                            amount = float(amount_clean)
-                            if is_negative:
-                                amount = -amount
-                            
-                            # Extract description (everything between date and amount)
-                            date_end = date_match.end()
-                            amount_start = amount_match.start()
-                            description = line[date_end:amount_start].strip()
-                            
-                            # Clean description
-                            description = re.sub(r'\s+', ' ', description)
-                            
-                            if description and len(description) > 2:
-                                transactions.append({
-                                    'date': date_str,
-                                    'description': description,
-                                    'amount': abs(amount),  # Use absolute value
-                                    'raw_line': line,
-                                })
-                                break  # Found a match, move to next line
-                        except ValueError:
-                            pass
-    
-    # If no transactions found with date patterns, try simpler pattern matching
-    # Look for lines with amounts that might be transactions
-    if not transactions:
-        print("No transactions found with date patterns, trying simpler extraction...")
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line or len(line) < 5:
-                continue
-            
-            # Look for amount patterns
-            for amount_pattern in amount_patterns:
-                amount_match = re.search(amount_pattern, line)
-                if amount_match:
-                    # Extract amount
-                    amount_str = amount_match.group()
-                    amount_clean = re.sub(r'[£$€\s()]', '', amount_str)
-                    amount_clean = amount_clean.replace(',', '.')
-                    is_negative = '-' in amount_str or '(' in amount_str
-                    amount_clean = amount_clean.replace('-', '')
-                    
-                    try:
-                        amount = float(amount_clean)
-                        if is_negative:
-                            amount = -amount
-                        
-                        # Extract description (everything except the amount)
-                        amount_start = amount_match.start()
-                        description = line[:amount_start].strip()
-                        description = re.sub(r'\s+', ' ', description)
-                        
-                        # Skip if description is too short or looks like a header
-                        if (description and len(description) > 2 and 
-                            not description.lower().startswith(('date', 'description', 'amount', 'balance', 'transaction'))):
-                            transactions.append({
-                                'date': '',
-                                'description': description,
-                                'amount': abs(amount),
-                                'raw_line': line,
-                            })
-                            break
-                    except ValueError:
-                        pass
+    transactions = [t.to_dict() for t in tokenize_transactions(text)]
     
     # Debug: print first few lines if no transactions found
     if not transactions:
         print(f"Debug: First 20 lines of extracted text:")
-        for i, line in enumerate(lines[:20]):
+        for i, line in enumerate(text.split('\n')[:20]):
             print(f"  {i}: {line}")
     
     return transactions
 
 
-def extract_transactions_with_llm(text: str) -> List[Dict[str, Any]]:
-    """
-    Use LLM to extract transactions directly from bank statement text.
-    More robust than regex patterns as it can handle various formats.
-    
-    Args:
-        text: Extracted text from PDF
-        
-    Returns:
-        List of transactions with date, description, amount
-    """
-    if not openai_client:
-        # Fallback to regex-based extraction
-        return extract_transactions(text)
-    
-    # Limit text to avoid token limits (keep first 8000 chars which should cover most statements)
-    text_sample = text[:8000]
-    
+def _extract_transactions_chunk(text_sample: str) -> List[Dict[str, Any]]:
+    """LLM transaction extraction for one chunk of statement text (raises on failure)."""
     prompt = f"""Extract all transactions from this bank statement text. Return ONLY a JSON array of transactions.
 
 Bank Statement Text:
@@ -222,77 +219,92 @@ Return format (JSON array only, no other text):
 Only include actual transactions (debits/credits), not headers, balances, or summary lines.
 If no transactions found, return empty array []."""
 
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial data extraction assistant. Extract transactions from bank statements and return only valid JSON arrays."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1,  # Low temperature for consistent extraction
-            max_tokens=2000,
-        )
-        
-        result_text = response.choices[0].message.content.strip()
-        
-        # Parse JSON response
-        import json
-        # Remove markdown code blocks if present
-        if result_text.startswith("```"):
-            result_text = re.sub(r'^```json\n?', '', result_text)
-            result_text = re.sub(r'\n?```$', '', result_text)
-            result_text = result_text.strip()
-        
-        transactions = json.loads(result_text)
-        
-        if isinstance(transactions, list):
-            # Validate and clean transactions
-            cleaned = []
-            for txn in transactions:
-                if isinstance(txn, dict) and 'description' in txn and 'amount' in txn:
-                    try:
-                        amount = float(txn['amount'])
-                        if amount > 0:  # Only positive amounts
-                            cleaned.append({
-                                'date': txn.get('date', ''),
-                                'description': str(txn['description']).strip(),
-                                'amount': amount,
-                                'raw_line': f"{txn.get('date', '')} {txn['description']} {amount}",
-                            })
-                    except (ValueError, TypeError):
-                        pass
-            return cleaned
-        else:
-            return []
-            
-    except Exception as e:
-        print(f"LLM extraction failed: {e}, falling back to regex")
-        # Fallback to regex-based extraction
-        return extract_transactions(text)
+    response = llm_metrics.chat_completion(
+        "bank_statement_parser",
+        openai_client,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a financial data extraction assistant. Extract transactions from bank statements and return only valid JSON arrays."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.1,  # Low temperature for consistent extraction
+        # Every line of the chunk may be a transaction to echo back as JSON
+        max_tokens=min(
+            MAX_OUTPUT_TOKENS, 500 + OUTPUT_TOKENS_PER_INPUT_TOKEN * estimate_tokens(text_sample)
+        ),
+    )
+    
+    result_text = _response_text(response)
+    
+    # Parse JSON response
+    import json
+    # Remove markdown code blocks if present
+    if result_text.startswith("```"):
+        result_text = re.sub(r'^```json\n?', '', result_text)
+        result_text = re.sub(r'\n?```$', '', result_text)
+        result_text = result_text.strip()
+    
+    transactions = json.loads(result_text)
+    
+    if isinstance(transactions, list):
+        # Validate and clean transactions
+        cleaned = []
+        for txn in transactions:
+            if isinstance(txn, dict) and 'description' in txn and 'amount' in txn:
+                try:
+                    amount = float(txn['amount'])
+                    if amount > 0:  # Only positive amounts
+                        cleaned.append({
+                            'date': txn.get('date', ''),
+                            'description': str(txn['description']).strip(),
+                            'amount': amount,
+                            'raw_line': f"{txn.get('date', '')} {txn['description']} {amount}",
+                        })
+                except (ValueError, TypeError):
+                    pass
+        return cleaned
+    else:
+        return []
 
 
-def identify_subscriptions_with_llm(
-    transactions: List[Dict[str, Any]]
-) -> List[Dict[str, Any]]:
+def extract_transactions_with_llm(text: str) -> List[Dict[str, Any]]:
     """
-    Use LLM to identify which transactions are recurring subscriptions.
+    Use LLM to extract transactions directly from bank statement text.
+    More robust than regex patterns as it can handle various formats.
+    
+    Long statements are split into chunks (see chunk_statement_text) that are
+    extracted concurrently, so the whole statement is covered.
     
     Args:
-        transactions: List of extracted transactions
+        text: Extracted text from PDF
         
     Returns:
-        List of identified subscriptions with membership names
+        List of transactions with date, description, amount
     """
     if not openai_client:
-        # Fallback: simple pattern matching
-        return _identify_subscriptions_simple(transactions)
+        # Fallback to regex-based extraction
+        return extract_transactions(text)
     
-    # Group transactions by description similarity
-    # Prepare prompt for LLM
-    transaction_text = "\n".join([
-        f"- {t['date']}: {t['description']} - £{t['amount']:.2f}"
-        for t in transactions[:50]  # Limit to first 50 for cost
-    ])
+    chunks = chunk_statement_text(text)
+    transactions = []
+    for chunk, result in zip(chunks, map_chunks(_extract_transactions_chunk, chunks)):
+        if isinstance(result, Exception):
+            print(f"LLM extraction failed: {result}, falling back to regex")
+            llm_metrics.record_fallback("bank_statement_parser", "gpt-4o-mini")
+            # Fallback to regex-based extraction for this chunk
+            result = extract_transactions(chunk)
+        # Chunks don't overlap, so their transactions are simply concatenated
+        transactions.extend(result)
+    return transactions
+
+
+def _transaction_lines(transactions: List[Dict[str, Any]]) -> List[str]:
+    return [f"- {t['date']}: {t['description']} - £{t['amount']:.2f}" for t in transactions]
+
+
+def _identify_subscriptions_batch(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """LLM subscription identification for one batch of transactions (raises on failure)."""
+    transaction_text = "\n".join(_transaction_lines(transactions))
     
     prompt = f"""Analyze these bank statement transactions and identify recurring monthly subscriptions.
 
@@ -325,37 +337,67 @@ Only include transactions that are clearly subscriptions/memberships. Exclude:
 
 Return ONLY valid JSON, no other text."""
 
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial assistant that identifies recurring subscriptions from bank statements. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=2000,
-        )
-        
-        result_text = response.choices[0].message.content.strip()
-        
-        # Parse JSON response
-        import json
-        # Remove markdown code blocks if present
-        if result_text.startswith("```"):
-            result_text = re.sub(r'^```json\n?', '', result_text)
-            result_text = re.sub(r'\n?```$', '', result_text)
-        
-        subscriptions = json.loads(result_text)
+    response = llm_metrics.chat_completion(
+        "bank_statement_parser",
+        openai_client,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a financial assistant that identifies recurring subscriptions from bank statements. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.3,
+        max_tokens=2000,
+    )
+    
+    result_text = _response_text(response)
+    
+    # Parse JSON response
+    import json
+    # Remove markdown code blocks if present
+    if result_text.startswith("```"):
+        result_text = re.sub(r'^```json\n?', '', result_text)
+        result_text = re.sub(r'\n?```$', '', result_text)
+    
+    subscriptions = json.loads(result_text)
+    
+    if isinstance(subscriptions, list):
+        return subscriptions
+    else:
+        return []
+
+
+def identify_subscriptions_with_llm(
+    transactions: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Use LLM to identify which transactions are recurring subscriptions.
+    
+    Transactions are split into batches under the chunk token budget and the
+    batches are identified concurrently, so every transaction is considered.
+    
+    Args:
+        transactions: List of extracted transactions
         
-        if isinstance(subscriptions, list):
-            return subscriptions
-        else:
-            return []
-            
-    except Exception as e:
-        print(f"LLM identification failed: {e}")
-        # Fallback to simple matching
+    Returns:
+        List of identified subscriptions with membership names
+    """
+    if not openai_client:
+        # Fallback: simple pattern matching
         return _identify_subscriptions_simple(transactions)
+    
+    batches = [
+        transactions[start:end]
+        for start, end in _pack(_transaction_lines(transactions), settings.statement_llm_chunk_tokens)
+    ]
+    subscriptions = []
+    for batch, result in zip(batches, map_chunks(_identify_subscriptions_batch, batches)):
+        if isinstance(result, Exception):
+            print(f"LLM identification failed: {result}")
+            llm_metrics.record_fallback("bank_statement_parser", "gpt-4o-mini")
+            # Fallback to simple matching for this batch
+            result = _identify_subscriptions_simple(batch)
+        subscriptions.extend(result)
+    return merge_subscriptions(subscriptions)
 
 
 def _identify_subscriptions_simple(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -394,11 +436,99 @@ def _identify_subscriptions_simple(transactions: List[Dict[str, Any]]) -> List[D
     return subscriptions
 
 
+# Regular payments that are not subscriptions; left for the LLM to classify
+NOT_SUBSCRIPTIONS = re.compile(
+    r'\b(salary|wages|payroll|transfer|rent|mortgage|council tax|hmrc|interest|loan|'
+    r'savings|atm|cash|refund|credit card)\b'
+)
+
+
+def identify_subscriptions(transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Identify subscriptions, resolving known merchant descriptors locally.
+    
+    Descriptors are normalized and looked up in the learned descriptor map,
+    then confident recurring payments to catalog merchants are detected
+    locally; only the remaining transactions are sent to the LLM. Every subscription carries
+    its descriptor key so confirmed matches can be learned (see merchant_descriptors).
+    
+    Args:
+        transactions: List of extracted transactions
+        
+    Returns:
+        List of identified subscriptions; locally resolved ones include membership_id
+    """
+    keys = [normalize_descriptor(t['description']) for t in transactions]
+    by_descriptor: Dict[str, Dict[str, Any]] = {}
+    for key, transaction in zip(keys, transactions):
+        if key:
+            by_descriptor.setdefault(key, transaction)
+    
+    known = lookup_descriptors(by_descriptor)
+    subscriptions = [
+        {
+            'membership_name': mapping.membership_name,
+            'membership_id': mapping.membership_id,
+            'amount': by_descriptor[key]['amount'],
+            'frequency': mapping.frequency or 'monthly',
+            'confidence': 1.0,
+            'transaction_description': by_descriptor[key]['description'],
+            'descriptor': key,
+        }
+        for key, mapping in known.items()
+    ]
+    
+    # Charges that clearly recur (same merchant, regular interval, stable amount)
+    # at a catalog merchant don't need the LLM either; everything else does
+    candidates = [
+        payment
+        for payment in detect_recurring(
+            [t for key, t in zip(keys, transactions) if key not in known]
+        )
+        if payment.confidence >= settings.recurrence_min_confidence
+        and not NOT_SUBSCRIPTIONS.search(payment.descriptor)
+    ]
+    matches = (
+        get_membership_name_index().match_many([p.descriptor for p in candidates])
+        if candidates else []
+    )
+    recurring = []
+    for payment, match in zip(candidates, matches):
+        if match is None:
+            continue
+        recurring.append(payment)
+        subscriptions.append({
+            'membership_name': match.name,
+            'amount': payment.amount,
+            'frequency': payment.frequency,
+            'confidence': payment.confidence,
+            'transaction_description': payment.description,
+            'descriptor': payment.descriptor,
+        })
+    detected = known.keys() | {payment.descriptor for payment in recurring}
+    
+    # Every remaining transaction goes to the LLM, not one per descriptor: a key
+    # can still cover different services, and repeats help it judge recurrence
+    unknown = [t for key, t in zip(keys, transactions) if key not in detected]
+    print(
+        f"🧾 {len(known)} descriptors resolved locally, {len(recurring)} detected as recurring, "
+        f"{len(unknown)} transactions sent for identification"
+    )
+    if unknown:
+        for subscription in identify_subscriptions_with_llm(unknown):
+            description = subscription.get('transaction_description') or subscription.get('membership_name', '')
+            subscription['descriptor'] = normalize_descriptor(description)
+            subscriptions.append(subscription)
+    
+    return subscriptions
+
+
 def parse_bank_statement(pdf_file) -> Dict[str, Any]:
     """
     Main function to parse a bank statement PDF and extract subscriptions.
     
-    Uses LLM to extract transactions and identify subscriptions in one pass for efficiency.
+    Transactions are tokenized locally; subscriptions with known descriptors are
+    resolved from the learned descriptor map and the rest are identified by the LLM.
     
     Args:
         pdf_file: File-like object or bytes of PDF
@@ -409,23 +539,32 @@ def parse_bank_statement(pdf_file) -> Dict[str, Any]:
         - subscriptions: List of identified subscriptions
         - summary: Summary statistics
     """
-    # Extract text
-    text = extract_text_from_pdf(pdf_file)
+    return parse_statement_text(extract_text_from_pdf(pdf_file))
+
+
+def parse_statement_text(text: str) -> Dict[str, Any]:
+    """
+    Extract transactions and subscriptions from a statement's extracted text.
     
+    Args:
+        text: Text extracted from the statement PDF
+        
+    Returns:
+        Same dictionary as parse_bank_statement
+    """
     if not text or len(text) < 100:
         raise ValueError("PDF appears to be empty or unreadable")
     
-    # Use LLM to extract transactions AND identify subscriptions in one call (more efficient)
-    if openai_client:
+    # Tokenize locally so known descriptors skip the LLM
+    transactions = extract_transactions(text)
+    if transactions:
+        subscriptions = identify_subscriptions(transactions)
+    elif openai_client:
+        # Layout the tokenizer doesn't recognize: let the LLM read the raw text
         subscriptions = extract_subscriptions_directly_with_llm(text)
-        # Extract all transactions for summary (use simpler extraction)
         transactions = extract_transactions_with_llm(text)
     else:
-        # Fallback: extract transactions first, then identify subscriptions
-        transactions = extract_transactions(text)
-        if not transactions:
-            raise ValueError("No transactions found in bank statement")
-        subscriptions = identify_subscriptions_with_llm(transactions)
+        raise ValueError("No transactions found in bank statement")
     
     if not subscriptions and not transactions:
         raise ValueError("No transactions found in bank statement")
@@ -445,23 +584,8 @@ def parse_bank_statement(pdf_file) -> Dict[str, Any]:
     }
 
 
-def extract_subscriptions_directly_with_llm(text: str) -> List[Dict[str, Any]]:
-    """
-    Use LLM to extract subscriptions directly from bank statement text in one pass.
-    More efficient than extracting all transactions then filtering.
-    
-    Args:
-        text: Extracted text from PDF
-        
-    Returns:
-        List of identified subscriptions
-    """
-    if not openai_client:
-        return []
-    
-    # Limit text to avoid token limits
-    text_sample = text[:8000]
-    
+def _extract_subscriptions_chunk(text_sample: str) -> List[Dict[str, Any]]:
+    """LLM subscription extraction for one chunk of statement text (raises on failure)."""
     prompt = f"""Analyze this bank statement and extract ONLY recurring monthly/annual subscriptions.
 
 Bank Statement Text:
@@ -491,54 +615,78 @@ Return format (JSON array only, no other text):
 
 If no subscriptions found, return empty array []."""
 
-    try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a financial assistant that identifies recurring subscriptions from bank statements. Return only valid JSON arrays."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,  # Low temperature for consistent extraction
-            max_tokens=2000,
-        )
-        
-        result_text = response.choices[0].message.content.strip()
-        
-        # Parse JSON response
-        import json
-        # Remove markdown code blocks if present
-        if result_text.startswith("```"):
-            result_text = re.sub(r'^```json\n?', '', result_text)
-            result_text = re.sub(r'\n?```$', '', result_text)
-            result_text = result_text.strip()
-        
-        subscriptions = json.loads(result_text)
-        
-        if isinstance(subscriptions, list):
-            # Validate and clean subscriptions
-            cleaned = []
-            for sub in subscriptions:
-                if isinstance(sub, dict) and 'membership_name' in sub and 'amount' in sub:
-                    try:
-                        amount = float(sub['amount'])
-                        confidence = float(sub.get('confidence', 0.7))
-                        if amount > 0 and confidence >= 0.5:  # Only include confident matches
-                            cleaned.append({
-                                'membership_name': str(sub['membership_name']).strip(),
-                                'amount': amount,
-                                'frequency': sub.get('frequency', 'monthly'),
-                                'confidence': confidence,
-                                'transaction_description': sub.get('transaction_description', sub['membership_name']),
-                            })
-                    except (ValueError, TypeError):
-                        pass
-            return cleaned
-        else:
-            return []
-            
-    except Exception as e:
-        print(f"LLM direct subscription extraction failed: {e}")
-        # Fallback: extract transactions then identify subscriptions
-        transactions = extract_transactions(text)
-        return identify_subscriptions_with_llm(transactions) if transactions else []
+    response = llm_metrics.chat_completion(
+        "bank_statement_parser",
+        openai_client,
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are a financial assistant that identifies recurring subscriptions from bank statements. Return only valid JSON arrays."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.2,  # Low temperature for consistent extraction
+        max_tokens=2000,
+    )
+    
+    result_text = _response_text(response)
+    
+    # Parse JSON response
+    import json
+    # Remove markdown code blocks if present
+    if result_text.startswith("```"):
+        result_text = re.sub(r'^```json\n?', '', result_text)
+        result_text = re.sub(r'\n?```$', '', result_text)
+        result_text = result_text.strip()
+    
+    subscriptions = json.loads(result_text)
+    
+    if isinstance(subscriptions, list):
+        # Validate and clean subscriptions
+        cleaned = []
+        for sub in subscriptions:
+            if isinstance(sub, dict) and 'membership_name' in sub and 'amount' in sub:
+                try:
+                    amount = float(sub['amount'])
+                    confidence = float(sub.get('confidence', 0.7))
+                    if amount > 0 and confidence >= 0.5:  # Only include confident matches
+                        cleaned.append({
+                            'membership_name': str(sub['membership_name']).strip(),
+                            'amount': amount,
+                            'frequency': sub.get('frequency', 'monthly'),
+                            'confidence': confidence,
+                            'transaction_description': sub.get('transaction_description', sub['membership_name']),
+                        })
+                except (ValueError, TypeError):
+                    pass
+        return cleaned
+    else:
+        return []
+
 
+def extract_subscriptions_directly_with_llm(text: str) -> List[Dict[str, Any]]:
+    """
+    Use LLM to extract subscriptions directly from bank statement text in one pass.
+    More efficient than extracting all transactions then filtering.
+    
+    Long statements are split into chunks that are processed concurrently;
+    a subscription seen in several chunks is reported once.
+    
+    Args:
+        text: Extracted text from PDF
+        
+    Returns:
+        List of identified subscriptions
+    """
+    if not openai_client:
+        return []
+    
+    chunks = chunk_statement_text(text)
+    subscriptions = []
+    for chunk, result in zip(chunks, map_chunks(_extract_subscriptions_chunk, chunks)):
+        if isinstance(result, Exception):
+            print(f"LLM direct subscription extraction failed: {result}")
+            llm_metrics.record_fallback("bank_statement_parser", "gpt-4o-mini")
+            # Fallback: extract transactions then identify subscriptions
+            transactions = extract_transactions(chunk)
+            result = identify_subscriptions_with_llm(transactions) if transactions else []
+        subscriptions.extend(result)
+    return merge_subscriptions(subscriptions)
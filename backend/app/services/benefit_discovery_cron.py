@@ -2,9 +2,9 @@
 from datetime import datetime
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from app.models import Membership, Benefit
+from app.models import Benefit
+from app.services.catalog import get_catalog
 from app.services.gpt_websearch import search_and_extract_benefits_with_gpt
 from app.services.fetcher import fetch_pages
 from app.services.llm_extract import extract_benefits_from_pages
@@ -38,21 +38,19 @@ def discover_benefits_for_memberships_without_benefits(
     # Step 1: Find memberships with no benefits or only placeholder benefits
     print("📋 Finding memberships without benefits...")
     
-    # Get all active catalog memberships
-    all_memberships = db.query(Membership).filter(
-        Membership.status == "active",
-        Membership.is_catalog == True
-    ).all()
+    # Get all active catalog memberships from the in-memory catalog snapshot
+    catalog = get_catalog()
+    all_memberships = catalog.active_memberships(catalog_only=True)
     
     memberships_without_benefits = []
     
     for membership in all_memberships:
-        # Count benefits, excluding placeholder benefits
-        benefit_count = db.query(func.count(Benefit.id)).filter(
-            Benefit.membership_id == membership.id,
-            Benefit.title != "Membership added - no benefits found",
-            Benefit.validation_status == "approved"
-        ).scalar()
+        # Count approved benefits, excluding placeholder benefits
+        benefit_count = sum(
+            1
+            for benefit in catalog.membership_benefits(membership.id)
+            if benefit.title != "Membership added - no benefits found"
+        )
         
         if benefit_count == 0:
             memberships_without_benefits.append(membership)
@@ -0,0 +1,332 @@
+"""In-process, immutable snapshot of the membership/benefit catalog.
+
+The catalog (all memberships plus approved benefits) is small and read-heavy,
+so each worker keeps one immutable snapshot with lookup indexes and swaps in a
+new one when the catalog changes. A trigger on memberships/benefits writes
+advances catalog_version_seq and sends NOTIFY catalog_changed (delivered when
+the write commits). Workers LISTEN for the notification and rebuild on it; if
+the listener is not running they poll the sequence instead. A sequence takes
+no lock, but it advances before the write commits, so a poll can see a new
+version ahead of its data. The snapshot is therefore rebuilt once more on the
+poll after a version change, and catalog_max_age_s bounds anything longer.
+"""
+
+import asyncio
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import SessionLocal, engine
+from app.models import Benefit, Membership
+
+
+NOTIFY_CHANNEL = "catalog_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogMembership:
+    id: int
+    name: str
+    provider_slug: str
+    provider_name: Optional[str]
+    plan_name: Optional[str]
+    plan_tier: Optional[int]
+    is_catalog: bool
+    status: str
+    discovered_by_user_id: Optional[int]
+    affiliate_id: Optional[str]
+    affiliate_url: Optional[str]
+    commission_type: Optional[str]
+    partner_name: Optional[str]
+    commission_notes: Optional[str]
+    created_at: datetime
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogBenefit:
+    id: int
+    membership_id: int
+    title: str
+    description: Optional[str]
+    vendor_name: Optional[str]
+    vendor_domain: Optional[str]
+    category: Optional[str]
+    source_url: Optional[str]
+    expires_at: Optional[datetime]
+    affiliate_id: Optional[str]
+    affiliate_url: Optional[str]
+
+
+def normalize_domain(domain: Optional[str]) -> str:
+    """Lowercase a domain and strip scheme, path and leading www."""
+    domain = (domain or "").strip().lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = domain.split("/", 1)[0]
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def _group(items, key) -> Mapping:
+    groups: Dict = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One immutable version of the catalog with its lookup indexes."""
+
+    version: Optional[int]
+    memberships: Tuple[CatalogMembership, ...]  # Sorted by name
+    benefits: Tuple[CatalogBenefit, ...]  # Approved benefits only
+    built_at: float = field(default_factory=time.monotonic)
+
+    memberships_by_id: Mapping[int, CatalogMembership] = field(init=False, repr=False)
+    memberships_by_slug: Mapping[str, CatalogMembership] = field(init=False, repr=False)
+    memberships_by_provider: Mapping[str, Tuple[CatalogMembership, ...]] = field(
+        init=False, repr=False
+    )
+    benefits_by_id: Mapping[int, CatalogBenefit] = field(init=False, repr=False)
+    benefits_by_membership: Mapping[int, Tuple[CatalogBenefit, ...]] = field(
+        init=False, repr=False
+    )
+    benefits_by_category: Mapping[str, Tuple[CatalogBenefit, ...]] = field(
+        init=False, repr=False
+    )
+    benefits_by_domain: Mapping[str, Tuple[CatalogBenefit, ...]] = field(
+        init=False, repr=False
+    )
+
+    def __post_init__(self):
+        indexes = {
+            "memberships_by_id": MappingProxyType({m.id: m for m in self.memberships}),
+            "memberships_by_slug": MappingProxyType(
+                {m.provider_slug: m for m in self.memberships}
+            ),
+            "memberships_by_provider": _group(
+                self.memberships, lambda m: (m.provider_name or "").lower()
+            ),
+            "benefits_by_id": MappingProxyType({b.id: b for b in self.benefits}),
+            "benefits_by_membership": _group(self.benefits, lambda b: b.membership_id),
+            "benefits_by_category": _group(
+                self.benefits, lambda b: (b.category or "other").lower()
+            ),
+            "benefits_by_domain": _group(
+                [b for b in self.benefits if b.vendor_domain],
+                lambda b: normalize_domain(b.vendor_domain),
+            ),
+        }
+        for name, index in indexes.items():
+            object.__setattr__(self, name, index)
+
+    def active_memberships(self, catalog_only: bool = False) -> List[CatalogMembership]:
+        """Active memberships, optionally only those shown in the public catalog."""
+        return [
+            m
+            for m in self.memberships
+            if m.is_active and (m.is_catalog or not catalog_only)
+        ]
+
+    def membership_benefits(self, membership_id: int) -> Tuple[CatalogBenefit, ...]:
+        """Approved benefits of one membership."""
+        return self.benefits_by_membership.get(membership_id, ())
+
+
+_lock = threading.Lock()
+_snapshot: Optional[CatalogSnapshot] = None
+_stale = threading.Event()  # Rebuild on the next read (change notified or invalidated)
+_checked_at = 0.0
+_recheck = False  # Last rebuild followed a version change and may predate its commit
+_listener: Optional[threading.Thread] = None
+_listener_connected = threading.Event()
+_listener_stop = threading.Event()
+
+
+def _read_version(db) -> Optional[int]:
+    try:
+        return db.execute(text("SELECT last_value FROM catalog_version_seq")).scalar()
+    except Exception as e:
+        # Migration not applied yet - fall back to age-based rebuilds
+        db.rollback()
+        print(f"⚠️  catalog_version_seq unavailable: {e}")
+        return None
+
+
+def _build_snapshot(db, version: Optional[int]) -> CatalogSnapshot:
+    memberships = tuple(
+        CatalogMembership(
+            id=m.id,
+            name=m.name,
+            provider_slug=m.provider_slug,
+            provider_name=m.provider_name,
+            plan_name=m.plan_name,
+            plan_tier=m.plan_tier,
+            is_catalog=m.is_catalog,
+            status=m.status,
+            discovered_by_user_id=m.discovered_by_user_id,
+            affiliate_id=m.affiliate_id,
+            affiliate_url=m.affiliate_url,
+            commission_type=m.commission_type,
+            partner_name=m.partner_name,
+            commission_notes=m.commission_notes,
+            created_at=m.created_at,
+        )
+        for m in db.query(Membership).order_by(Membership.name, Membership.id)
+    )
+    benefits = tuple(
+        CatalogBenefit(
+            id=b.id,
+            membership_id=b.membership_id,
+            title=b.title,
+            description=b.description,
+            vendor_name=b.vendor_name,
+            vendor_domain=b.vendor_domain,
+            category=b.category,
+            source_url=b.source_url,
+            expires_at=b.expires_at,
+            affiliate_id=b.affiliate_id,
+            affiliate_url=b.affiliate_url,
+        )
+        for b in db.query(Benefit)
+        .filter(Benefit.validation_status == "approved")
+        .order_by(Benefit.id)
+    )
+    return CatalogSnapshot(version=version, memberships=memberships, benefits=benefits)
+
+
+def _is_fresh(snapshot: Optional[CatalogSnapshot]) -> bool:
+    if snapshot is None or _stale.is_set():
+        return False
+    now = time.monotonic()
+    if now - snapshot.built_at > settings.catalog_max_age_s:
+        return False
+    # With a live LISTEN connection, notifications tell us about changes
+    if _listener_connected.is_set():
+        return True
+    return now - _checked_at < settings.catalog_poll_interval_s
+
+
+def get_catalog() -> CatalogSnapshot:
+    """
+    Return the current catalog snapshot, rebuilding it if the catalog changed.
+
+    Reads are served from memory; the database is only touched to check the
+    version counter (when not listening for notifications) or to rebuild.
+
+    Returns:
+        The current CatalogSnapshot
+    """
+    global _snapshot, _checked_at, _recheck
+
+    snapshot = _snapshot
+    if _is_fresh(snapshot):
+        return snapshot
+
+    with _lock:
+        snapshot = _snapshot
+        if _is_fresh(snapshot):
+            return snapshot
+
+        db = SessionLocal()
+        try:
+            # Clear before reading so a change during the rebuild marks it stale again.
+            # A notified change is rebuilt even if the version looks current: the
+            # sequence may have been read before that write committed
+            notified = _stale.is_set()
+            _stale.clear()
+            version = _read_version(db)
+            expired = (
+                snapshot is None
+                or notified
+                or time.monotonic() - snapshot.built_at > settings.catalog_max_age_s
+            )
+            changed = snapshot is not None and version != snapshot.version
+            if expired or version is None or changed or _recheck:
+                snapshot = _build_snapshot(db, version)
+                _snapshot = snapshot
+                print(
+                    f"📚 Catalog snapshot v{version}: {len(snapshot.memberships)} memberships, "
+                    f"{len(snapshot.benefits)} benefits"
+                )
+            _recheck = changed
+            _checked_at = time.monotonic()
+        finally:
+            db.close()
+        return snapshot
+
+
+async def get_catalog_async() -> CatalogSnapshot:
+    """Async variant of get_catalog that rebuilds off the event loop."""
+    snapshot = _snapshot
+    if _is_fresh(snapshot):
+        return snapshot
+    return await asyncio.to_thread(get_catalog)
+
+
+def invalidate_catalog() -> None:
+    """Mark the snapshot stale so the next read rebuilds it."""
+    _stale.set()
+
+
+def _listen_loop() -> None:
+    while not _listener_stop.is_set():
+        raw = None
+        try:
+            raw = engine.raw_connection()
+            conn = raw.driver_connection
+            if not hasattr(conn, "poll"):
+                print("⚠️  Catalog LISTEN needs psycopg2 - polling catalog_version_seq instead")
+                return
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            _listener_connected.set()
+            # Anything may have changed while we were not listening
+            _stale.set()
+
+            while not _listener_stop.is_set():
+                if select.select([conn], [], [], 5.0) == ([], [], []):
+                    continue
+                conn.poll()
+                if conn.notifies:
+                    conn.notifies.clear()
+                    _stale.set()
+        except Exception as e:
+            print(f"⚠️  Catalog listener error: {e}")
+        finally:
+            _listener_connected.clear()
+            if raw is not None:
+                try:
+                    raw.invalidate()
+                except Exception:
+                    pass
+        _listener_stop.wait(5.0)
+
+
+def start_catalog_listener() -> None:
+    """Start the background LISTEN thread (once per worker process)."""
+    global _listener
+    if _listener is not None and _listener.is_alive():
+        return
+    _listener_stop.clear()
+    _listener = threading.Thread(
+        target=_listen_loop, name="catalog-listener", daemon=True
+    )
+    _listener.start()
+
+
+def stop_catalog_listener() -> None:
+    """Stop the background LISTEN thread."""
+    _listener_stop.set()
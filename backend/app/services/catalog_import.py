@@ -0,0 +1,370 @@
+"""Set-based bulk import of catalog memberships and benefits.
+
+Records (one membership with its nested benefits each) are read in chunks,
+diffed against the current catalog with one SELECT per table, and applied with
+a handful of statements per chunk:
+
+- memberships: INSERT ... ON CONFLICT (provider_slug) DO UPDATE ... RETURNING
+  (fields a record leaves out keep their current value)
+- new benefits: one multi-row INSERT
+- changed benefits: one UPDATE ... FROM (VALUES ...)
+- vendors: INSERT ... ON CONFLICT (domain) DO NOTHING
+
+Benefits are identified by (membership, title), as in the seed files. Records
+that repeat a provider_slug are merged: their benefit lists are combined and
+later membership fields win.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import Integer, cast, column, func, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Benefit, Membership, Vendor
+from app.services.membership_tiers import get_plan_tier
+
+
+MEMBERSHIP_FIELDS = ("name", "provider_name", "plan_name")
+BENEFIT_FIELDS = ("description", "vendor_domain", "category", "source_url", "expires_at")
+
+
+@dataclass
+class ImportSummary:
+    """Counts of the changes an import applied (or would apply on a dry run)."""
+
+    memberships_added: int = 0
+    memberships_updated: int = 0
+    memberships_unchanged: int = 0
+    memberships_skipped: int = 0
+    benefits_added: int = 0
+    benefits_updated: int = 0
+    benefits_unchanged: int = 0
+    benefits_skipped: int = 0
+    vendors_added: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def iter_catalog_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream membership records from a JSON or JSONL file.
+
+    JSON files may be a list of memberships or {"memberships": [...]} (the
+    seed_benefits.json format). JSONL files hold one membership per line and
+    are read lazily.
+    """
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    with open(path, "r") as f:
+        data = json.load(f)
+    yield from data.get("memberships", []) if isinstance(data, dict) else data
+
+
+def _chunks(
+    records: Iterable[Dict[str, Any]], size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _merge_by_slug(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Group records by provider_slug, combining the benefits of repeated slugs."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        slug = record["provider_slug"]
+        current = merged.get(slug)
+        if current is None:
+            merged[slug] = dict(record)
+            continue
+        benefits = current.get("benefits", []) + record.get("benefits", [])
+        current.update({k: v for k, v in record.items() if v is not None})
+        current["benefits"] = benefits
+    return merged
+
+
+def _membership_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    provider_name = record.get("provider_name")
+    plan_name = record.get("plan_name")
+    return {
+        "provider_slug": record["provider_slug"],
+        "name": record.get("name"),
+        "provider_name": provider_name,
+        "plan_name": plan_name,
+        "plan_tier": get_plan_tier(provider_name or "", plan_name or ""),
+        "is_catalog": True,
+        "status": "active",
+    }
+
+
+def _benefit_values(record: Dict[str, Any]) -> Dict[str, Any]:
+    fields = {field: record.get(field) for field in BENEFIT_FIELDS}
+    if isinstance(fields["expires_at"], str):
+        fields["expires_at"] = datetime.fromisoformat(fields["expires_at"])
+    return fields
+
+
+def _apply_memberships(
+    db: Session,
+    records: Dict[str, Dict[str, Any]],
+    update_existing: bool,
+    create_memberships: bool,
+    update_memberships: bool,
+    dry_run: bool,
+    summary: ImportSummary,
+) -> Dict[str, int]:
+    """Upsert the chunk's memberships. Returns provider_slug -> id for importable records."""
+    existing = {
+        row.provider_slug: row
+        for row in db.execute(
+            select(
+                Membership.id,
+                Membership.provider_slug,
+                *[getattr(Membership, f) for f in MEMBERSHIP_FIELDS],
+            ).where(Membership.provider_slug.in_(list(records)))
+        )
+    }
+
+    ids: Dict[str, int] = {}
+    upserts = []
+    for slug, record in records.items():
+        row = _membership_row(record)
+        current = existing.get(slug)
+        if current is None:
+            if not create_memberships:
+                summary.memberships_skipped += 1
+                continue
+            summary.memberships_added += 1
+            upserts.append(row)
+            continue
+        if not update_existing:
+            summary.memberships_skipped += 1
+            continue
+        ids[slug] = current.id
+        if update_memberships and any(
+            row[f] is not None and getattr(current, f) != row[f] for f in MEMBERSHIP_FIELDS
+        ):
+            summary.memberships_updated += 1
+            upserts.append(row)
+        else:
+            summary.memberships_unchanged += 1
+
+    if upserts and not dry_run:
+        stmt = insert(Membership).values(upserts)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Membership.provider_slug],
+            set_={
+                **{
+                    f: func.coalesce(getattr(stmt.excluded, f), getattr(Membership, f))
+                    for f in MEMBERSHIP_FIELDS
+                },
+                # Keep a tier an admin has set; fill it in when missing
+                "plan_tier": func.coalesce(Membership.plan_tier, stmt.excluded.plan_tier),
+            },
+        ).returning(Membership.id, Membership.provider_slug)
+        ids.update({slug: membership_id for membership_id, slug in db.execute(stmt)})
+    elif upserts:
+        # Dry run: new memberships get placeholder ids so their benefits are counted
+        for i, row in enumerate(upserts):
+            ids.setdefault(row["provider_slug"], -(i + 1))
+    return ids
+
+
+def _apply_benefits(
+    db: Session,
+    records: Dict[str, Dict[str, Any]],
+    membership_ids: Dict[str, int],
+    update_existing: bool,
+    approve: bool,
+    dry_run: bool,
+    summary: ImportSummary,
+) -> None:
+    wanted: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for slug, record in records.items():
+        benefits = record.get("benefits", [])
+        membership_id = membership_ids.get(slug)
+        if membership_id is None:
+            summary.benefits_skipped += len(benefits)
+            continue
+        for benefit in benefits:
+            wanted[(membership_id, benefit["title"])] = benefit
+
+    if not wanted:
+        return
+
+    key = tuple_(Benefit.membership_id, Benefit.title)
+    existing = {
+        (row.membership_id, row.title): row
+        for row in db.execute(
+            select(
+                Benefit.id,
+                Benefit.membership_id,
+                Benefit.title,
+                Benefit.validation_status,
+                *[getattr(Benefit, f) for f in BENEFIT_FIELDS],
+            ).where(key.in_(list(wanted)))
+        )
+    }
+
+    inserts = []
+    updates = []
+    for (membership_id, title), record in wanted.items():
+        fields = _benefit_values(record)
+        current = existing.get((membership_id, title))
+        if current is None:
+            inserts.append(
+                {
+                    "membership_id": membership_id,
+                    "title": title,
+                    "validation_status": "approved",
+                    **fields,
+                }
+            )
+        elif update_existing and (
+            any(getattr(current, f) != fields[f] for f in BENEFIT_FIELDS)
+            or (approve and current.validation_status != "approved")
+        ):
+            updates.append({"id": current.id, **fields})
+        else:
+            summary.benefits_unchanged += 1
+
+    summary.benefits_added += len(inserts)
+    summary.benefits_updated += len(updates)
+    if dry_run:
+        return
+
+    if inserts:
+        db.execute(insert(Benefit).values(inserts))
+
+    if updates:
+        columns = Benefit.__table__.c
+        changes = values(
+            column("id", Integer),
+            *[column(f, columns[f].type) for f in BENEFIT_FIELDS],
+            name="changes",
+        ).data([tuple(row[c] for c in ("id", *BENEFIT_FIELDS)) for row in updates])
+        set_values = {
+            # VALUES infers text for all-NULL columns, so cast back to the column type
+            f: cast(getattr(changes.c, f), columns[f].type)
+            for f in BENEFIT_FIELDS
+        }
+        if approve:
+            set_values["validation_status"] = "approved"
+        db.execute(
+            update(Benefit)
+            .where(Benefit.id == changes.c.id)
+            .values(**set_values)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _apply_vendors(
+    db: Session, records: Dict[str, Dict[str, Any]], dry_run: bool, summary: ImportSummary
+) -> None:
+    vendors: Dict[str, str] = {}
+    for record in records.values():
+        for benefit in record.get("benefits", []):
+            domain = benefit.get("vendor_domain")
+            if domain:
+                name = benefit.get("vendor_name") or benefit.get("title") or domain
+                vendors.setdefault(domain, name)
+    if not vendors:
+        return
+
+    known = set(
+        db.execute(select(Vendor.domain).where(Vendor.domain.in_(list(vendors)))).scalars()
+    )
+    new = [{"domain": d, "name": n} for d, n in vendors.items() if d not in known]
+    summary.vendors_added += len(new)
+    if new and not dry_run:
+        db.execute(
+            insert(Vendor).values(new).on_conflict_do_nothing(index_elements=[Vendor.domain])
+        )
+
+
+def import_catalog(
+    db: Session,
+    records: Iterable[Dict[str, Any]],
+    update_existing: bool = True,
+    create_memberships: bool = True,
+    update_memberships: bool = True,
+    approve: bool = True,
+    with_vendors: bool = False,
+    dry_run: bool = False,
+    chunk_size: int = 500,
+) -> ImportSummary:
+    """
+    Import catalog records with set-based upserts.
+
+    Args:
+        db: Database session (committed here unless dry_run)
+        records: Membership dicts with provider_slug, name, provider_name,
+            plan_name and a list of benefits (title, description, vendor_domain,
+            category, source_url, expires_at)
+        update_existing: Update memberships/benefits that already exist; if False,
+            existing memberships are skipped together with their benefits
+        create_memberships: Create memberships missing from the catalog; if False,
+            their benefits are skipped
+        update_memberships: Update the fields of existing memberships; if False,
+            only their benefits are imported and the membership rows are left as is
+        approve: Mark updated benefits as approved (new ones always are)
+        with_vendors: Also create vendors rows for new vendor domains
+        dry_run: Compute the diff and summary without writing
+        chunk_size: Memberships diffed and written per round
+
+    Returns:
+        ImportSummary of the applied (or, on a dry run, pending) changes
+    """
+    summary = ImportSummary()
+    try:
+        for chunk in _chunks(records, chunk_size):
+            by_slug = _merge_by_slug(chunk)
+            membership_ids = _apply_memberships(
+                db,
+                by_slug,
+                update_existing,
+                create_memberships,
+                update_memberships,
+                dry_run,
+                summary,
+            )
+            _apply_benefits(
+                db, by_slug, membership_ids, update_existing, approve, dry_run, summary
+            )
+            if with_vendors:
+                _apply_vendors(db, by_slug, dry_run, summary)
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    print(f"📦 Catalog import{' (dry run)' if dry_run else ''}: {summary.to_dict()}")
+    return summary
+
+
+def approve_pending_benefits(db: Session) -> int:
+    """Approve every non-approved benefit with one UPDATE. Returns the row count."""
+    result = db.execute(
+        update(Benefit)
+        .where(Benefit.validation_status != "approved")
+        .values(validation_status="approved")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
@@ -1,20 +1,36 @@
 """Conversational AI service for benefits chat."""
 
+import asyncio
+import copy
+import hashlib
 import json
 import re
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from cachetools import TTLCache
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
 from app.services.semantic_matcher import get_embedding, cosine_similarity, create_benefit_text
-from app.models.membership import Membership
-from app.models.benefit import Benefit
 from app.models.user_membership import UserMembership
+from app.services.catalog import CatalogBenefit, CatalogMembership, get_catalog_async
 
 
 # Get shared OpenAI client
 client = get_openai_client()
 
+# Semantic answer cache: chat fingerprint -> [(question embedding, response)]
+# (30 min TTL, max 1000 fingerprints)
+answer_cache = TTLCache(maxsize=1000, ttl=1800)
+# Minimum cosine similarity for a new question to reuse a cached answer
+ANSWER_CACHE_THRESHOLD = 0.92
+# Cached questions kept per fingerprint (oldest evicted first)
+ANSWER_CACHE_MAX_ENTRIES = 20
+# Previous messages sent to the LLM with a question (and part of its cache key)
+HISTORY_MESSAGES = 6
+
 
 # Keywords indicating user intent to purchase/subscribe
 BUYING_INTENT_KEYWORDS = [
@@ -39,14 +55,93 @@ def detect_buying_intent(query: str) -> bool:
     return any(keyword in query_lower for keyword in BUYING_INTENT_KEYWORDS)
 
 
-def find_membership_upgrades(user_id: int, query: str, db: Session) -> List[Dict]:
+def chat_fingerprint(
+    user_id: int,
+    user_benefits: List[Any],
+    has_buying_intent: bool,
+    conversation_history: List[Dict[str, str]],
+) -> str:
+    """
+    Fingerprint the context of a question for the semantic answer cache.
+
+    Answers name the user's own memberships and recommendations, and follow-up
+    questions depend on the conversation so far, so cached answers are only
+    reused for the same user, benefit set and recent history. Any added,
+    removed or re-assigned benefit changes the fingerprint.
+
+    Args:
+        user_id: Current user's ID
+        user_benefits: List of (Benefit, Membership) tuples
+        has_buying_intent: Whether the question has buying intent (changes the answer)
+        conversation_history: Previous messages (only those sent to the LLM count)
+
+    Returns:
+        Hex digest identifying the question context
+    """
+    pairs = sorted((benefit.id, membership.id) for benefit, membership in user_benefits)
+    history = [
+        [msg["role"], msg["content"]] for msg in conversation_history[-HISTORY_MESSAGES:]
+    ]
+    return hashlib.md5(
+        json.dumps(
+            {"user": user_id, "pairs": pairs, "buying": has_buying_intent, "history": history}
+        ).encode()
+    ).hexdigest()
+
+
+def lookup_cached_answer(
+    fingerprint: str, query_embedding: List[float]
+) -> Optional[Dict[str, Any]]:
+    """
+    Return a cached response for a question similar enough to this one.
+
+    Args:
+        fingerprint: Fingerprint from chat_fingerprint
+        query_embedding: Embedding of the new question
+
+    Returns:
+        Copy of the cached response data, or None on a miss
+    """
+    entries = answer_cache.get(fingerprint)
+    if not entries:
+        return None
+
+    cached = np.array([embedding for embedding, _ in entries])
+    query = np.array(query_embedding)
+    similarities = cached @ query / (
+        np.linalg.norm(cached, axis=1) * np.linalg.norm(query)
+    )
+    best = int(np.argmax(similarities))
+    if similarities[best] < ANSWER_CACHE_THRESHOLD:
+        return None
+
+    return copy.deepcopy(entries[best][1])
+
+
+def store_cached_answer(
+    fingerprint: str, query_embedding: List[float], response_data: Dict[str, Any]
+) -> None:
+    """Store a generated response under its chat fingerprint."""
+    entries = list(answer_cache.get(fingerprint, []))
+    entries.append((query_embedding, copy.deepcopy(response_data)))
+    answer_cache[fingerprint] = entries[-ANSWER_CACHE_MAX_ENTRIES:]
+
+
+async def _owned_membership_ids(db: AsyncSession, user_id: int) -> set:
+    result = await db.execute(
+        select(UserMembership.membership_id).where(UserMembership.user_id == user_id)
+    )
+    return set(result.scalars().all())
+
+
+async def find_membership_upgrades(user_id: int, query: str, db: AsyncSession) -> List[Dict]:
     """
     Find membership upgrades that could provide better benefits for the query.
     
     Args:
         user_id: User's ID
         query: User's question/intent
-        db: Database session
+        db: Async database session
         
     Returns:
         List of potential upgrades with benefits
@@ -54,42 +149,35 @@ def find_membership_upgrades(user_id: int, query: str, db: Session) -> List[Dict
     if not client:
         return []
     
-    # Get user's current memberships
-    user_membership_ids = [
-        um.membership_id 
-        for um in db.query(UserMembership).filter(UserMembership.user_id == user_id).all()
-    ]
-    
-    # Get ALL memberships with their approved benefits
-    all_memberships = db.query(Membership).filter(
-        Membership.status == "active"
-    ).all()
-    
+    # Approved benefits of every active membership the user doesn't have
+    owned_ids = await _owned_membership_ids(db, user_id)
+    catalog = await get_catalog_async()
+    candidates: Dict[int, Tuple[CatalogMembership, Tuple[CatalogBenefit, ...]]] = {}
+    for membership in catalog.active_memberships():
+        benefits = catalog.membership_benefits(membership.id)
+        if membership.id not in owned_ids and benefits:
+            candidates[membership.id] = (membership, benefits)
+    
+    # Embedding lookups are blocking HTTP calls - keep them off the event loop
+    return await asyncio.to_thread(_rank_upgrades, query, list(candidates.values()))
+
+
+def _rank_upgrades(
+    query: str, candidates: List[Tuple[CatalogMembership, Tuple[CatalogBenefit, ...]]]
+) -> List[Dict]:
+    """Score candidate memberships' benefits against the query (blocking)."""
     upgrades = []
-    query_embedding = get_embedding(query)
+    query_embedding = get_embedding(query, call_site="chat_service")
     
     if not query_embedding:
         return []
     
-    for membership in all_memberships:
-        # Skip if user already has this membership
-        if membership.id in user_membership_ids:
-            continue
-        
-        # Get benefits for this membership
-        benefits = db.query(Benefit).filter(
-            Benefit.membership_id == membership.id,
-            Benefit.validation_status == "approved"
-        ).all()
-        
-        if not benefits:
-            continue
-        
+    for membership, benefits in candidates:
         # Check if any benefits match the query
         relevant_benefits = []
         for benefit in benefits:
             benefit_text = create_benefit_text(benefit, membership)
-            benefit_embedding = get_embedding(benefit_text)
+            benefit_embedding = get_embedding(benefit_text, call_site="chat_service")
             
             if benefit_embedding:
                 similarity = cosine_similarity(query_embedding, benefit_embedding)
@@ -122,7 +210,7 @@ def find_membership_upgrades(user_id: int, query: str, db: Session) -> List[Dict
     return upgrades[:3]  # Top 3 upgrade suggestions
 
 
-def find_relevant_memberships(query: str, user_id: int, db: Session) -> List[Dict]:
+async def find_relevant_memberships(query: str, user_id: int, db: AsyncSession) -> List[Dict]:
     """
     Find relevant catalog memberships to recommend based on user query and their existing memberships.
     Uses semantic search to find memberships that match the query and considers user's existing memberships
@@ -133,7 +221,7 @@ def find_relevant_memberships(query: str, user_id: int, db: Session) -> List[Dic
     Args:
         query: User's question/intent
         user_id: User's ID
-        db: Database session
+        db: Async database session
         
     Returns:
         List of recommended memberships with affiliate links
@@ -141,39 +229,35 @@ def find_relevant_memberships(query: str, user_id: int, db: Session) -> List[Dic
     if not client:
         return []
     
-    # Get user's current memberships to understand their preferences
-    user_membership_ids = [
-        um.membership_id 
-        for um in db.query(UserMembership).filter(UserMembership.user_id == user_id).all()
-    ]
-    
     # Get catalog memberships (active, in catalog, not already owned by user)
     # Limit to first 30 to avoid processing too many
-    catalog_memberships = db.query(Membership).filter(
-        Membership.status == "active",
-        Membership.is_catalog == True,
-        ~Membership.id.in_(user_membership_ids) if user_membership_ids else True
-    ).limit(30).all()
+    owned_ids = await _owned_membership_ids(db, user_id)
+    catalog = await get_catalog_async()
+    catalog_memberships = [
+        m for m in catalog.active_memberships(catalog_only=True) if m.id not in owned_ids
+    ][:30]
     
     if not catalog_memberships:
         return []
     
-    # Batch load ALL benefits for ALL catalog memberships in one query
-    catalog_membership_ids = [m.id for m in catalog_memberships]
-    all_benefits = db.query(Benefit).filter(
-        Benefit.membership_id.in_(catalog_membership_ids),
-        Benefit.validation_status == "approved"
-    ).all()
-    
-    # Group benefits by membership_id for fast lookup
-    benefits_by_membership = {}
-    for benefit in all_benefits:
-        if benefit.membership_id not in benefits_by_membership:
-            benefits_by_membership[benefit.membership_id] = []
-        benefits_by_membership[benefit.membership_id].append(benefit)
+    benefits_by_membership = {
+        m.id: list(catalog.membership_benefits(m.id)) for m in catalog_memberships
+    }
     
+    # Embedding lookups are blocking HTTP calls - keep them off the event loop
+    return await asyncio.to_thread(
+        _rank_recommendations, query, catalog_memberships, benefits_by_membership
+    )
+
+
+def _rank_recommendations(
+    query: str,
+    catalog_memberships: List[CatalogMembership],
+    benefits_by_membership: Dict[int, List[CatalogBenefit]],
+) -> List[Dict]:
+    """Pick catalog memberships whose benefits match the query (blocking)."""
     # Get query embedding once (single API call)
-    query_embedding = get_embedding(query)
+    query_embedding = get_embedding(query, call_site="chat_service")
     if not query_embedding:
         return []
     
@@ -219,7 +303,7 @@ def find_relevant_memberships(query: str, user_id: int, db: Session) -> List[Dic
         relevant_benefits = []
         for benefit in benefits[:10]:  # Limit to first 10 benefits per membership
             benefit_text = create_benefit_text(benefit, membership)
-            benefit_embedding = get_embedding(benefit_text)
+            benefit_embedding = get_embedding(benefit_text, call_site="chat_service")
             
             if benefit_embedding:
                 similarity = cosine_similarity(query_embedding, benefit_embedding)
@@ -277,7 +361,7 @@ def search_benefits_by_query(query: str, user_benefits: List[Any], threshold: fl
         return []
     
     # Get query embedding
-    query_embedding = get_embedding(query)
+    query_embedding = get_embedding(query, call_site="chat_service")
     if not query_embedding:
         return []
     
@@ -285,7 +369,7 @@ def search_benefits_by_query(query: str, user_benefits: List[Any], threshold: fl
     matches = []
     for benefit, membership in user_benefits:
         benefit_text = create_benefit_text(benefit, membership)
-        benefit_embedding = get_embedding(benefit_text)
+        benefit_embedding = get_embedding(benefit_text, call_site="chat_service")
         
         if benefit_embedding:
             similarity = cosine_similarity(query_embedding, benefit_embedding)
@@ -306,22 +390,24 @@ def search_benefits_by_query(query: str, user_benefits: List[Any], threshold: fl
     return matches[:top_k]
 
 
-def generate_chat_response(
+async def generate_chat_response(
     user_message: str, 
     conversation_history: List[Dict[str, str]], 
     user_benefits: List[Any],
     user_id: int,
-    db: Session
+    db: AsyncSession
 ) -> Dict[str, Any]:
     """
     Generate an intelligent response about benefits, discounts, and upgrade opportunities.
     
+    Blocking OpenAI calls run in worker threads so the event loop stays free.
+    
     Args:
         user_message: User's message
         conversation_history: Previous messages
         user_benefits: List of (Benefit, Membership) tuples
         user_id: Current user's ID
-        db: Database session
+        db: Async database session
         
     Returns:
         Dict with 'message', 'related_benefits', and optional 'suggested_upgrades'
@@ -335,18 +421,36 @@ def generate_chat_response(
     # Detect if user is asking about buying/subscribing
     has_buying_intent = detect_buying_intent(user_message)
     
+    # Serve paraphrases of a previous question from the semantic answer cache
+    fingerprint = chat_fingerprint(user_id, user_benefits, has_buying_intent, conversation_history)
+    try:
+        question_embedding = await asyncio.to_thread(
+            get_embedding, user_message, call_site="chat_service"
+        )
+    except Exception as e:
+        print(f"Question embedding failed, skipping answer cache: {e}")
+        question_embedding = None
+    
+    if question_embedding:
+        cached_response = lookup_cached_answer(fingerprint, question_embedding)
+        if cached_response is not None:
+            llm_metrics.record_cache_hit("chat_service", "gpt-4o-mini")
+            return cached_response
+    
     # Search for relevant benefits they already have
-    relevant_benefits = search_benefits_by_query(user_message, user_benefits, threshold=0.5, top_k=5)
+    relevant_benefits = await asyncio.to_thread(
+        search_benefits_by_query, user_message, user_benefits, threshold=0.5, top_k=5
+    )
     
     # If buying intent detected, also search for upgrade opportunities
     upgrade_suggestions = []
     if has_buying_intent and user_id:
-        upgrade_suggestions = find_membership_upgrades(user_id, user_message, db)
+        upgrade_suggestions = await find_membership_upgrades(user_id, user_message, db)
     
     # If no matching benefits found, find relevant catalog memberships to recommend
     recommended_memberships = []
     if not relevant_benefits and user_id:
-        recommended_memberships = find_relevant_memberships(user_message, user_id, db)
+        recommended_memberships = await find_relevant_memberships(user_message, user_id, db)
     
     # Build context for LLM
     benefits_context = ""
@@ -445,7 +549,7 @@ EXAMPLE BAD RESPONSES (DO NOT DO THIS):
     ]
     
     # Add conversation history (last 6 messages)
-    for msg in conversation_history[-6:]:
+    for msg in conversation_history[-HISTORY_MESSAGES:]:
         context_messages.append({
             "role": msg["role"],
             "content": msg["content"]
@@ -459,7 +563,10 @@ EXAMPLE BAD RESPONSES (DO NOT DO THIS):
     
     # Call OpenAI
     try:
-        response = client.chat.completions.create(
+        response = await asyncio.to_thread(
+            llm_metrics.chat_completion,
+            "chat_service",
+            client,
             model="gpt-4o-mini",
             messages=context_messages,
             temperature=0.7,
@@ -506,10 +613,14 @@ EXAMPLE BAD RESPONSES (DO NOT DO THIS):
                 for u in upgrade_suggestions[:2]  # Top 2 upgrades
             ]
         
+        if question_embedding:
+            store_cached_answer(fingerprint, question_embedding, response_data)
+        
         return response_data
     
     except Exception as e:
         print(f"Error generating chat response: {e}")
+        llm_metrics.record_fallback("chat_service", "gpt-4o-mini")
         return {
             "message": "Sorry, I'm having trouble processing that right now. Please try again.",
             "related_benefits": []
@@ -0,0 +1,164 @@
+"""Reverse-domain index for matching page domains to vendor benefits.
+
+Benefit vendor domains are stored in a suffix trie keyed by reversed labels
+(uk -> co -> amazon), so a lookup for "www.amazon.co.uk" or
+"smile.amazon.co.uk" walks down the page's labels and collects every benefit
+recorded at or above it, stopping at the registrable domain (eTLD+1) so that
+"co.uk" never matches. Vendors with several registrable domains (amazon.com,
+amazon.co.uk) are linked through alias groups from app.data.vendor_aliases and
+the vendors table.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.db import SessionLocal
+from app.data.vendor_aliases import VENDOR_ALIASES
+from app.models import Vendor
+from app.services.catalog import CatalogSnapshot, get_catalog
+
+
+# Multi-label public suffixes we see in practice (single-label TLDs are implicit)
+PUBLIC_SUFFIXES = {
+    "co.uk", "org.uk", "me.uk", "ltd.uk", "plc.uk", "net.uk", "ac.uk", "gov.uk", "nhs.uk",
+    "com.au", "net.au", "org.au", "co.nz", "org.nz", "co.za", "co.in", "co.jp",
+    "com.br", "com.mx", "com.sg", "com.hk", "com.tr", "co.kr", "com.cn",
+}
+
+
+def normalize_host(value: Optional[str]) -> str:
+    """
+    Reduce a URL or domain to a bare lowercase host.
+
+    "https://WWW.Amazon.co.uk:443/deals?x=1" -> "amazon.co.uk"
+    """
+    host = (value or "").strip().lower()
+    if "://" in host:
+        host = host.split("://", 1)[1]
+    host = host.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+    host = host.rsplit("@", 1)[-1].split(":", 1)[0].rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def registrable_domain(host: str) -> str:
+    """Return the eTLD+1 of a normalized host ("smile.amazon.co.uk" -> "amazon.co.uk")."""
+    labels = host.split(".")
+    if len(labels) <= 2:
+        return host
+    suffix_len = 2 if ".".join(labels[-2:]) in PUBLIC_SUFFIXES else 1
+    return ".".join(labels[-(suffix_len + 1):])
+
+
+class _Node:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.values: Set[int] = set()
+
+
+class DomainTrie:
+    """Suffix trie over reversed domain labels."""
+
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, host: str, value: int) -> None:
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.children.setdefault(label, _Node())
+        node.values.add(value)
+
+    def lookup(self, host: str) -> Set[int]:
+        """Values stored at the host or any parent domain down to its eTLD+1."""
+        labels = list(reversed(host.split(".")))
+        min_depth = registrable_domain(host).count(".") + 1
+        found: Set[int] = set()
+        node = self._root
+        for depth, label in enumerate(labels, start=1):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if depth >= min_depth:
+                found |= node.values
+        return found
+
+
+class DomainIndex:
+    """Benefit lookup by page domain for one catalog snapshot."""
+
+    def __init__(self, catalog: CatalogSnapshot, alias_groups: Iterable[Iterable[str]]):
+        self.catalog = catalog
+        self.aliases: Dict[str, Tuple[str, ...]] = {}
+        for group in alias_groups:
+            merged = {registrable_domain(normalize_host(d)) for d in group}
+            # Groups sharing a domain (e.g. a vendors row and a built-in alias) merge
+            for domain in list(merged):
+                merged.update(self.aliases.get(domain, ()))
+            members = tuple(sorted(merged))
+            for domain in members:
+                self.aliases[domain] = members
+
+        self.trie = DomainTrie()
+        for benefit in catalog.benefits:
+            host = normalize_host(benefit.vendor_domain)
+            if not host:
+                continue
+            for alias_host in self.expand(host):
+                self.trie.insert(alias_host, benefit.id)
+
+    def expand(self, host: str) -> List[str]:
+        """A host plus the same subdomain under each of its vendor's alias domains."""
+        registrable = registrable_domain(host)
+        prefix = host[: len(host) - len(registrable)]
+        return [prefix + alias for alias in self.aliases.get(registrable, (registrable,))]
+
+    def benefit_ids(self, domain: str) -> Set[int]:
+        host = normalize_host(domain)
+        return self.trie.lookup(host) if host else set()
+
+    def matches(self, domain: str, vendor_domain: Optional[str]) -> bool:
+        """Whether a page domain is covered by a benefit's vendor domain."""
+        host = normalize_host(domain)
+        vendor_host = normalize_host(vendor_domain)
+        if not host or not vendor_host:
+            return False
+        return any(
+            host == candidate or host.endswith("." + candidate)
+            for candidate in self.expand(vendor_host)
+        )
+
+
+_lock = threading.Lock()
+_index: Optional[DomainIndex] = None
+
+
+def _load_alias_groups() -> List[List[str]]:
+    groups: Dict[str, List[str]] = {
+        name.lower(): list(domains) for name, domains in VENDOR_ALIASES.items()
+    }
+    db = SessionLocal()
+    try:
+        for name, domain in db.query(Vendor.name, Vendor.domain):
+            groups.setdefault(name.strip().lower(), []).append(domain)
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️  Could not load vendor aliases: {e}")
+    finally:
+        db.close()
+    return list(groups.values())
+
+
+def get_domain_index() -> DomainIndex:
+    """Return the domain index for the current catalog snapshot (rebuilt with it)."""
+    global _index
+
+    catalog = get_catalog()
+    index = _index
+    if index is not None and index.catalog is catalog:
+        return index
+
+    with _lock:
+        if _index is None or _index.catalog is not catalog:
+            _index = DomainIndex(catalog, _load_alias_groups())
+        return _index
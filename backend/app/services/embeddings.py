@@ -2,6 +2,7 @@
 from typing import List
 from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
 
 
 client = get_openai_client()
@@ -20,7 +21,9 @@ def get_embedding(text: str) -> List[float]:
     if not client:
         raise ValueError("OpenAI API key not configured")
     
-    response = client.embeddings.create(
+    response = llm_metrics.embedding(
+        "embeddings",
+        client,
         input=text,
         model=settings.embed_model
     )
@@ -40,7 +43,9 @@ def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
     if not client:
         raise ValueError("OpenAI API key not configured")
     
-    response = client.embeddings.create(
+    response = llm_metrics.embedding(
+        "embeddings",
+        client,
         input=texts,
         model=settings.embed_model
     )
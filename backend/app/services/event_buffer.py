@@ -0,0 +1,243 @@
+"""In-process buffer for analytics event ingestion.
+
+Endpoints enqueue event rows instead of inserting them; a background thread
+writes them with one multi-row INSERT (and folds them into the daily rollups)
+whenever the buffer reaches analytics_flush_size rows or
+analytics_flush_interval_s has passed, so a request costs a list append rather
+than a transaction. When the buffer holds
+analytics_max_pending rows, producers wait up to analytics_enqueue_timeout_s
+for a flush to make room and are then rejected (backpressure). Remaining rows
+are flushed on shutdown.
+
+A batch the database rejects for its data (DataError/IntegrityError, e.g. a
+payload Postgres can't store) is bisected down to the offending rows, which are
+dropped and counted, so one bad event can't block every later flush. Any other
+failure (connection loss, a missing table, a rollup bug) says nothing about the
+rows, so they go back in the buffer for at most analytics_flush_max_retries
+consecutive attempts.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import (
+    DataError,
+    DisconnectionError,
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+)
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import AnalyticsEvent
+from app.services.analytics_rollups import aggregate_events, apply_rollups
+
+
+# Failures worth retrying: the rows are fine, the database is not reachable
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError, PoolTimeoutError)
+# Failures caused by the rows themselves: worth bisecting to find the bad ones
+ROW_ERRORS = (DataError, IntegrityError)
+
+
+class EventBufferFull(Exception):
+    """Raised when the buffer stays full for longer than the enqueue timeout."""
+
+
+class EventBuffer:
+    """Bounded buffer of analytics_events rows flushed by a background thread."""
+
+    def __init__(
+        self,
+        flush_size: int,
+        flush_interval_s: float,
+        max_pending: int,
+        enqueue_timeout_s: float,
+        max_retries: int = 5,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval_s = flush_interval_s
+        self.max_pending = max_pending
+        self.enqueue_timeout_s = enqueue_timeout_s
+        self.max_retries = max_retries
+
+        self._rows: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._wake = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()  # One writer at a time
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.flushed = 0
+        self.dropped = 0  # Buffer full or retries exhausted
+        self.invalid = 0  # Rejected by the database
+        self.rejected = 0
+        self._retries = 0  # Consecutive flushes that failed with a transient error
+
+    def enqueue(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Add event rows to the buffer.
+
+        Args:
+            rows: analytics_events column dicts
+
+        Raises:
+            EventBufferFull: If there is no room after waiting enqueue_timeout_s
+        """
+        if not rows:
+            return
+        deadline = time.monotonic() + self.enqueue_timeout_s
+        with self._lock:
+            while len(self._rows) + len(rows) > self.max_pending:
+                remaining = deadline - time.monotonic()
+                # Nothing will make room once the flusher has been stopped
+                if remaining <= 0 or (self._stop.is_set() and self._thread is None):
+                    self.rejected += len(rows)
+                    raise EventBufferFull(
+                        f"Analytics buffer full ({len(self._rows)} pending events)"
+                    )
+                self._wake.notify()
+                self._not_full.wait(remaining)
+            self._rows.extend(rows)
+            if len(self._rows) >= self.flush_size:
+                self._wake.notify()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def flush(self) -> int:
+        """Write all buffered rows now. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+                self._not_full.notify_all()
+            if not rows:
+                return 0
+
+            written, unwritten = self._insert(rows)
+            self.flushed += written
+            if not unwritten:
+                self._retries = 0
+                return written
+
+            self._retries += 1
+            if self._retries > self.max_retries:
+                self.dropped += len(unwritten)
+                self._retries = 0
+                print(f"⚠️  Dropped {len(unwritten)} analytics events after {self.max_retries} retries")
+            else:
+                self._requeue(unwritten)
+            return written
+
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        with engine.begin() as conn:
+            for start in range(0, len(rows), self.flush_size):
+                conn.execute(
+                    AnalyticsEvent.__table__.insert().values(rows[start : start + self.flush_size])
+                )
+            # Rollups commit atomically with the raw events
+            apply_rollups(conn, aggregate_events(rows))
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Write rows, bisecting around rows the database rejects (which are dropped).
+
+        Returns:
+            Tuple of (rows written, rows left unwritten by any non-row error)
+        """
+        written = 0
+        batches = [rows]
+        while batches:
+            batch = batches.pop()
+            try:
+                self._write(batch)
+                written += len(batch)
+            except TRANSIENT_ERRORS as e:
+                print(f"⚠️  Analytics flush failed ({len(rows) - written} events pending): {e}")
+                return written, batch + [row for rest in reversed(batches) for row in rest]
+            except ROW_ERRORS as e:
+                if len(batch) == 1:
+                    self.invalid += 1
+                    print(f"⚠️  Dropped analytics event rejected by the database: {e}")
+                    continue
+                # Second half is pushed first so rows are retried in order
+                middle = len(batch) // 2
+                batches.append(batch[middle:])
+                batches.append(batch[:middle])
+            except Exception as e:
+                print(f"❌ Analytics flush error ({len(rows) - written} events pending): {e}")
+                return written, batch + [row for rest in reversed(batches) for row in rest]
+        return written, []
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> None:
+        # Put failed rows back in front, keeping the buffer bounded
+        with self._lock:
+            room = max(self.max_pending - len(self._rows), 0)
+            kept = rows[-room:] if room else []
+            self.dropped += len(rows) - len(kept)
+            self._rows = kept + self._rows
+        if len(kept) < len(rows):
+            print(f"⚠️  Dropped {len(rows) - len(kept)} analytics events (buffer full)")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                if len(self._rows) < self.flush_size:
+                    self._wake.wait(self.flush_interval_s)
+            self.flush()
+            if self._retries:
+                # Back off while the database is unreachable
+                self._stop.wait(self.flush_interval_s * self._retries)
+
+    def start(self) -> None:
+        """Start the background flusher (once per worker process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="analytics-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write whatever is still buffered."""
+        self._stop.set()
+        with self._lock:
+            self._wake.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval_s + 5.0)
+            self._thread = None
+        written = self.flush()
+        if written:
+            print(f"📊 Flushed {written} analytics events on shutdown")
+
+
+event_buffer = EventBuffer(
+    flush_size=settings.analytics_flush_size,
+    flush_interval_s=settings.analytics_flush_interval_s,
+    max_pending=settings.analytics_max_pending,
+    enqueue_timeout_s=settings.analytics_enqueue_timeout_s,
+    max_retries=settings.analytics_flush_max_retries,
+)
+
+
+def event_row(
+    event_name: str,
+    user_id: Optional[int],
+    source: Optional[str] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    created_at: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Build an analytics_events row for the buffer."""
+    return {
+        "event_name": event_name,
+        "user_id": user_id,
+        "source": source or "web",
+        "payload": payload,
+        "created_at": created_at or datetime.utcnow(),
+    }
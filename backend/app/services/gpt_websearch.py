@@ -5,6 +5,7 @@ from typing import List, Dict, Any, Tuple
 from pydantic import BaseModel, Field, ValidationError
 from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
 from app.services.websearch import search_membership_sites
 
 client = get_openai_client()
@@ -71,7 +72,9 @@ def search_and_extract_benefits_with_gpt(
         )
 
         # Use GPT-4o-mini-search-preview which has built-in web search
-        response = client.chat.completions.create(
+        response = llm_metrics.chat_completion(
+            "gpt_websearch",
+            client,
             model="gpt-4o-mini-search-preview",  # Model with built-in web search!
             messages=[
                 {
@@ -151,6 +154,7 @@ Return ONLY the JSON object, no markdown, no explanations, just pure JSON.""",
         content = response.choices[0].message.content
         if not content:
             print("  ⚠️ GPT returned empty response, falling back to DuckDuckGo")
+            llm_metrics.record_fallback("gpt_websearch", "gpt-4o-mini-search-preview")
             fallback_results = search_membership_sites(
                 f"{membership_name} benefits", limit=5
             )
@@ -229,6 +233,7 @@ Return ONLY the JSON object, no markdown, no explanations, just pure JSON.""",
             print(f"  ⚠️ Failed to parse GPT response: {e}")
             print(f"  📄 Raw response: {content[:500]}")
             print(f"  🔄 Falling back to DuckDuckGo search...")
+            llm_metrics.record_fallback("gpt_websearch", "gpt-4o-mini-search-preview")
             fallback_results = search_membership_sites(
                 f"{membership_name} benefits", limit=5
             )
@@ -243,6 +248,7 @@ Return ONLY the JSON object, no markdown, no explanations, just pure JSON.""",
 
         traceback.print_exc()
         # Fallback to direct search
+        llm_metrics.record_fallback("gpt_websearch", "gpt-4o-mini-search-preview")
         print(f"  🔄 Falling back to DuckDuckGo search...")
         fallback_results = search_membership_sites(
             f"{membership_name} benefits", limit=5
@@ -0,0 +1,65 @@
+"""HyperLogLog sketches for approximate distinct counts.
+
+Sketches are stored as raw register bytes (one byte per register) so rollup
+rows can hold them in a bytea column and be merged with an element-wise max.
+With 2^11 registers the standard error is about 2.3%.
+"""
+
+import hashlib
+import math
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+HLL_PRECISION = 11
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HASH_BITS = 64
+_ALPHA = 0.7213 / (1 + 1.079 / HLL_REGISTERS)
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch."""
+
+    __slots__ = ("registers",)
+
+    def __init__(self, registers: Optional[bytes] = None):
+        if registers:
+            self.registers = np.frombuffer(registers, dtype=np.uint8).copy()
+            if self.registers.size != HLL_REGISTERS:
+                raise ValueError(f"Expected {HLL_REGISTERS} registers, got {self.registers.size}")
+        else:
+            self.registers = np.zeros(HLL_REGISTERS, dtype=np.uint8)
+
+    @classmethod
+    def of(cls, values: Iterable) -> "HyperLogLog":
+        sketch = cls()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def add(self, value) -> None:
+        digest = hashlib.blake2b(str(value).encode(), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        index = hashed >> (_HASH_BITS - HLL_PRECISION)
+        rest_bits = _HASH_BITS - HLL_PRECISION
+        rest = hashed & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        registers = self.registers.astype(np.float64)
+        estimate = _ALPHA * HLL_REGISTERS**2 / np.sum(np.exp2(-registers))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Small-range correction (linear counting)
+        if estimate <= 2.5 * HLL_REGISTERS and zeros:
+            estimate = HLL_REGISTERS * math.log(HLL_REGISTERS / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return self.registers.tobytes()
@@ -2,6 +2,7 @@
 
 from datetime import datetime
 from typing import Dict, Any
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app.models import Membership, Benefit
@@ -9,6 +10,7 @@ from app.services.websearch import search_membership_sites
 from app.services.fetcher import fetch_pages
 from app.services.llm_extract import extract_benefits_from_pages
 from app.services.gpt_websearch import search_with_gpt
+from app.services.catalog import invalidate_catalog
 
 
 def _generate_slug(name: str) -> str:
@@ -21,6 +23,42 @@ def _generate_slug(name: str) -> str:
     return slug.strip("-")
 
 
+def _existing_membership_result(db: Session, existing: Membership) -> Dict[str, Any]:
+    """Preview of a membership that is already in the database."""
+    # Return existing with its benefits
+    benefits = db.query(Benefit).filter(Benefit.membership_id == existing.id).all()
+
+    # Filter out placeholder benefits and check if real benefits exist
+    real_benefits = [
+        b for b in benefits if b.title != "Membership added - no benefits found"
+    ]
+    benefits_found = len(real_benefits) > 0
+
+    # Return all benefits (including placeholders) but mark if real ones exist
+    return {
+        "membership": {
+            "id": existing.id,
+            "name": existing.name,
+            "provider_slug": existing.provider_slug,
+            "status": existing.status,
+            "is_catalog": existing.is_catalog,
+        },
+        "benefits_preview": [
+            {
+                "id": b.id,
+                "title": b.title,
+                "description": b.description,
+                "category": b.category,
+                "vendor_domain": b.vendor_domain,
+                "source_url": b.source_url,
+                "validation_status": b.validation_status,
+            }
+            for b in benefits
+        ],
+        "benefits_found": benefits_found,  # Flag indicating if real benefits exist
+    }
+
+
 def ingest_unknown_membership(db: Session, user_id: int, name: str) -> Dict[str, Any]:
     """
     Discover and ingest an unknown membership.
@@ -49,38 +87,7 @@ def ingest_unknown_membership(db: Session, user_id: int, name: str) -> Dict[str,
     existing = db.query(Membership).filter(Membership.provider_slug == slug).first()
 
     if existing:
-        # Return existing with its benefits
-        benefits = db.query(Benefit).filter(Benefit.membership_id == existing.id).all()
-
-        # Filter out placeholder benefits and check if real benefits exist
-        real_benefits = [
-            b for b in benefits if b.title != "Membership added - no benefits found"
-        ]
-        benefits_found = len(real_benefits) > 0
-
-        # Return all benefits (including placeholders) but mark if real ones exist
-        return {
-            "membership": {
-                "id": existing.id,
-                "name": existing.name,
-                "provider_slug": existing.provider_slug,
-                "status": existing.status,
-                "is_catalog": existing.is_catalog,
-            },
-            "benefits_preview": [
-                {
-                    "id": b.id,
-                    "title": b.title,
-                    "description": b.description,
-                    "category": b.category,
-                    "vendor_domain": b.vendor_domain,
-                    "source_url": b.source_url,
-                    "validation_status": b.validation_status,
-                }
-                for b in benefits
-            ],
-            "benefits_found": benefits_found,  # Flag indicating if real benefits exist
-        }
+        return _existing_membership_result(db, existing)
 
     # Step 2: Use GPT-4o-mini-search-preview to search the web and extract benefits directly
     print(f"🔍 Using GPT-4o-mini-search-preview with built-in web search for '{name}'...")
@@ -128,18 +135,28 @@ def ingest_unknown_membership(db: Session, user_id: int, name: str) -> Dict[str,
     plan_name = " ".join(name.split()[1:]) if len(name.split()) > 1 else "Standard"
     from app.services.membership_tiers import get_plan_tier
     
-    membership = Membership(
-        name=name,
-        provider_slug=slug,
-        is_catalog=True,  # Make it available in catalog immediately
-        status="active",  # Set as active so user can add it
-        discovered_by_user_id=user_id,
-        provider_name=provider_name,
-        plan_name=plan_name,
-        plan_tier=get_plan_tier(provider_name, plan_name),
-    )
-    db.add(membership)
-    db.flush()  # Get ID
+    # Discovery takes a while, so another request (or another subscription on
+    # the same statement) may have created this slug in the meantime
+    membership_id = db.execute(
+        insert(Membership)
+        .values(
+            name=name,
+            provider_slug=slug,
+            is_catalog=True,  # Make it available in catalog immediately
+            status="active",  # Set as active so user can add it
+            discovered_by_user_id=user_id,
+            provider_name=provider_name,
+            plan_name=plan_name,
+            plan_tier=get_plan_tier(provider_name, plan_name),
+        )
+        .on_conflict_do_nothing(index_elements=[Membership.provider_slug])
+        .returning(Membership.id)
+    ).scalar()
+    if membership_id is None:
+        print(f"ℹ️  '{slug}' was created while discovering benefits - using the existing membership")
+        existing = db.query(Membership).filter(Membership.provider_slug == slug).one()
+        return _existing_membership_result(db, existing)
+    membership = db.get(Membership, membership_id)
 
     # Step 6: Insert benefits as approved (since membership is active)
     # Ensure all fields are properly set so benefits work across all components/pages/calculations
@@ -181,6 +198,7 @@ def ingest_unknown_membership(db: Session, user_id: int, name: str) -> Dict[str,
         )
 
     db.commit()
+    invalidate_catalog()
 
     # Step 7: Return preview
     return {
@@ -5,6 +5,7 @@ from pydantic import BaseModel, Field, ValidationError
 
 from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
 
 
 client = get_openai_client()
@@ -119,9 +120,13 @@ def extract_benefits_from_pages(
     formatted_prompt = EXTRACTION_PROMPT.replace("{membership_name}", membership_name)
     
     for attempt in range(max_retries + 1):
+        if attempt > 0:
+            llm_metrics.record_retry("llm_extract", "gpt-4o-mini")
         try:
             print(f"  📞 Calling GPT-4o-mini (attempt {attempt + 1}/{max_retries + 1}) to extract benefits from internet search results...")
-            response = client.chat.completions.create(
+            response = llm_metrics.chat_completion(
+                "llm_extract",
+                client,
                 model="gpt-4o-mini",  # Using GPT-4o-mini to extract benefits from internet search results
                 messages=[
                     {"role": "system", "content": formatted_prompt},
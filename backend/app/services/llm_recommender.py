@@ -7,12 +7,16 @@ from pydantic import ValidationError
 
 from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
+from app.core.deadline import Deadline, DeadlineExceeded, hedged_call
 from app.models import Benefit, UserMembership, Membership
 from app.schemas.llm import RecommendationDTO
 from app.schemas.benefit import BenefitRead
 from app.services.llm_prompts import RECO_PROMPT, ADD_FLOW_PROMPT
 from app.services.id_map import resolve_benefit_ids
 from app.services.membership_tiers import get_plan_tier
+from app.services.catalog import CatalogSnapshot, get_catalog
+from app.services.domain_index import get_domain_index
 from sqlalchemy.orm import defer
 
 
@@ -158,6 +162,7 @@ def _call_openai(
     user_data: Dict[str, Any],
     model: str = settings.model_reco,
     max_retries: int = 2,
+    deadline: Optional[Deadline] = None,
 ) -> Optional[Dict[str, Any]]:
     """
     Call OpenAI API with retry logic.
@@ -167,29 +172,41 @@ def _call_openai(
         user_data: Data to inject into prompt
         model: OpenAI model to use
         max_retries: Number of retries on failure
+        deadline: Latency budget; falls back to rule-based recommendations when spent
 
     Returns:
         Parsed JSON response or None on failure
     """
     if not client:
         # Return mock recommendations when no API key is configured
+        llm_metrics.record_fallback("llm_recommender", model)
         return _generate_mock_recommendations(user_data, prompt)
 
     formatted_prompt = prompt.format(user_data=json.dumps(user_data, indent=2))
 
+    def _request(timeout: float):
+        return llm_metrics.chat_completion(
+            "llm_recommender",
+            client,
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a helpful assistant that returns only valid JSON.",
+                },
+                {"role": "user", "content": formatted_prompt},
+            ],
+            temperature=0.7,
+            response_format={"type": "json_object"},
+            timeout=timeout,
+        )
+
     for attempt in range(max_retries):
+        if attempt > 0:
+            llm_metrics.record_retry("llm_recommender", model)
         try:
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that returns only valid JSON.",
-                    },
-                    {"role": "user", "content": formatted_prompt},
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"},
+            response = hedged_call(
+                _request, deadline, call_site="llm_recommender", model=model
             )
 
             content = response.choices[0].message.content
@@ -200,18 +217,40 @@ def _call_openai(
             result = json.loads(content)
             return result
 
+        except DeadlineExceeded as e:
+            # Out of time - no point retrying, use the rule-based recommendations
+            print(f"OpenAI call abandoned: {e}")
+            break
         except (json.JSONDecodeError, Exception) as e:
             print(f"OpenAI call attempt {attempt + 1} failed: {e}")
             if attempt == max_retries - 1:
                 # Fall back to mock recommendations to avoid user-facing errors/timeouts.
+                llm_metrics.record_fallback("llm_recommender", model)
                 return _generate_mock_recommendations(user_data, prompt)
             continue
 
+    llm_metrics.record_fallback("llm_recommender", model)
     return _generate_mock_recommendations(user_data, prompt)
 
 
+def _known_benefit_ids(catalog: CatalogSnapshot, benefit_ids: List[Any]) -> List[int]:
+    """Keep only IDs of approved benefits in the catalog (deduplicated, in order)."""
+    known = []
+    for bid in benefit_ids or []:
+        try:
+            bid = int(bid)
+        except (TypeError, ValueError):
+            continue
+        if bid in catalog.benefits_by_id and bid not in known:
+            known.append(bid)
+    return known
+
+
 def generate_llm_recommendations(
-    db: Session, user_id: int, context: Optional[Dict[str, Any]] = None
+    db: Session,
+    user_id: int,
+    context: Optional[Dict[str, Any]] = None,
+    deadline: Optional[Deadline] = None,
 ) -> Tuple[List[RecommendationDTO], List[BenefitRead]]:
     """
     Generate LLM-powered recommendations for a user.
@@ -220,36 +259,34 @@ def generate_llm_recommendations(
         db: Database session
         user_id: User ID
         context: Optional context (domain, category)
+        deadline: Optional latency budget for the LLM stage
 
     Returns:
         Tuple of (recommendations, relevant_benefits)
     """
-    # Get user's memberships
-    # Defer plan_tier to avoid errors if column doesn't exist yet (migration not run)
-    user_memberships = (
-        db.query(UserMembership, Membership)
-        .join(Membership, UserMembership.membership_id == Membership.id)
-        .options(defer(Membership.plan_tier))
+    # Get user's memberships (catalog data comes from the in-memory snapshot)
+    catalog = get_catalog()
+    owned_ids = [
+        membership_id
+        for (membership_id,) in db.query(UserMembership.membership_id)
         .filter(UserMembership.user_id == user_id)
-        .all()
-    )
+        .distinct()
+    ]
+    user_memberships = [
+        catalog.memberships_by_id[mid]
+        for mid in owned_ids
+        if mid in catalog.memberships_by_id
+    ]
 
     if not user_memberships:
         return [], []
 
     # Get all APPROVED benefits for user's memberships
-    # Exclude pending/rejected benefits from recommendations
-    membership_ids = [um.membership_id for um, _ in user_memberships]
-    benefits = (
-        db.query(Benefit, Membership)
-        .join(Membership, Benefit.membership_id == Membership.id)
-        .options(defer(Membership.plan_tier))
-        .filter(
-            Benefit.membership_id.in_(membership_ids),
-            Benefit.validation_status == "approved",
-        )
-        .all()
-    )
+    # (the snapshot only holds approved benefits)
+    membership_ids = [m.id for m in user_memberships]
+    benefits = [
+        (b, m) for m in user_memberships for b in catalog.membership_benefits(m.id)
+    ]
     user_benefit_ids = {b.id for b, _ in benefits}
     user_membership_ids = set(membership_ids)
 
@@ -257,11 +294,11 @@ def generate_llm_recommendations(
     filtered_benefits = benefits
     if context:
         if context.get("domain"):
-            domain = context["domain"].lower()
+            domain_index = get_domain_index()
             filtered_benefits = [
                 (b, m)
                 for b, m in benefits
-                if b.vendor_domain and domain in b.vendor_domain.lower()
+                if domain_index.matches(context["domain"], b.vendor_domain)
             ]
         elif context.get("category"):
             category = context["category"].lower()
@@ -273,32 +310,14 @@ def generate_llm_recommendations(
 
     # Get available memberships (for add_membership recommendations)
     # Exclude memberships user already has
-    # Defer plan_tier to avoid errors if column doesn't exist yet (migration not run)
-    available_memberships = (
-        db.query(Membership)
-        .options(defer(Membership.plan_tier))
-        .filter(
-            Membership.status == "active",
-            ~Membership.id.in_(membership_ids)
-        )
-        .limit(50)  # Limit to avoid huge payloads
-        .all()
-    )
+    available_memberships = [
+        m for m in catalog.active_memberships() if m.id not in user_membership_ids
+    ][:50]  # Limit to avoid huge payloads
     
     # Get benefits for available memberships to help AI understand what they offer
-    available_membership_ids = [m.id for m in available_memberships]
-    available_benefits = []
-    if available_membership_ids:
-        available_benefits_query = (
-            db.query(Benefit, Membership)
-            .join(Membership, Benefit.membership_id == Membership.id)
-            .filter(
-                Benefit.membership_id.in_(available_membership_ids),
-                Benefit.validation_status == "approved",
-            )
-            .limit(200)  # Limit to avoid huge payloads
-        )
-        available_benefits = available_benefits_query.all()
+    available_benefits = [
+        (b, m) for m in available_memberships for b in catalog.membership_benefits(m.id)
+    ][:200]  # Limit to avoid huge payloads
     
     # Build payload for LLM with tier information
     user_data = {
@@ -310,7 +329,7 @@ def generate_llm_recommendations(
                 "plan_name": m.plan_name,
                 "plan_tier": getattr(m, 'plan_tier', None) or get_plan_tier(m.provider_name or "", m.plan_name or "")
             }
-            for _, m in user_memberships
+            for m in user_memberships
         ],
         "benefits": [
             {
@@ -348,7 +367,7 @@ def generate_llm_recommendations(
     }
 
     # Call OpenAI
-    llm_response = _call_openai(RECO_PROMPT, user_data)
+    llm_response = _call_openai(RECO_PROMPT, user_data, deadline=deadline)
 
     if not llm_response:
         return [], []
@@ -364,7 +383,7 @@ def generate_llm_recommendations(
                 continue
 
             # Validate benefit IDs
-            benefit_ids = resolve_benefit_ids(db, rec_data.get("benefit_match_ids", []))
+            benefit_ids = _known_benefit_ids(catalog, rec_data.get("benefit_match_ids", []))
             
             # Tips and overlaps must only reference benefits the user actually has
             if rec_data.get("kind") in {"overlap", "tip", "unused"}:
@@ -385,8 +404,9 @@ def generate_llm_recommendations(
             # CRITICAL: Only show overlap recommendations if benefits are from DIFFERENT memberships
             if rec_data.get("kind") == "overlap" and len(benefit_ids) > 1:
                 # Get the membership IDs for these benefits
-                benefit_objects = db.query(Benefit).filter(Benefit.id.in_(benefit_ids)).all()
-                membership_ids = [b.membership_id for b in benefit_objects]
+                membership_ids = [
+                    catalog.benefits_by_id[bid].membership_id for bid in benefit_ids
+                ]
                 
                 # If all benefits are from the same membership, skip this recommendation
                 if len(set(membership_ids)) == 1:
@@ -405,21 +425,23 @@ def generate_llm_recommendations(
             continue
 
     # Get relevant benefits
-    relevant_benefit_ids = resolve_benefit_ids(
-        db, llm_response.get("relevant_benefits", [])
+    relevant_benefit_ids = _known_benefit_ids(
+        catalog, llm_response.get("relevant_benefits", [])
     )
-
-    relevant_benefits = []
-    if relevant_benefit_ids:
-        benefit_objects = (
-            db.query(Benefit).filter(Benefit.id.in_(relevant_benefit_ids)).all()
-        )
-        relevant_benefits = [BenefitRead.model_validate(b) for b in benefit_objects]
+    relevant_benefits = [
+        BenefitRead.model_validate(catalog.benefits_by_id[bid])
+        for bid in relevant_benefit_ids
+    ]
 
     return recommendations, relevant_benefits
 
 
-def smart_add_check(db: Session, user_id: int, candidate_slug: str) -> Dict[str, Any]:
+def smart_add_check(
+    db: Session,
+    user_id: int,
+    candidate_slug: str,
+    deadline: Optional[Deadline] = None,
+) -> Dict[str, Any]:
     """
     Check if adding a membership is smart given user's current memberships.
 
@@ -427,6 +449,7 @@ def smart_add_check(db: Session, user_id: int, candidate_slug: str) -> Dict[str,
         db: Database session
         user_id: User ID
         candidate_slug: Membership slug being considered
+        deadline: Optional latency budget for the LLM stage
 
     Returns:
         Dictionary with decision, explanation, alternatives, impacted benefits
@@ -501,7 +524,7 @@ def smart_add_check(db: Session, user_id: int, candidate_slug: str) -> Dict[str,
     }
 
     # Call OpenAI
-    llm_response = _call_openai(ADD_FLOW_PROMPT, input_data)
+    llm_response = _call_openai(ADD_FLOW_PROMPT, input_data, deadline=deadline)
 
     if not llm_response:
         return {
@@ -1,18 +1,38 @@
 """GPT-powered membership validation service."""
 
+import copy
 import json
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, List, Optional, Tuple
+from cachetools import TTLCache
 from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
 from app.models import Membership
+from app.services.catalog import CatalogSnapshot, get_catalog, invalidate_catalog
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = None
+    process = None
 
 # Get shared OpenAI client
 client = get_openai_client()
 
+# GPT verdicts keyed by normalized name (valid for 24 hours)
+validation_cache = TTLCache(maxsize=5000, ttl=86400)
+
+# Searchable catalog names, rebuilt whenever the catalog snapshot changes
+_catalog_index: Optional[Tuple[CatalogSnapshot, tuple]] = None
+
+# Minimum rapidfuzz score (0-100) to resolve a name against the catalog locally
+FUZZY_MATCH_THRESHOLD = 90
+
 
 VALIDATION_PROMPT = """You are an expert at identifying and validating membership programs.
 
@@ -112,6 +132,116 @@ class ValidationResult(BaseModel):
     suggestions: list[str] = []
 
 
+def normalize_membership_name(name: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace ("Netflix-Premium!" -> "netflix premium")."""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split())
+
+
+def _membership_summary(membership) -> Dict[str, Any]:
+    return {
+        "id": membership.id,
+        "name": membership.name,
+        "provider_name": membership.provider_name,
+        "plan_name": membership.plan_name,
+        "provider_slug": membership.provider_slug,
+        "is_catalog": membership.is_catalog,
+        "status": membership.status,
+    }
+
+
+def _get_catalog_index() -> Tuple[List[str], List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Build (or reuse) the fuzzy search index over active catalog memberships.
+
+    Each membership is indexed under its name, its slug and "provider plan".
+
+    Returns:
+        Tuple of (normalized search keys, membership summary per key,
+        key -> position for exact lookups)
+    """
+    global _catalog_index
+
+    catalog = get_catalog()
+    cached = _catalog_index
+    if cached is not None and cached[0] is catalog:
+        return cached[1]
+
+    keys: List[str] = []
+    entries: List[Dict[str, Any]] = []
+    positions: Dict[str, int] = {}
+    for membership in catalog.active_memberships(catalog_only=True):
+        summary = _membership_summary(membership)
+        variants = {
+            normalize_membership_name(membership.name),
+            normalize_membership_name(membership.provider_slug),
+            normalize_membership_name(
+                f"{membership.provider_name or ''} {membership.plan_name or ''}"
+            ),
+        }
+        for key in variants:
+            if key:
+                positions.setdefault(key, len(keys))
+                keys.append(key)
+                entries.append(summary)
+
+    index = (keys, entries, positions)
+    _catalog_index = (catalog, index)
+    return index
+
+
+def find_catalog_match(membership_name: str) -> Optional[Tuple[Dict[str, Any], float]]:
+    """
+    Resolve a membership name against the catalog without calling GPT.
+
+    Args:
+        membership_name: Name provided by user
+
+    Returns:
+        (membership summary, confidence 0-1) for a high-confidence match, else None
+    """
+    normalized = normalize_membership_name(membership_name)
+    if not normalized:
+        return None
+
+    keys, entries, positions = _get_catalog_index()
+    if normalized in positions:
+        return entries[positions[normalized]], 1.0
+
+    if process is None or not keys:
+        return None
+
+    match = process.extractOne(
+        normalized,
+        keys,
+        scorer=fuzz.token_sort_ratio,
+        score_cutoff=FUZZY_MATCH_THRESHOLD,
+    )
+    if not match:
+        return None
+
+    _, score, idx = match
+    return entries[idx], round(score / 100, 3)
+
+
+def _exists_result(membership: Dict[str, Any], confidence: float) -> Dict[str, Any]:
+    return {
+        "status": "exists",
+        "normalized_name": membership["name"],
+        "provider": membership["provider_name"],
+        "plan": membership["plan_name"],
+        "confidence": confidence,
+        "reason": f"This membership already exists in our catalog: {membership['name']}",
+        "suggestions": [],
+        "existing_membership": {
+            "id": membership["id"],
+            "name": membership["name"],
+            "provider_slug": membership["provider_slug"],
+            "is_catalog": membership["is_catalog"],
+            "status": membership["status"],
+        },
+    }
+
+
 def validate_membership_with_gpt(
     db: Session, membership_name: str, max_retries: int = 2
 ) -> Dict[str, Any]:
@@ -135,13 +265,14 @@ def validate_membership_with_gpt(
             "existing_membership": {...} or None  # If found in DB
         }
     """
-    if not client:
-        raise ValueError("OpenAI API key not configured")
+    # Resolve exact and near-exact catalog names locally
+    catalog_match = find_catalog_match(membership_name)
+    if catalog_match:
+        llm_metrics.record_cache_hit("llm_validate_membership", "catalog")
+        return _exists_result(*catalog_match)
 
-    # First, check if it exists in our database with exact match only
-    # Use ilike for case-insensitive exact match (no wildcards)
+    # Catalog memberships added since the index was built
     search_term = membership_name.strip()
-
     existing = (
         db.query(Membership)
         .filter(
@@ -151,29 +282,28 @@ def validate_membership_with_gpt(
         )
         .first()
     )
-
     if existing:
-        return {
-            "status": "exists",
-            "normalized_name": existing.name,
-            "provider": existing.provider_name,
-            "plan": existing.plan_name,
-            "confidence": 1.0,
-            "reason": f"This membership already exists in our catalog: {existing.name}",
-            "suggestions": [],
-            "existing_membership": {
-                "id": existing.id,
-                "name": existing.name,
-                "provider_slug": existing.provider_slug,
-                "is_catalog": existing.is_catalog,
-                "status": existing.status,
-            },
-        }
+        invalidate_catalog()
+        return _exists_result(_membership_summary(existing), 1.0)
+
+    # Reuse a previous GPT verdict for the same name
+    cache_key = normalize_membership_name(membership_name)
+    cached = validation_cache.get(cache_key)
+    if cached is not None:
+        llm_metrics.record_cache_hit("llm_validate_membership", "gpt-4o-mini")
+        return copy.deepcopy(cached)
+
+    if not client:
+        raise ValueError("OpenAI API key not configured")
 
     # Use GPT to validate
     for attempt in range(max_retries + 1):
+        if attempt > 0:
+            llm_metrics.record_retry("llm_validate_membership", "gpt-4o-mini")
         try:
-            response = client.chat.completions.create(
+            response = llm_metrics.chat_completion(
+                "llm_validate_membership",
+                client,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": VALIDATION_PROMPT},
@@ -198,6 +328,7 @@ def validate_membership_with_gpt(
             result_dict = result.model_dump()
             result_dict["existing_membership"] = None
 
+            validation_cache[cache_key] = copy.deepcopy(result_dict)
             return result_dict
 
         except (json.JSONDecodeError, ValidationError) as e:
@@ -1,14 +1,18 @@
 """Benefit matching service."""
 from typing import List
 from sqlalchemy.orm import Session
-from app.models import Benefit, UserMembership
+from app.models import UserMembership
+from app.services.catalog import CatalogBenefit
+from app.services.domain_index import get_domain_index
 
 
-def match_benefits_for_domain(db: Session, user_id: int, domain: str) -> List[Benefit]:
+def match_benefits_for_domain(db: Session, user_id: int, domain: str) -> List[CatalogBenefit]:
     """
     Match benefits for a given domain for a specific user.
     
-    Phase 1: Simple exact/substring matching on vendor_domain.
+    Phase 1: Reverse-domain index lookup - the page domain matches benefits recorded
+    for it, any parent domain down to its registrable domain, and vendor aliases
+    (www.amazon.co.uk and smile.amazon.com both match an amazon.co.uk benefit).
     TODO Phase 2: Add embedding-based semantic fallback for fuzzy vendor matching.
     
     Args:
@@ -17,25 +21,22 @@ def match_benefits_for_domain(db: Session, user_id: int, domain: str) -> List[Be
         domain: Domain to match against (e.g., "booking.com")
         
     Returns:
-        List of matching benefits from user's memberships
+        List of matching approved benefits from user's memberships
     """
     # Get user's memberships
     user_membership_ids = db.query(UserMembership.membership_id).filter(
         UserMembership.user_id == user_id
     ).all()
-    membership_ids = [um[0] for um in user_membership_ids]
+    membership_ids = {um[0] for um in user_membership_ids}
     
     if not membership_ids:
         return []
     
-    # Phase 1: Exact and substring match on vendor_domain
-    # Only match APPROVED benefits
-    domain_lower = domain.lower()
-    benefits = db.query(Benefit).filter(
-        Benefit.membership_id.in_(membership_ids),
-        Benefit.vendor_domain.ilike(f"%{domain_lower}%"),
-        Benefit.validation_status == "approved"
-    ).all()
-    
-    return benefits
-
+    # Only APPROVED benefits are in the catalog snapshot the index is built from
+    index = get_domain_index()
+    benefits_by_id = index.catalog.benefits_by_id
+    return [
+        benefits_by_id[benefit_id]
+        for benefit_id in sorted(index.benefit_ids(domain))
+        if benefits_by_id[benefit_id].membership_id in membership_ids
+    ]
@@ -0,0 +1,108 @@
+"""Normalized-name index for fuzzy matching subscriptions to catalog memberships.
+
+Each active membership contributes up to three normalized keys (name,
+provider_name, provider_slug). The keys are built once per catalog snapshot,
+so matching a statement is a single rapidfuzz.process.cdist call over
+(subscriptions x keys) followed by a per-row argmax, instead of re-normalizing
+and scoring the whole catalog for every subscription.
+"""
+
+import re
+import threading
+from difflib import SequenceMatcher
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.services.catalog import CatalogMembership, CatalogSnapshot, get_catalog
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = None
+    process = None
+
+
+PLAN_SUFFIX = re.compile(
+    r'\s+(premium|pro|plus|standard|basic|tier|plan|subscription|membership)$',
+    re.IGNORECASE,
+)
+
+
+def normalize_name(name: str) -> str:
+    """Normalize membership name for comparison."""
+    # Remove common suffixes, convert to lowercase
+    return PLAN_SUFFIX.sub('', name).lower().strip()
+
+
+class MembershipNameIndex:
+    """Normalized match keys for the active memberships of one catalog snapshot."""
+
+    def __init__(self, catalog: CatalogSnapshot):
+        self.catalog = catalog
+        self.memberships: List[CatalogMembership] = catalog.active_memberships()
+
+        keys: List[str] = []
+        owners: List[int] = []
+        for position, membership in enumerate(self.memberships):
+            values = (membership.name, membership.provider_name, membership.provider_slug)
+            for key in dict.fromkeys(normalize_name(value or "") for value in values):
+                if key:
+                    keys.append(key)
+                    owners.append(position)
+        self.keys = keys
+        self.owners = np.array(owners, dtype=np.int64)
+
+    def _scores(self, queries: List[str]) -> np.ndarray:
+        if process is not None:
+            return process.cdist(queries, self.keys, scorer=fuzz.ratio, dtype=np.float32)
+        return np.array(
+            [
+                [SequenceMatcher(None, query, key).ratio() * 100 for key in self.keys]
+                for query in queries
+            ],
+            dtype=np.float32,
+        ).reshape(len(queries), len(self.keys))
+
+    def match_many(
+        self, names: Sequence[str], threshold: int = 80
+    ) -> List[Optional[CatalogMembership]]:
+        """
+        Match subscription names to memberships in one batch.
+
+        Args:
+            names: Subscription names as found on the statement
+            threshold: Minimum fuzzy ratio (0-100) against any of a membership's keys
+
+        Returns:
+            Best-scoring membership per name (earliest on ties), or None below threshold
+        """
+        if not names or not self.keys:
+            return [None] * len(names)
+
+        scores = self._scores([normalize_name(name) for name in names])
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(names)), best]
+        return [
+            self.memberships[self.owners[key]] if score >= threshold else None
+            for key, score in zip(best.tolist(), best_scores.tolist())
+        ]
+
+
+_lock = threading.Lock()
+_index: Optional[MembershipNameIndex] = None
+
+
+def get_membership_name_index() -> MembershipNameIndex:
+    """Return the name index for the current catalog snapshot (rebuilt with it)."""
+    global _index
+
+    catalog = get_catalog()
+    index = _index
+    if index is not None and index.catalog is catalog:
+        return index
+
+    with _lock:
+        if _index is None or _index.catalog is not catalog:
+            _index = MembershipNameIndex(catalog)
+        return _index
@@ -0,0 +1,222 @@
+"""Learned mapping from bank statement descriptors to memberships.
+
+The same descriptors ("DD NETFLIX.COM", "AMZNPrime UK") recur across
+thousands of statements. Each descriptor is normalized to a stable key
+("netflix", "amznprime"). Charges taken through a payment processor keep the
+merchant named after the '*' ("PAYPAL *NETFLIX" -> "paypal netflix"); a bare
+processor key ("paypal") says nothing about the merchant and is never learned. When a subscription found on a statement is
+confirmed against a membership (linked to the user or ingested), its key is
+recorded in merchant_descriptors.
+
+Once a key has descriptor_min_confirmations net confirmations, later statements resolve
+it locally and only the remaining lines are sent to the LLM. Conflicting
+confirmations vote: a different membership decrements the count, and replaces
+the mapping when the count would drop below one.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cachetools import TTLCache
+from sqlalchemy import case, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models import MerchantDescriptor, Membership
+
+
+# Payment-method prefixes banks put in front of the merchant
+PAYMENT_PREFIX = re.compile(
+    r'^(?:(?:dd|direct debit|so|standing order|card payment to|card payment|card purchase|'
+    r'payment to|payment|pos|vis|visa|contactless|cnp|bp|bgc|fpo|tfr|debit)\b[\s:*-]*)+'
+)
+# Reference code after a '*' ("AMAZON PRIME*2K4HT1234")
+STAR_SUFFIX = re.compile(r'\s*\*.*$')
+# Processors that name the actual merchant after the '*' ("PAYPAL *NETFLIX",
+# "GOOGLE *YouTube Premium", "SQ *COFFEE HOUSE"), as normalized keys
+PAYMENT_PROCESSORS = {
+    "paypal", "pp", "google", "apple", "apple com bill", "itunes", "sumup", "sq",
+    "square", "zettle", "izettle", "stripe", "uber", "amzn mktp", "amazon mktplace",
+    "paddle", "fs", "2co", "klarna", "clearpay",
+}
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+# Company suffixes, country codes and date connectives at the end of the descriptor
+TRAILING_NOISE = {
+    "com", "co", "uk", "gb", "gbr", "ie", "us", "usa", "lu", "nl", "eu",
+    "ltd", "limited", "plc", "inc", "llc", "www", "on", "at",
+}
+
+
+@dataclass(frozen=True)
+class KnownDescriptor:
+    """A descriptor the map resolves locally."""
+
+    membership_id: int
+    membership_name: str
+    frequency: Optional[str]
+
+
+# Learned mappings by descriptor key; None caches a miss
+descriptor_cache = TTLCache(maxsize=20000, ttl=settings.descriptor_cache_ttl_s)
+_cache_lock = threading.Lock()
+
+
+def _is_reference(token: str) -> bool:
+    # Card numbers, phone numbers, dates and reference codes; short tokens such
+    # as "o2" or "3" are kept because they can be the merchant itself
+    digits = sum(c.isdigit() for c in token)
+    return digits >= 3 or (digits > 0 and len(token) >= 5)
+
+
+def _merchant_tokens(text: str) -> List[str]:
+    words = [w for w in text.split() if not _is_reference(w)]
+    tokens = [t for w in words for t in NON_ALNUM.split(w) if t and not _is_reference(t)]
+    while tokens and tokens[-1] in TRAILING_NOISE:
+        tokens.pop()
+    while tokens and tokens[0] == "www":
+        tokens.pop(0)
+    return tokens
+
+
+def normalize_descriptor(description: str) -> str:
+    """
+    Reduce a statement descriptor to a stable merchant key.
+
+    "DD NETFLIX.COM 866-579-7172" -> "netflix"
+    "AMAZON PRIME*2K4HT1234 GB" -> "amazon prime"
+    "PAYPAL *DISNEYPLUS 35314369001" -> "paypal disneyplus"
+    "GOOGLE *Google Storage" -> "google storage"
+    """
+    text = PAYMENT_PREFIX.sub('', (description or '').lower().strip())
+    head, star, tail = text.partition('*')
+    tokens = _merchant_tokens(head)
+    processor = " ".join(tokens)
+    if star and processor in PAYMENT_PROCESSORS:
+        merchant = _merchant_tokens(STAR_SUFFIX.sub('', tail))
+        # "GOOGLE *Google Storage" -> "google storage", not "google google storage"
+        if merchant[:len(tokens)] == tokens:
+            merchant = merchant[len(tokens):]
+        tokens += merchant
+    return " ".join(tokens)
+
+
+def is_learnable(key: str) -> bool:
+    """Whether a descriptor key identifies a merchant (not empty or a bare processor)."""
+    return bool(key) and key not in PAYMENT_PROCESSORS
+
+
+def lookup_descriptors(keys: Iterable[str]) -> Dict[str, KnownDescriptor]:
+    """
+    Resolve normalized descriptor keys with enough confirmations.
+
+    Args:
+        keys: Keys from normalize_descriptor
+
+    Returns:
+        Known descriptors by key (unknown keys are omitted)
+    """
+    found: Dict[str, KnownDescriptor] = {}
+    missing: List[str] = []
+    with _cache_lock:
+        for key in dict.fromkeys(k for k in keys if is_learnable(k)):
+            if key in descriptor_cache:
+                if descriptor_cache[key] is not None:
+                    found[key] = descriptor_cache[key]
+            else:
+                missing.append(key)
+    if not missing:
+        return found
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                MerchantDescriptor.descriptor,
+                MerchantDescriptor.membership_id,
+                MerchantDescriptor.frequency,
+                Membership.name,
+            )
+            .join(Membership, Membership.id == MerchantDescriptor.membership_id)
+            .where(
+                MerchantDescriptor.descriptor.in_(missing),
+                MerchantDescriptor.confirmations >= settings.descriptor_min_confirmations,
+            )
+        ).all()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️  Descriptor lookup failed: {e}")
+        return found
+    finally:
+        db.close()
+
+    loaded = {
+        row.descriptor: KnownDescriptor(row.membership_id, row.name, row.frequency)
+        for row in rows
+    }
+    with _cache_lock:
+        for key in missing:
+            descriptor_cache[key] = loaded.get(key)
+    found.update(loaded)
+    return found
+
+
+def learn_descriptors(db: Session, matches: List[Tuple[str, int, Optional[str]]]) -> int:
+    """
+    Record confirmed descriptor -> membership matches.
+
+    Args:
+        db: Database session (committed here)
+        matches: (descriptor key, membership_id, frequency) tuples
+
+    Returns:
+        Number of descriptors recorded
+    """
+    # One row per descriptor: ON CONFLICT cannot update the same row twice
+    rows = {
+        descriptor: {
+            "descriptor": descriptor,
+            "membership_id": membership_id,
+            "frequency": frequency,
+            "confirmations": 1,
+            "updated_at": datetime.utcnow(),
+        }
+        for descriptor, membership_id, frequency in matches
+        if is_learnable(descriptor)
+    }
+    if not rows:
+        return 0
+
+    stmt = insert(MerchantDescriptor).values(list(rows.values()))
+    same = MerchantDescriptor.membership_id == stmt.excluded.membership_id
+    replace = MerchantDescriptor.confirmations <= 1
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MerchantDescriptor.descriptor],
+        set_={
+            "membership_id": case(
+                (same | replace, stmt.excluded.membership_id),
+                else_=MerchantDescriptor.membership_id,
+            ),
+            "frequency": case(
+                (same | replace, stmt.excluded.frequency),
+                else_=MerchantDescriptor.frequency,
+            ),
+            "confirmations": case(
+                (same, MerchantDescriptor.confirmations + 1),
+                (replace, 1),
+                else_=MerchantDescriptor.confirmations - 1,
+            ),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+    db.commit()
+
+    with _cache_lock:
+        for descriptor in rows:
+            descriptor_cache.pop(descriptor, None)
+    return len(rows)
@@ -0,0 +1,135 @@
+"""Template-first user messages for semantic benefit matches.
+
+Most match sets have one clear top match, and the message is then always one
+of a few fixed shapes ("you already have X from Y"). Those are rendered from
+templates here; only sets with several close-scoring matches go to the LLM.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+
+
+# Words in a domain/title that indicate a comparison or shopping site
+COMPARISON_SITE_WORDS = ["compare", "comparison", "shop", "find", "search", "deals", "best"]
+
+# A top match this far ahead of the runner-up is "clear" and gets a template
+CLEAR_MATCH_MARGIN = 0.05
+
+MESSAGE_TEMPLATES = {
+    "comparison": "Hey! You already have {benefit} from {membership} - you might not need this!",
+    "service": "Good news! You have {benefit} from your {membership} that works here!",
+}
+
+
+def is_comparison_site(page_metadata: Dict[str, Any]) -> bool:
+    """Detect comparison/shopping sites from the page domain and title."""
+    domain = (page_metadata.get("domain") or "").lower()
+    title = (page_metadata.get("title") or "").lower()
+    return any(word in domain or word in title for word in COMPARISON_SITE_WORDS)
+
+
+def select_template(
+    page_metadata: Dict[str, Any], semantic_matches: List[Dict[str, Any]]
+) -> Optional[str]:
+    """
+    Pick a template for the match set, or None if the LLM should summarize it.
+
+    Args:
+        page_metadata: Page metadata
+        semantic_matches: Matches sorted by similarity_score (highest first)
+
+    Returns:
+        Template name, or None when several matches score too closely
+    """
+    if not semantic_matches:
+        return None
+
+    if len(semantic_matches) > 1:
+        margin = (
+            semantic_matches[0]["similarity_score"]
+            - semantic_matches[1]["similarity_score"]
+        )
+        same_benefit = all(
+            m["benefit_title"] == semantic_matches[0]["benefit_title"]
+            for m in semantic_matches
+        )
+        if margin < CLEAR_MATCH_MARGIN and not same_benefit:
+            return None
+
+    return "comparison" if is_comparison_site(page_metadata) else "service"
+
+
+def render_message(
+    page_metadata: Dict[str, Any],
+    semantic_matches: List[Dict[str, Any]],
+    template: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Render a message about the top match from a template.
+
+    Args:
+        page_metadata: Page metadata
+        semantic_matches: Matches sorted by similarity_score (highest first)
+        template: Template name (defaults to comparison/service by site type)
+
+    Returns:
+        Result dict in the same shape as the LLM-generated message
+    """
+    top_match = semantic_matches[0]
+    if template is None:
+        template = "comparison" if is_comparison_site(page_metadata) else "service"
+
+    return {
+        "has_matches": True,
+        "message": MESSAGE_TEMPLATES[template].format(
+            benefit=top_match["benefit_title"],
+            membership=top_match["membership_name"],
+        ),
+        "action": "View Benefits",
+        "highlight_benefit_ids": [top_match["benefit_id"]],
+        "matches": semantic_matches,
+        "match_count": len(semantic_matches),
+        "message_source": "template",
+    }
+
+
+class MessageStats:
+    """Counts and latency of template vs LLM message generation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.template_hits = 0
+        self.llm_calls = 0
+        self.template_latency_s = 0.0
+        self.llm_latency_s = 0.0
+
+    def record(self, source: str, duration_s: float) -> None:
+        with self._lock:
+            if source == "template":
+                self.template_hits += 1
+                self.template_latency_s += duration_s
+            else:
+                self.llm_calls += 1
+                self.llm_latency_s += duration_s
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.template_hits + self.llm_calls
+            return {
+                "template_hits": self.template_hits,
+                "llm_calls": self.llm_calls,
+                "template_hit_rate": round(self.template_hits / total, 3) if total else 0.0,
+                "avg_template_latency_ms": (
+                    round(self.template_latency_s / self.template_hits * 1000, 3)
+                    if self.template_hits
+                    else 0.0
+                ),
+                "avg_llm_latency_ms": (
+                    round(self.llm_latency_s / self.llm_calls * 1000, 1)
+                    if self.llm_calls
+                    else 0.0
+                ),
+            }
+
+
+message_stats = MessageStats()
@@ -5,43 +5,58 @@ from bs4 import BeautifulSoup
 from typing import Dict, Optional
 from app.core.config import settings
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
+from app.core.deadline import Deadline
 
 # Get shared OpenAI client
 openai_client = get_openai_client()
 
 
-def infer_metadata_from_url(url: str) -> Dict[str, str]:
+def _metadata_from_url_path(url: str) -> Dict[str, str]:
+    """Build basic page metadata from the URL's domain and path alone."""
+    parsed_url = httpx.URL(url)
+    domain = parsed_url.host or ""
+    path = parsed_url.path
+    path_parts = path.strip("/").split("/")
+    path_text = " ".join(
+        part.replace("-", " ").replace("_", " ") for part in path_parts if part
+    )
+
+    return {
+        "url": url,
+        "domain": domain,
+        "title": f"{path_text} {domain}".strip() if path_text else domain,
+        "description": f"Content from {domain}: {path_text}",
+        "h1": path_text,
+        "content_snippet": f"{domain} {path_text}",
+        "og_title": "",
+        "og_description": "",
+        "keywords": "",
+        "llm_inferred": False,
+    }
+
+
+def infer_metadata_from_url(
+    url: str, deadline: Optional[Deadline] = None
+) -> Dict[str, str]:
     """
     Use LLM to infer page metadata when scraping fails.
 
     Args:
         url: Full URL to analyze
+        deadline: Optional latency budget; falls back to URL parsing when spent
 
     Returns:
         Dictionary with inferred metadata
     """
     if not openai_client:
         # Fallback to basic URL parsing
-        parsed_url = httpx.URL(url)
-        domain = parsed_url.host or ""
-        path = parsed_url.path
-        path_parts = path.strip("/").split("/")
-        path_text = " ".join(
-            part.replace("-", " ").replace("_", " ") for part in path_parts if part
-        )
+        return _metadata_from_url_path(url)
 
-        return {
-            "url": url,
-            "domain": domain,
-            "title": f"{path_text} {domain}".strip() if path_text else domain,
-            "description": f"Content from {domain}: {path_text}",
-            "h1": path_text,
-            "content_snippet": f"{domain} {path_text}",
-            "og_title": "",
-            "og_description": "",
-            "keywords": "",
-            "llm_inferred": False,
-        }
+    if deadline is not None and deadline.expired:
+        print("      ⏱️ Latency budget spent - using URL path instead of LLM inference")
+        llm_metrics.record_fallback("page_scraper", "gpt-4o-mini")
+        return _metadata_from_url_path(url)
 
     print(f"      🤖 Using LLM to infer page content from URL...")
 
@@ -63,12 +78,19 @@ Be specific and realistic. Example:
 """
 
     try:
-        response = openai_client.chat.completions.create(
+        response = llm_metrics.chat_completion(
+            "page_scraper",
+            openai_client,
             model="gpt-4o-mini",
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.3,
             max_tokens=200,
+            timeout=(
+                deadline.timeout(settings.openai_timeout_s)
+                if deadline is not None
+                else settings.openai_timeout_s
+            ),
         )
 
         import json
@@ -96,36 +118,21 @@ Be specific and realistic. Example:
 
     except Exception as e:
         print(f"      ❌ LLM inference failed: {str(e)}")
+        llm_metrics.record_fallback("page_scraper", "gpt-4o-mini")
         # Fall back to basic parsing
-        parsed_url = httpx.URL(url)
-        domain = parsed_url.host or ""
-        path = parsed_url.path
-        path_parts = path.strip("/").split("/")
-        path_text = " ".join(
-            part.replace("-", " ").replace("_", " ") for part in path_parts if part
-        )
-
-        return {
-            "url": url,
-            "domain": domain,
-            "title": f"{path_text} {domain}".strip() if path_text else domain,
-            "description": f"Content from {domain}: {path_text}",
-            "h1": path_text,
-            "content_snippet": f"{domain} {path_text}",
-            "og_title": "",
-            "og_description": "",
-            "keywords": "",
-            "llm_inferred": False,
-        }
+        return _metadata_from_url_path(url)
 
 
-async def scrape_page_metadata(url: str, timeout: int = 10) -> Dict[str, str]:
+async def scrape_page_metadata(
+    url: str, timeout: int = 10, deadline: Optional[Deadline] = None
+) -> Dict[str, str]:
     """
     Scrape key metadata from a web page for semantic matching.
 
     Args:
         url: Full URL to scrape
         timeout: Request timeout in seconds
+        deadline: Optional latency budget shared with later pipeline stages
 
     Returns:
         Dictionary with page metadata
@@ -149,7 +156,7 @@ async def scrape_page_metadata(url: str, timeout: int = 10) -> Dict[str, str]:
 
         async with httpx.AsyncClient(
             follow_redirects=True,
-            timeout=timeout,
+            timeout=deadline.timeout(timeout) if deadline is not None else timeout,
             headers=headers,
         ) as client:
             print(f"      📡 Sending HTTP request (real browser headers)...")
@@ -220,7 +227,7 @@ async def scrape_page_metadata(url: str, timeout: int = 10) -> Dict[str, str]:
         print(f"      🎯 FALLBACK: Using LLM to infer page content from URL")
 
         # Use LLM to understand what the page is about from the URL
-        return infer_metadata_from_url(url)
+        return infer_metadata_from_url(url, deadline)
 
 
 def metadata_to_text(metadata: Dict[str, str]) -> str:
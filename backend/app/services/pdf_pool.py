@@ -0,0 +1,224 @@
+"""Process pool for CPU-bound PDF text extraction.
+
+pdfplumber extraction is pure-Python CPU work that holds the GIL, so running it
+in a thread still stalls the worker's event loop. Extraction jobs run in a
+small ProcessPoolExecutor instead:
+
+- statements longer than pdf_pages_per_job pages are split into page ranges
+  extracted in parallel and joined in page order
+- each worker process caps its address space at pdf_job_memory_mb, so a
+  pathological PDF fails with MemoryError instead of exhausting the host
+- each job is interrupted after pdf_job_timeout_s (SIGALRM inside the worker),
+  with an outer asyncio timeout as a backstop that recycles the pool; jobs are
+  handed to the pool only when a worker is free, so time spent waiting for
+  one never counts against the limit
+- uploads spooled to disk are passed by path and memory-mapped by the workers,
+  so the PDF bytes are neither held by the server nor pickled to each job
+
+Worker processes are started with "spawn" so they do not inherit the server's
+threads, sockets or database connections.
+"""
+
+import asyncio
+import io
+import mmap
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple, Union
+
+from app.core.config import settings
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# Appended after each page's text, so the text can be split on page boundaries
+PAGE_BREAK = "\f"
+
+
+class PdfJobTimeout(Exception):
+    """Raised inside a worker when a job exceeds its time limit."""
+
+
+# ---------------------------------------------------------------------------
+# Worker side (runs in the pool processes)
+# ---------------------------------------------------------------------------
+
+
+def _init_worker(memory_mb: int) -> None:
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _raise_timeout(signum, frame):
+    raise PdfJobTimeout()
+
+
+def _run_with_alarm(timeout_s: float, fn, *args):
+    if timeout_s > 0 and hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    try:
+        return fn(*args)
+    finally:
+        if timeout_s > 0 and hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+@contextmanager
+def _open_pdf(source: Union[bytes, str]) -> Iterator:
+    """Open PDF bytes, or memory-map the PDF file at a path."""
+    import pdfplumber
+
+    if isinstance(source, bytes):
+        with pdfplumber.open(io.BytesIO(source)) as pdf:
+            yield pdf
+        return
+
+    with open(source, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with pdfplumber.open(mapped) as pdf:
+                yield pdf
+
+
+def _page_count(source: Union[bytes, str]) -> int:
+    with _open_pdf(source) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pages(source: Union[bytes, str], start: int, stop: int) -> str:
+    text = ""
+    with _open_pdf(source) as pdf:
+        for page in pdf.pages[start:stop]:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n" + PAGE_BREAK
+            # Release the page's parsed layout before moving on
+            page.flush_cache()
+    return text
+
+
+def _job(kind: str, timeout_s: float, source: Union[bytes, str], *args):
+    fn = _page_count if kind == "count" else _extract_pages
+    try:
+        return _run_with_alarm(timeout_s, fn, source, *args)
+    except PdfJobTimeout:
+        raise ValueError("PDF parsing timed out")
+    except MemoryError:
+        raise ValueError("PDF is too complex to parse")
+    except Exception as e:
+        raise ValueError(f"Failed to parse PDF: {str(e)}")
+
+
+# ---------------------------------------------------------------------------
+# Server side
+# ---------------------------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Jobs handed to the pool at once; the rest wait here, outside the time limit
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_slots() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running event loop
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(settings.pdf_pool_workers, 1))
+    return _slots
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.pdf_pool_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(settings.pdf_job_memory_mb,),
+            )
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    """Replace a broken or stuck pool; its processes are terminated."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    for process in list(getattr(pool, "_processes", {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _submit(kind: str, source: Union[bytes, str], *args):
+    # With at most pdf_pool_workers jobs submitted, a job starts as soon as it
+    # is handed over, so the backstop below times the job rather than its wait
+    async with _get_slots():
+        return await _run_in_pool(kind, source, *args)
+
+
+async def _run_in_pool(kind: str, source: Union[bytes, str], *args):
+    pool = _get_pool()
+    timeout_s = settings.pdf_job_timeout_s
+    future = asyncio.get_running_loop().run_in_executor(
+        pool, _job, kind, timeout_s, source, *args
+    )
+    try:
+        # The in-worker alarm should fire first; this catches jobs stuck in C code
+        return await asyncio.wait_for(future, timeout=timeout_s + 5.0)
+    except asyncio.TimeoutError:
+        print("⚠️  PDF job exceeded its time limit, recycling the pool")
+        _reset_pool(pool)
+        raise ValueError("PDF parsing timed out")
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start fresh for the next job
+        print("⚠️  PDF worker crashed, recycling the pool")
+        _reset_pool(pool)
+        raise ValueError("PDF is too complex to parse")
+
+
+def _page_ranges(pages: int, per_job: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + per_job, pages)) for start in range(0, pages, per_job)]
+
+
+async def extract_text_async(source: Union[bytes, str]) -> str:
+    """
+    Extract the text of a PDF in the process pool without blocking the event loop.
+
+    Args:
+        source: PDF bytes, or the path of a PDF file (preferred for uploads:
+            workers memory-map it instead of receiving a copy of the bytes)
+
+    Returns:
+        Extracted text, pages in order
+
+    Raises:
+        ValueError: If the PDF cannot be parsed, or exceeds the time/memory limits
+    """
+    per_job = max(settings.pdf_pages_per_job, 1)
+    pages = await _submit("count", source)
+    if pages <= per_job:
+        return await _submit("extract", source, 0, pages)
+
+    parts = await asyncio.gather(
+        *[_submit("extract", source, start, stop) for start, stop in _page_ranges(pages, per_job)]
+    )
+    return "".join(parts)
+
+
+def shutdown_pdf_pool() -> None:
+    """Stop the worker processes (called on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from app.models import Benefit, UserMembership, Membership
 from app.schemas import Recommendation
+from app.services.domain_index import get_domain_index
 
 
 def recommend(
@@ -87,9 +88,10 @@ def recommend(
     # Context-based recommendations
     if context and context.get("domain"):
         domain = context["domain"]
+        domain_index = get_domain_index()
         matching_benefits = [
             (b, m) for b, m in benefits 
-            if b.vendor_domain and domain.lower() in b.vendor_domain.lower()
+            if domain_index.matches(domain, b.vendor_domain)
         ]
         
         for benefit, membership in matching_benefits:
@@ -5,7 +5,8 @@ from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 from app.services.ai_client import _call, parse_json_response
 from app.services.ai_prompts import RECO_PROMPT, QA_PROMPT
-from app.models import Benefit, UserMembership, Membership
+from app.models import Benefit
+from app.services.user_benefits import load_user_benefit_graph
 from app.core.db import get_db
 
 ALLOWED_RECOMMENDATION_KINDS = {"overlap", "tip", "unused"}
@@ -25,50 +26,30 @@ def build_user_payload(
     Returns:
         Dictionary with user data for AI
     """
-    # Get user's memberships
-    user_memberships = db.query(UserMembership).filter_by(user_id=user_id).all()
-    membership_ids = [um.membership_id for um in user_memberships]
+    graph = load_user_benefit_graph(db, user_id)
 
-    if not membership_ids:
+    if not graph.memberships:
         return {"user_memberships": [], "benefits": [], "context": context or {}}
 
-    # Get membership details
-    memberships_map = {}
-    for membership_id in membership_ids:
-        membership = db.query(Membership).get(membership_id)
-        if membership:
-            memberships_map[membership_id] = membership
-
-    # Get approved benefits only
-    benefits_query = db.query(Benefit).filter(
-        Benefit.membership_id.in_(membership_ids),
-        Benefit.validation_status == "approved",
-    )
-
-    benefits = benefits_query.all()
-
     # Format benefits for AI - include membership_id so AI can detect same-membership overlaps
-    benefits_data = []
-    for benefit in benefits:
-        membership = memberships_map.get(benefit.membership_id)
-        if membership:
-            benefits_data.append(
-                {
-                    "id": benefit.id,
-                    "membership_id": benefit.membership_id,  # Include membership_id for overlap detection
-                    "membership_slug": membership.provider_slug,
-                    "membership_name": membership.name,
-                    "title": benefit.title,
-                    "description": benefit.description or "",
-                    "category": benefit.category or "other",
-                    "vendor_domain": benefit.vendor_domain,
-                    "source_url": benefit.source_url,
-                }
-            )
+    benefits_data = [
+        {
+            "id": benefit.id,
+            "membership_id": benefit.membership_id,  # Include membership_id for overlap detection
+            "membership_slug": membership.provider_slug,
+            "membership_name": membership.name,
+            "title": benefit.title,
+            "description": benefit.description or "",
+            "category": benefit.category or "other",
+            "vendor_domain": benefit.vendor_domain,
+            "source_url": benefit.source_url,
+        }
+        for benefit, membership in graph.benefit_pairs()
+    ]
 
     # Format memberships
     memberships_data = [
-        {"slug": m.provider_slug, "name": m.name} for m in memberships_map.values()
+        {"slug": m.provider_slug, "name": m.name} for m in graph.memberships
     ]
 
     return {
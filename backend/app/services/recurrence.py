@@ -0,0 +1,204 @@
+"""Deterministic detection of recurring payments in statement transactions.
+
+A subscription shows up as the same merchant charged at a regular interval for
+a stable amount. Transactions are grouped by normalized descriptor (see
+merchant_descriptors.normalize_descriptor). Per-group interval and amount
+statistics are then computed in one vectorized pass: np.unique groups,
+np.lexsort orders, np.diff finds intervals and np.bincount aggregates. Each
+group's mean interval is classified against the known billing frequencies,
+and the interval spread and amount variation set the confidence.
+
+Two similar charges a month apart are as likely to be groceries as a
+subscription, so each frequency needs several payments, and callers only
+trust confident results (see bank_statement_parser.identify_subscriptions).
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.merchant_descriptors import is_learnable, normalize_descriptor
+
+
+MONTHS = {
+    m: i + 1
+    for i, m in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+    )
+}
+
+# Day-first numeric dates, as printed on UK statements
+DMY = re.compile(r"^(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})$")
+YMD = re.compile(r"^(\d{4})[/-](\d{1,2})[/-](\d{1,2})$")
+D_MON = re.compile(r"^(\d{1,2})\s+([a-z]{3})[a-z]*\.?(?:\s+(\d{4}))?$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Frequency:
+    name: str
+    days: float  # Expected interval
+    tolerance: float  # Allowed deviation of the mean interval, in days
+    min_payments: int  # Payments needed before the pattern is trusted
+
+
+# Shortest first; an interval is classified as the first frequency it fits
+FREQUENCIES = (
+    Frequency("weekly", 7.0, 1.5, 4),
+    Frequency("fortnightly", 14.0, 2.5, 3),
+    Frequency("monthly", 30.44, 4.0, 3),
+    Frequency("quarterly", 91.3, 10.0, 2),
+    Frequency("annual", 365.25, 15.0, 2),
+)
+
+# Maximum coefficient of variation of the amounts (price changes, FX on foreign charges)
+MAX_AMOUNT_CV = 0.15
+
+
+@dataclass(frozen=True)
+class RecurringPayment:
+    """A merchant charged at a regular interval for a stable amount."""
+
+    descriptor: str
+    description: str  # Most recent raw description
+    frequency: str
+    payments: int
+    amount: float  # Most recent amount
+    mean_interval_days: float
+    confidence: float
+
+
+def parse_statement_date(value: str, default_year: int) -> Optional[date]:
+    """
+    Parse a statement date string ("03/01/2025", "2025-01-03", "3 Jan 2025", "3 Jan").
+
+    Args:
+        value: Date as printed on the statement
+        default_year: Year for dates printed without one
+
+    Returns:
+        The date, or None if it cannot be parsed
+    """
+    value = (value or "").strip()
+    try:
+        match = DMY.match(value)
+        if match:
+            day, month, year = (int(g) for g in match.groups())
+            return date(year + 2000 if year < 100 else year, month, day)
+        match = YMD.match(value)
+        if match:
+            year, month, day = (int(g) for g in match.groups())
+            return date(year, month, day)
+        match = D_MON.match(value)
+        if match and match.group(2).lower() in MONTHS:
+            year = int(match.group(3)) if match.group(3) else default_year
+            return date(year, MONTHS[match.group(2).lower()], int(match.group(1)))
+    except ValueError:
+        pass
+    return None
+
+
+def _default_year(dates: Sequence[str]) -> int:
+    # The latest explicit year on the statement, for dates printed without one
+    years = [int(y) for y in re.findall(r"(?<!\d)((?:19|20)\d{2})(?!\d)", " ".join(dates))]
+    return max(years) if years else datetime.utcnow().year
+
+
+def _group_stats(
+    groups: np.ndarray, ordinals: np.ndarray, amounts: np.ndarray, n_groups: int
+) -> Tuple[np.ndarray, ...]:
+    """Per-group payment count, interval mean/std and amount mean/CV (inputs sorted by group, date)."""
+    counts = np.bincount(groups, minlength=n_groups)
+
+    same = groups[1:] == groups[:-1]
+    intervals = np.diff(ordinals)[same].astype(np.float64)
+    interval_groups = groups[1:][same]
+    n_intervals = np.bincount(interval_groups, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        interval_mean = np.bincount(interval_groups, intervals, n_groups) / n_intervals
+        interval_sq = np.bincount(interval_groups, intervals**2, n_groups) / n_intervals
+        interval_std = np.sqrt(np.maximum(interval_sq - interval_mean**2, 0.0))
+
+        amount_mean = np.bincount(groups, amounts, n_groups) / counts
+        amount_sq = np.bincount(groups, amounts**2, n_groups) / counts
+        amount_cv = np.sqrt(np.maximum(amount_sq - amount_mean**2, 0.0)) / amount_mean
+
+    return counts, interval_mean, interval_std, amount_cv
+
+
+def detect_recurring(transactions: List[Dict[str, Any]]) -> List[RecurringPayment]:
+    """
+    Find recurring payments in a list of transactions.
+
+    Args:
+        transactions: Transactions with date, description and amount
+
+    Returns:
+        Recurring payments, one per descriptor, most confident first
+    """
+    default_year = _default_year([t.get('date') or '' for t in transactions])
+    parsed: Dict[str, Optional[date]] = {}
+    keys: List[str] = []
+    ordinals: List[int] = []
+    amounts: List[float] = []
+    rows: List[Dict[str, Any]] = []
+    for transaction in transactions:
+        raw_date = transaction.get('date') or ''
+        if raw_date not in parsed:
+            parsed[raw_date] = parse_statement_date(raw_date, default_year)
+        day = parsed[raw_date]
+        key = normalize_descriptor(transaction.get('description', ''))
+        # A bare processor key ("paypal") mixes unrelated merchants
+        if day is None or not is_learnable(key) or not transaction.get('amount'):
+            continue
+        keys.append(key)
+        ordinals.append(day.toordinal())
+        amounts.append(abs(float(transaction['amount'])))
+        rows.append(transaction)
+    if not rows:
+        return []
+
+    names, groups = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    ordinal_array = np.array(ordinals, dtype=np.int64)
+    order = np.lexsort((ordinal_array, groups))
+    groups = groups[order]
+    ordinal_array = ordinal_array[order]
+    amount_array = np.array(amounts, dtype=np.float64)[order]
+
+    counts, interval_mean, interval_std, amount_cv = _group_stats(
+        groups, ordinal_array, amount_array, len(names)
+    )
+    # Index of each group's most recent payment (last in sorted order)
+    last = np.cumsum(counts) - 1
+
+    found = []
+    for g in np.flatnonzero((counts >= 2) & (amount_cv <= MAX_AMOUNT_CV)):
+        mean = interval_mean[g]
+        for frequency in FREQUENCIES:
+            if abs(mean - frequency.days) > frequency.tolerance:
+                continue
+            if counts[g] < frequency.min_payments:
+                break
+            # Regular intervals, stable amounts and more payments all add confidence
+            regularity = max(0.0, 1.0 - interval_std[g] / frequency.days)
+            stability = 1.0 - amount_cv[g] / MAX_AMOUNT_CV
+            history = min(1.0, counts[g] / (frequency.min_payments + 1))
+            confidence = round(float(0.5 + 0.5 * regularity * (0.5 * stability + 0.5 * history)), 2)
+            latest = rows[order[last[g]]]
+            found.append(
+                RecurringPayment(
+                    descriptor=str(names[g]),
+                    description=latest['description'],
+                    frequency=frequency.name,
+                    payments=int(counts[g]),
+                    amount=float(amount_array[last[g]]),
+                    mean_interval_days=round(float(mean), 1),
+                    confidence=confidence,
+                )
+            )
+            break
+
+    found.sort(key=lambda payment: -payment.confidence)
+    return found
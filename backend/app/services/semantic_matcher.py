@@ -1,15 +1,24 @@
 """Semantic matching service using embeddings and LLM."""
 
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from app.core.openai_client import get_openai_client
+from app.core import llm_metrics
+from app.core.deadline import Deadline, DeadlineExceeded, hedged_call_async
 from cachetools import TTLCache
 import hashlib
 import json
+import time
 
 from app.core.config import settings
 from app.models import Benefit, Membership
 from app.services.page_scraper import metadata_to_text
+from app.services.message_templates import (
+    is_comparison_site,
+    message_stats,
+    render_message,
+    select_template,
+)
 
 
 # Initialize OpenAI client with API key from settings
@@ -24,13 +33,20 @@ match_cache = TTLCache(maxsize=500, ttl=600)
 message_cache = TTLCache(maxsize=500, ttl=900)
 
 
-def get_embedding(text: str, model: str = "text-embedding-3-small") -> List[float]:
+def get_embedding(
+    text: str,
+    model: str = "text-embedding-3-small",
+    call_site: str = "semantic_matcher",
+    timeout: Optional[float] = None,
+) -> List[float]:
     """
     Get embedding for text with caching.
 
     Args:
         text: Text to embed
         model: OpenAI embedding model
+        call_site: Metrics label for the caller
+        timeout: Optional per-request timeout in seconds
 
     Returns:
         Embedding vector
@@ -42,10 +58,14 @@ def get_embedding(text: str, model: str = "text-embedding-3-small") -> List[floa
     cache_key = hashlib.md5(f"{model}:{text}".encode()).hexdigest()
 
     if cache_key in embedding_cache:
+        llm_metrics.record_cache_hit(call_site, model)
         return embedding_cache[cache_key]
 
     # Get embedding from OpenAI
-    response = client.embeddings.create(input=text, model=model)
+    request_kwargs = {"timeout": timeout} if timeout is not None else {}
+    response = llm_metrics.embedding(
+        call_site, client, input=text, model=model, **request_kwargs
+    )
 
     embedding = response.data[0].embedding
     embedding_cache[cache_key] = embedding
@@ -87,6 +107,7 @@ async def find_semantic_matches(
     user_benefits: List[Tuple[Benefit, Membership]],
     top_k: int = 5,
     threshold: float = 0.7,
+    deadline: Optional[Deadline] = None,
 ) -> List[Dict[str, Any]]:
     """
     Find benefits that semantically match the current page.
@@ -96,6 +117,7 @@ async def find_semantic_matches(
         user_benefits: List of (Benefit, Membership) tuples
         top_k: Number of top matches to return
         threshold: Minimum similarity score (0-1)
+        deadline: Optional latency budget for uncached embedding calls
 
     Returns:
         List of matched benefits with scores
@@ -116,14 +138,20 @@ async def find_semantic_matches(
 
     # Get page embedding
     page_text = metadata_to_text(page_metadata)
-    page_embedding = get_embedding(page_text)
+    def _timeout() -> Optional[float]:
+        if deadline is None:
+            return None
+        deadline.check("embedding")
+        return deadline.timeout(settings.openai_timeout_s)
+
+    page_embedding = get_embedding(page_text, timeout=_timeout())
 
     # Calculate similarities
     matches = []
     all_scores = []  # For debugging
     for benefit, membership in user_benefits:
         benefit_text = create_benefit_text(benefit, membership)
-        benefit_embedding = get_embedding(benefit_text)
+        benefit_embedding = get_embedding(benefit_text, timeout=_timeout())
 
         similarity = cosine_similarity(page_embedding, benefit_embedding)
         all_scores.append((similarity, benefit.title, membership.name))
@@ -159,14 +187,20 @@ async def generate_user_message(
     page_metadata: Dict[str, str],
     semantic_matches: List[Dict[str, Any]],
     model: str = "gpt-4o-mini",
+    deadline: Optional[Deadline] = None,
 ) -> Dict[str, Any]:
     """
-    Use mini LLM to generate user-friendly message about matched benefits.
+    Generate a user-friendly message about matched benefits.
+
+    Common cases (one clear top match on a comparison or service site) are
+    rendered from templates; the mini LLM is only used to summarize several
+    close-scoring matches.
 
     Args:
         page_metadata: Page metadata
         semantic_matches: Semantic match results
         model: OpenAI model to use
+        deadline: Optional latency budget; falls back to the template message when spent
 
     Returns:
         Dictionary with message and recommendations
@@ -197,8 +231,17 @@ async def generate_user_message(
     ).hexdigest()
 
     if cache_key in message_cache:
+        llm_metrics.record_cache_hit("semantic_matcher", model)
         return message_cache[cache_key]
 
+    started = time.perf_counter()
+    template = select_template(page_metadata, semantic_matches)
+    if template is not None:
+        result = render_message(page_metadata, semantic_matches, template)
+        message_stats.record("template", time.perf_counter() - started)
+        message_cache[cache_key] = result
+        return result
+
     # Prepare context for LLM
     context = {
         "page": {
@@ -219,8 +262,7 @@ async def generate_user_message(
 
     # Create prompt for mini LLM
     # Detect if this is a comparison/shopping site
-    is_comparison_site = any(word in context['page']['domain'].lower() or word in context['page']['title'].lower() 
-                            for word in ['compare', 'comparison', 'shop', 'find', 'search', 'deals', 'best'])
+    comparison_site = is_comparison_site(page_metadata)
     
     prompt = f"""You're vogoplus.app assistant. User is browsing a website and you found relevant benefits they ALREADY HAVE.
 
@@ -231,7 +273,7 @@ User's existing benefits that match this page:
 {json.dumps(context['matches'], indent=2)}
 
 IMPORTANT CONTEXT:
-{'- This appears to be a COMPARISON/SHOPPING site - user is shopping for something they already have!' if is_comparison_site else '- User is on a service provider site'}
+{'- This appears to be a COMPARISON/SHOPPING site - user is shopping for something they already have!' if comparison_site else '- User is on a service provider site'}
 - The user ALREADY HAS these benefits from their memberships
 - Help them realize they don't need to buy what's on this page if they already have it!
 
@@ -251,20 +293,20 @@ Focus on the TOP matching benefit with highest score.
 
     if not client:
         # Fallback when no OpenAI key
-        top_match = semantic_matches[0]
-        result = {
-            "has_matches": True,
-            "message": f"You have {top_match['benefit'].title} from your {top_match['membership'].name} that works on this site!",
-            "action": "View Benefits",
-            "highlight_benefit_ids": [top_match["benefit_id"]],
-            "matches": semantic_matches,
-            "match_count": len(semantic_matches),
-        }
+        llm_metrics.record_fallback("semantic_matcher", model)
+        result = render_message(page_metadata, semantic_matches)
         message_cache[cache_key] = result
         return result
 
-    try:
-        response = client.chat.completions.create(
+    if deadline is not None and deadline.expired:
+        # Out of budget - answer with the template rather than waiting on the LLM
+        llm_metrics.record_fallback("semantic_matcher", model)
+        return render_message(page_metadata, semantic_matches)
+
+    def _request(timeout: float):
+        return llm_metrics.chat_completion(
+            "semantic_matcher",
+            client,
             model=model,
             messages=[
                 {
@@ -276,6 +318,12 @@ Focus on the TOP matching benefit with highest score.
             temperature=0.3,
             max_tokens=150,
             response_format={"type": "json_object"},
+            timeout=timeout,
+        )
+
+    try:
+        response = await hedged_call_async(
+            _request, deadline, call_site="semantic_matcher", model=model
         )
 
         llm_response = json.loads(response.choices[0].message.content)
@@ -287,21 +335,20 @@ Focus on the TOP matching benefit with highest score.
             "highlight_benefit_ids": llm_response.get("highlight_benefit_ids", []),
             "matches": semantic_matches,
             "match_count": len(semantic_matches),
+            "message_source": "llm",
         }
+        message_stats.record("llm", time.perf_counter() - started)
         message_cache[cache_key] = result
         return result
 
+    except DeadlineExceeded:
+        llm_metrics.record_fallback("semantic_matcher", model)
+        return render_message(page_metadata, semantic_matches)
+
     except Exception as e:
         # Fallback message
-        top_match = semantic_matches[0]
-        result = {
-            "has_matches": True,
-            "message": f"You have {top_match['benefit_title']} from your {top_match['membership_name']} that works on this site!",
-            "action": "View Benefits",
-            "highlight_benefit_ids": [top_match["benefit_id"]],
-            "matches": semantic_matches,
-            "match_count": len(semantic_matches),
-            "error": str(e),
-        }
+        llm_metrics.record_fallback("semantic_matcher", model)
+        result = render_message(page_metadata, semantic_matches)
+        result["error"] = str(e)
         message_cache[cache_key] = result
         return result
@@ -0,0 +1,396 @@
+"""Background processing of uploaded bank statements.
+
+Uploading a statement creates a statement_jobs row and returns its id right
+away. A task in the receiving API worker then takes it through
+
+    queued -> extracting_text -> analyzing -> processing -> done
+
+Every stage change, and each subscription's outcome as it finishes, is written
+to the row. Any API worker can therefore serve progress, by poll or by server-sent
+events, and a client that reconnects reads the stored state and result instead
+of uploading (and reprocessing) the statement again. While a job is queued or
+running, its worker refreshes updated_at every statement_job_heartbeat_s; a
+periodic sweep fails jobs whose heartbeat stopped (their worker died), so
+pollers and event streams always reach a final state.
+
+Jobs also record the SHA-256 of the uploaded file. Uploading the same file
+again (a retry, a double click) attaches to the user's in-flight job for it,
+or returns the stored result of a job completed within statement_result_ttl_s,
+instead of running extraction and the LLM a second time. A partial unique index
+keeps concurrent duplicates on different workers down to one in-flight job.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.models import StatementJob
+from app.services.bank_statement_parser import parse_statement_text
+from app.services.pdf_pool import extract_text_async
+from app.services.statement_subscriptions import process_subscriptions
+
+
+STAGES = ("queued", "extracting_text", "analyzing", "processing", "done")
+TERMINAL_STATUSES = ("completed", "failed")
+
+INTERRUPTED = "Processing was interrupted, please upload the statement again"
+
+_semaphore: Optional[asyncio.Semaphore] = None
+_tasks: Set[asyncio.Task] = set()
+_sweeper: Optional[asyncio.Task] = None
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(settings.statement_job_concurrency, 1))
+    return _semaphore
+
+
+async def _save(job_id: str, **values) -> None:
+    values["updated_at"] = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(StatementJob).where(StatementJob.id == job_id).values(**values)
+        )
+        await db.commit()
+
+
+def statement_response(
+    parsed: Dict[str, Any],
+    processed: List[Dict[str, Any]],
+    errors: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """The upload result returned to clients once a statement is processed."""
+    return {
+        'summary': parsed['summary'],
+        'subscriptions_found': len(parsed['subscriptions']),
+        'subscriptions_processed': len(processed),
+        'processed': processed,
+        'errors': errors,
+        'message': f"Found {len(parsed['subscriptions'])} subscriptions. Added {len(processed)} to your account."
+    }
+
+
+def job_view(job: StatementJob) -> Dict[str, Any]:
+    """Serialize a job for the poll endpoint and event stream."""
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "filename": job.filename,
+        "subscriptions_total": job.subscriptions_total,
+        "subscriptions_done": len(job.results or []),
+        "results": job.results or [],
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+async def create_job(
+    db: AsyncSession, user_id: int, filename: str, content_hash: Optional[str] = None
+) -> StatementJob:
+    """Record a queued job for an uploaded statement."""
+    now = datetime.utcnow()
+    job = StatementJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        filename=filename,
+        content_hash=content_hash,
+        status="queued",
+        stage="queued",
+        results=[],
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+async def find_duplicate_job(
+    db: AsyncSession, user_id: int, content_hash: str
+) -> Optional[StatementJob]:
+    """
+    Find the user's job for the same file that can stand in for a new upload.
+
+    Returns:
+        The in-flight job for the file (with a live heartbeat), else the latest job
+        for it completed within statement_result_ttl_s, else None (failed jobs
+        are never reused)
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.statement_result_ttl_s)
+    result = await db.execute(
+        select(StatementJob)
+        .where(
+            StatementJob.user_id == user_id,
+            StatementJob.content_hash == content_hash,
+            or_(
+                and_(
+                    StatementJob.status.in_(("queued", "running")),
+                    StatementJob.updated_at >= _stale_cutoff(),
+                ),
+                and_(StatementJob.status == "completed", StatementJob.finished_at >= cutoff),
+            ),
+        )
+        .order_by(StatementJob.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def create_or_attach_job(
+    db: AsyncSession, user_id: int, filename: str, content_hash: str
+) -> Tuple[StatementJob, bool]:
+    """
+    Create a job for an uploaded statement, unless the same file is already
+    being processed or was processed recently.
+
+    Args:
+        db: Database session
+        user_id: Owner of the statement
+        filename: Client filename
+        content_hash: SHA-256 of the uploaded file
+
+    Returns:
+        Tuple of (job, created); when created is False the job is an existing one
+        and the upload does not need processing
+    """
+    # A dead in-flight job would otherwise block new ones via the unique index
+    await fail_stale_jobs(
+        StatementJob.user_id == user_id, StatementJob.content_hash == content_hash
+    )
+    existing = await find_duplicate_job(db, user_id, content_hash)
+    if existing is not None:
+        return existing, False
+    try:
+        return await create_job(db, user_id, filename, content_hash), True
+    except IntegrityError:
+        # A concurrent upload of the same file created the in-flight job first
+        await db.rollback()
+        existing = await find_duplicate_job(db, user_id, content_hash)
+        if existing is None:
+            raise
+        return existing, False
+
+
+async def get_job(db: AsyncSession, job_id: str, user_id: int) -> Optional[StatementJob]:
+    """Return the user's job, or None if it does not exist or belongs to someone else."""
+    result = await db.execute(
+        select(StatementJob).where(StatementJob.id == job_id, StatementJob.user_id == user_id)
+    )
+    return result.scalars().first()
+
+
+async def _process(job_id: str, user_id: int, path: str) -> None:
+    await _save(job_id, status="running", stage="extracting_text")
+    text = await extract_text_async(path)
+
+    await _save(job_id, stage="analyzing")
+    parsed = await asyncio.to_thread(parse_statement_text, text)
+    subscriptions = parsed['subscriptions']
+
+    await _save(job_id, stage="processing", subscriptions_total=len(subscriptions))
+    results: List[Dict[str, Any]] = []
+    results_lock = asyncio.Lock()
+
+    async def on_result(index: int, outcome: Dict[str, Any]) -> None:
+        async with results_lock:
+            results.append({"index": index, **outcome})
+            await _save(job_id, results=list(results))
+
+    async with AsyncSessionLocal() as db:
+        processed, errors = await process_subscriptions(db, user_id, subscriptions, on_result)
+
+    await _save(
+        job_id,
+        status="completed",
+        stage="done",
+        result=statement_response(parsed, processed, errors),
+        finished_at=datetime.utcnow(),
+    )
+    print(f"📄 Statement job {job_id} completed: {len(processed)} processed, {len(errors)} errors")
+
+
+async def _heartbeat(job_id: str) -> None:
+    # Keeps a queued or running job from being swept as stale
+    while True:
+        await asyncio.sleep(settings.statement_job_heartbeat_s)
+        try:
+            await _save(job_id)
+        except Exception as e:
+            print(f"⚠️  Statement job {job_id} heartbeat failed: {e}")
+
+
+async def _run_job(job_id: str, user_id: int, path: str) -> None:
+    heartbeat = asyncio.create_task(_heartbeat(job_id))
+    try:
+        async with _get_semaphore():
+            await _process(job_id, user_id, path)
+    except asyncio.CancelledError:
+        await _save(
+            job_id, status="failed", stage="done", error=INTERRUPTED, finished_at=datetime.utcnow()
+        )
+        raise
+    except ValueError as e:
+        # Unreadable PDF, no transactions, limits exceeded: reported to the user as-is
+        await _save(
+            job_id, status="failed", stage="done", error=str(e), finished_at=datetime.utcnow()
+        )
+    except Exception as e:
+        print(f"❌ Statement job {job_id} failed: {e}")
+        await _save(
+            job_id,
+            status="failed",
+            stage="done",
+            error=f"Failed to process bank statement: {str(e)}",
+            finished_at=datetime.utcnow(),
+        )
+    finally:
+        heartbeat.cancel()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def submit_job(job_id: str, user_id: int, path: str) -> None:
+    """
+    Start processing a job in the background.
+
+    Args:
+        job_id: Job created with create_job
+        user_id: Owner of the statement
+        path: Spooled statement file; the job deletes it when done
+    """
+    task = asyncio.create_task(_run_job(job_id, user_id, path))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def job_events(job_id: str) -> AsyncIterator[str]:
+    """
+    Server-sent events for a job, until it completes or fails.
+
+    Emits a `progress` event with the full job state on connect and on every
+    stage change, a `subscription` event per subscription outcome, and a final
+    `done` event with the full state. Progress is read from the database, so
+    any worker can serve the stream and reconnecting replays the current state.
+    """
+    def event(name: str, data: Dict[str, Any]) -> str:
+        return f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    sent_results = None
+    sent_stage = None
+    idle_s = 0.0
+    while True:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(StatementJob, job_id)
+        if job is None:
+            return
+
+        view = job_view(job)
+        if sent_results is None:
+            yield event("progress", view)
+            sent_results = len(view["results"])
+            sent_stage = job.stage
+            idle_s = 0.0
+        else:
+            for outcome in view["results"][sent_results:]:
+                yield event("subscription", outcome)
+                idle_s = 0.0
+            sent_results = len(view["results"])
+            if job.stage != sent_stage:
+                yield event("progress", view)
+                sent_stage = job.stage
+                idle_s = 0.0
+
+        if job.status in TERMINAL_STATUSES:
+            yield event("done", view)
+            return
+
+        if idle_s >= 15.0:
+            # Comment line so proxies don't close an idle stream
+            yield ": keep-alive\n\n"
+            idle_s = 0.0
+        await asyncio.sleep(settings.statement_job_poll_interval_s)
+        idle_s += settings.statement_job_poll_interval_s
+
+
+def _stale_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=settings.statement_job_stale_s)
+
+
+async def fail_stale_jobs(*criteria) -> int:
+    """
+    Fail queued/running jobs whose heartbeat stopped (e.g. their worker
+    crashed mid-job).
+
+    Args:
+        criteria: Extra WHERE criteria limiting the jobs considered
+
+    Returns:
+        Number of jobs marked failed
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(StatementJob)
+            .where(
+                StatementJob.status.in_(("queued", "running")),
+                StatementJob.updated_at < _stale_cutoff(),
+                *criteria,
+            )
+            .values(
+                status="failed",
+                stage="done",
+                error=INTERRUPTED,
+                finished_at=datetime.utcnow(),
+                updated_at=datetime.utcnow(),
+            )
+        )
+        await db.commit()
+    return result.rowcount
+
+
+async def _sweep_stale_jobs() -> None:
+    while True:
+        try:
+            failed = await fail_stale_jobs()
+            if failed:
+                print(f"⚠️  Marked {failed} interrupted statement job(s) as failed")
+        except Exception as e:
+            print(f"⚠️  Could not check for interrupted statement jobs: {e}")
+        await asyncio.sleep(settings.statement_job_heartbeat_s)
+
+
+def start_statement_job_sweeper() -> None:
+    """Periodically fail jobs orphaned by dead workers (call from the running event loop)."""
+    global _sweeper
+    if _sweeper is None or _sweeper.done():
+        _sweeper = asyncio.create_task(_sweep_stale_jobs())
+
+
+async def stop_statement_jobs() -> None:
+    """Stop the stale-job sweep and cancel this worker's running jobs (marking them failed)."""
+    global _sweeper
+    if _sweeper is not None:
+        _sweeper.cancel()
+        _sweeper = None
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,391 @@
+"""Matching and recording the subscriptions found on a bank statement.
+
+Each subscription is fuzzy matched against the catalog, then linked to the
+user, validated with GPT and, if new, ingested with benefit discovery.
+A statement's subscriptions are processed concurrently (see
+process_subscriptions); every use of the shared AsyncSession is serialized with
+an asyncio.Lock. Unmatched subscriptions with the same slug run one at a time,
+and later ones reuse the membership the first one created.
+"""
+
+import asyncio
+import contextlib
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import run_with_session
+from app.models import Membership, UserMembership
+from app.services.catalog import CatalogMembership, get_catalog_async
+from app.services.ingest_unknown import ingest_unknown_membership
+from app.services.llm_validate_membership import validate_membership_with_gpt
+from app.services.membership_name_index import get_membership_name_index
+from app.services.merchant_descriptors import learn_descriptors
+from app.services.membership_tiers import get_plan_tier
+
+
+async def match_subscriptions(
+    subscription_names: List[str],
+    threshold: int = 80
+) -> List[CatalogMembership | None]:
+    """
+    Find the existing membership matching each subscription name.
+    
+    All names are scored against the catalog's prebuilt name index in one batch.
+    """
+    return await asyncio.to_thread(
+        lambda: get_membership_name_index().match_many(subscription_names, threshold)
+    )
+
+
+async def get_user_membership(
+    db: AsyncSession, user_id: int, membership_id: int
+) -> UserMembership | None:
+    """Return the user's link to a membership, if any."""
+    result = await db.execute(
+        select(UserMembership).where(
+            UserMembership.user_id == user_id,
+            UserMembership.membership_id == membership_id,
+        )
+    )
+    return result.scalars().first()
+
+
+def statement_note(subscription: Dict[str, Any], detail: str | None = None) -> str:
+    """Notes recorded on a membership link created from a bank statement."""
+    note = f"Auto-added from bank statement (£{subscription['amount']:.2f}/{subscription.get('frequency', 'month')})"
+    return f"{note} - {detail}" if detail else note
+
+
+async def link_membership(
+    db: AsyncSession,
+    db_lock: asyncio.Lock,
+    user_id: int,
+    membership_id: int,
+    notes: str,
+) -> bool:
+    """
+    Link a membership to the user unless already linked.
+    
+    The check and insert run under db_lock so that concurrently processed
+    subscriptions resolving to the same membership link it only once.
+    
+    Returns:
+        True if a link was created, False if the user already had it
+    """
+    async with db_lock:
+        if await get_user_membership(db, user_id, membership_id):
+            return False
+        db.add(UserMembership(user_id=user_id, membership_id=membership_id, notes=notes))
+        await db.commit()
+        return True
+
+
+def membership_slug(membership_name: str) -> str:
+    """provider_slug of a membership created from a subscription name."""
+    return re.sub(r'[^a-z0-9]+', '-', membership_name.lower()).strip('-')
+
+
+async def create_basic_membership(
+    db: AsyncSession,
+    db_lock: asyncio.Lock,
+    user_id: int,
+    membership_name: str,
+    notes: str,
+) -> Membership:
+    """
+    Create a non-catalog membership without benefits and link it to the user.
+    
+    If a membership with the same slug already exists it is linked instead.
+    """
+    provider_name = membership_name.split()[0] if membership_name.split() else membership_name
+    plan_name = " ".join(membership_name.split()[1:]) if len(membership_name.split()) > 1 else "Standard"
+    provider_slug = membership_slug(membership_name)
+    
+    async with db_lock:
+        result = await db.execute(
+            select(Membership).where(Membership.provider_slug == provider_slug)
+        )
+        existing = result.scalars().first()
+    if existing is not None:
+        await link_membership(db, db_lock, user_id, existing.id, notes)
+        return existing
+    
+    async with db_lock:
+        membership = Membership(
+            name=membership_name,
+            provider_slug=provider_slug,
+            provider_name=provider_name,
+            plan_name=plan_name,
+            plan_tier=get_plan_tier(provider_name, plan_name),
+            is_catalog=False,  # Not in catalog - invalid/too vague or ingestion failed
+            status="active",
+            discovered_by_user_id=user_id,
+        )
+        db.add(membership)
+        await db.flush()
+        
+        db.add(UserMembership(user_id=user_id, membership_id=membership.id, notes=notes))
+        await db.commit()
+        return membership
+
+
+async def process_subscription(
+    db: AsyncSession,
+    db_lock: asyncio.Lock,
+    user_id: int,
+    subscription: Dict[str, Any],
+    existing_membership: CatalogMembership | None,
+) -> Dict[str, Any]:
+    """
+    Process a single subscription: validate, check if exists, then discover benefits if needed.
+    
+    Flow:
+    1. Check if membership exists in catalog (fuzzy match)
+    2. If exists, check if user already has it
+    3. If user has it, skip
+    4. If exists but user doesn't have it, link it (no LLM needed)
+    5. If doesn't exist, validate with GPT first
+    6. If valid, use LLM to discover benefits
+    7. If invalid, create basic membership without benefits
+    
+    Subscriptions of one statement are processed concurrently: validation and
+    discovery run in threads with their own sessions, and every use of the
+    shared request session holds db_lock.
+    
+    Args:
+        db: Database session shared by the statement's subscriptions
+        db_lock: Serializes use of db
+        user_id: Owner of the statement
+        subscription: Subscription detected on the statement
+        existing_membership: Catalog match for the subscription (see match_subscriptions)
+    
+    Returns:
+        Dict with membership info and action taken
+    """
+    membership_name = subscription['membership_name']
+    amount = subscription['amount']
+    
+    # Steps 1-3: Existing membership in catalog (fuzzy matched for the whole
+    # statement) - link it unless the user already has it (no LLM needed)
+    if existing_membership:
+        linked = await link_membership(
+            db, db_lock, user_id, existing_membership.id, statement_note(subscription)
+        )
+        return {
+            'membership_id': existing_membership.id,
+            'membership_name': existing_membership.name,
+            'action': 'linked_existing' if linked else 'already_exists',
+            'amount': amount,
+        }
+    
+    # Step 4: Membership doesn't exist - validate first before using LLM
+    print(f"🔍 Validating membership '{membership_name}' before benefit discovery...")
+    validation_result = await asyncio.to_thread(
+        run_with_session, validate_membership_with_gpt, membership_name
+    )
+    
+    # Check if validation found it exists (exact match in catalog)
+    if validation_result.get('status') == 'exists':
+        async with db_lock:
+            existing = await db.get(
+                Membership, validation_result['existing_membership']['id']
+            )
+        
+        if existing:
+            linked = await link_membership(
+                db, db_lock, user_id, existing.id, statement_note(subscription)
+            )
+            return {
+                'membership_id': existing.id,
+                'membership_name': existing.name,
+                'action': 'linked_existing' if linked else 'already_exists',
+                'amount': amount,
+            }
+    
+    # Step 5: Check validation status - only proceed if valid
+    if validation_result.get('status') not in ['valid', 'ambiguous']:
+        # Invalid membership - create basic membership without benefits
+        print(f"❌ Membership '{membership_name}' is invalid: {validation_result.get('reason', 'Unknown reason')}")
+        membership = await create_basic_membership(
+            db,
+            db_lock,
+            user_id,
+            membership_name,
+            statement_note(subscription, f"validation: {validation_result.get('reason', 'invalid')}"),
+        )
+        return {
+            'membership_id': membership.id,
+            'membership_name': membership_name,
+            'action': 'created_basic_invalid',
+            'amount': amount,
+            'validation_reason': validation_result.get('reason'),
+        }
+    
+    # Step 6: Valid membership - use LLM to discover benefits
+    print(f"✅ Membership '{membership_name}' is valid - discovering benefits with LLM...")
+    try:
+        # Use normalized name if available, otherwise use original
+        name_to_use = validation_result.get('normalized_name') or membership_name
+        # Benefit discovery does blocking web/LLM calls with its own session
+        result = await asyncio.to_thread(
+            run_with_session, ingest_unknown_membership, user_id, name_to_use
+        )
+        
+        # Link to user (ingest_unknown_membership might already do this, but ensure it)
+        membership_id = result['membership']['id']
+        await link_membership(db, db_lock, user_id, membership_id, statement_note(subscription))
+        
+        return {
+            'membership_id': membership_id,
+            'membership_name': name_to_use,
+            'action': 'created_new',
+            'amount': amount,
+            'benefits_found': result.get('benefits_found', False),
+        }
+    except Exception as e:
+        # If ingestion fails, create a basic membership
+        print(f"❌ Failed to ingest {membership_name}: {e}")
+        async with db_lock:
+            await db.rollback()
+        membership = await create_basic_membership(
+            db,
+            db_lock,
+            user_id,
+            membership_name,
+            statement_note(subscription, f"ingestion failed: {str(e)}"),
+        )
+        return {
+            'membership_id': membership.id,
+            'membership_name': membership_name,
+            'action': 'created_basic',
+            'amount': amount,
+        }
+
+
+# Outcomes that confirm the subscription really is that membership
+CONFIRMED_ACTIONS = ('linked_existing', 'already_exists', 'created_new')
+
+
+async def learn_confirmed_descriptors(
+    subscriptions: List[Dict[str, Any]],
+    outcomes: List[Tuple[bool, Dict[str, Any]]],
+) -> None:
+    """
+    Record the descriptors of confirmed subscriptions in the descriptor map.
+    
+    Subscriptions that were themselves resolved from the map are skipped, so a
+    mapping is only ever confirmed by independent identifications.
+    """
+    matches = [
+        (subscription['descriptor'], outcome['membership_id'], subscription.get('frequency'))
+        for subscription, (ok, outcome) in zip(subscriptions, outcomes)
+        if ok
+        and outcome.get('action') in CONFIRMED_ACTIONS
+        and subscription.get('descriptor')
+        and not subscription.get('membership_id')
+    ]
+    if not matches:
+        return
+    try:
+        await asyncio.to_thread(run_with_session, learn_descriptors, matches)
+    except Exception as e:
+        print(f"⚠️  Could not record merchant descriptors: {e}")
+
+
+async def process_subscriptions(
+    db: AsyncSession,
+    user_id: int,
+    subscriptions: List[Dict[str, Any]],
+    on_result: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Process a statement's subscriptions concurrently.
+    
+    At most statement_subscription_concurrency subscriptions are validated or
+    discovered at once, so total latency approaches that of the slowest one
+    rather than the sum. Writes to the shared session are serialized.
+    
+    Args:
+        db: Database session used for all subscriptions
+        user_id: Owner of the statement
+        subscriptions: Subscriptions detected on the statement
+        on_result: Awaited with (index, outcome) as each subscription finishes;
+            outcome is the processed dict, or {'subscription', 'error'} on failure
+    
+    Returns:
+        Tuple of (processed, errors), in statement order
+    """
+    matches = await match_subscriptions(
+        [subscription['membership_name'] for subscription in subscriptions]
+    )
+    # Subscriptions resolved from the learned descriptor map name their membership
+    catalog = await get_catalog_async()
+    for position, subscription in enumerate(subscriptions):
+        mapped = catalog.memberships_by_id.get(subscription.get('membership_id'))
+        if mapped is not None and mapped.is_active:
+            matches[position] = mapped
+    
+    db_lock = asyncio.Lock()
+    semaphore = asyncio.Semaphore(max(settings.statement_subscription_concurrency, 1))
+    # Unmatched subscriptions with the same slug would otherwise race to create
+    # the same membership: they run one at a time, and once one succeeds the
+    # rest link its membership
+    flights: Dict[str, asyncio.Lock] = {}
+    settled: Dict[str, Dict[str, Any]] = {}
+    
+    async def run(
+        index: int, subscription: Dict[str, Any], existing_membership: CatalogMembership | None
+    ) -> Tuple[bool, Dict[str, Any]]:
+        slug = None if existing_membership else membership_slug(subscription['membership_name'])
+        flight = flights.setdefault(slug, asyncio.Lock()) if slug else contextlib.nullcontext()
+        async with flight, semaphore:
+            try:
+                if slug in settled:
+                    outcome = await link_settled(subscription, settled[slug])
+                else:
+                    outcome = await process_subscription(
+                        db, db_lock, user_id, subscription, existing_membership
+                    )
+                    if slug:
+                        settled[slug] = outcome
+                ok = True
+            except Exception as e:
+                async with db_lock:
+                    await db.rollback()
+                outcome = {
+                    'subscription': subscription['membership_name'],
+                    'error': str(e)
+                }
+                ok = False
+        if on_result is not None:
+            await on_result(index, outcome)
+        return ok, outcome
+    
+    async def link_settled(subscription: Dict[str, Any], first: Dict[str, Any]) -> Dict[str, Any]:
+        await link_membership(
+            db, db_lock, user_id, first['membership_id'], statement_note(subscription)
+        )
+        confirmed = first['action'] in CONFIRMED_ACTIONS
+        return {
+            'membership_id': first['membership_id'],
+            'membership_name': first['membership_name'],
+            'action': 'already_exists' if confirmed else first['action'],
+            'amount': subscription['amount'],
+        }
+    
+    outcomes = await asyncio.gather(
+        *[
+            run(index, subscription, match)
+            for index, (subscription, match) in enumerate(zip(subscriptions, matches))
+        ]
+    )
+    
+    await learn_confirmed_descriptors(subscriptions, outcomes)
+    
+    processed = [outcome for ok, outcome in outcomes if ok]
+    errors = [outcome for ok, outcome in outcomes if not ok]
+    return processed, errors
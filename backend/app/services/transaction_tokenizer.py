@@ -0,0 +1,105 @@
+"""Single-pass regex tokenizer for bank statement transaction lines.
+
+Each line is classified with at most two precompiled regexes, one per line
+class:
+
+- dated lines: `<date> <description> <amount>`, e.g.
+  "03/01/2025 NETFLIX.COM 10.99 1,234.56" or "3 Jan 2025 Spotify £11.99"
+- amount-only lines: `<description> <amount>`, used only when the statement
+  has no dated lines at all (some banks print the date once per block)
+
+The date and amount alternatives are folded into the line regexes, so a line is
+scanned once instead of once per date pattern times once per amount pattern.
+The first amount after the date is the transaction amount; any later amounts
+on the line (running balance) are ignored.
+"""
+
+import re
+from typing import List, NamedTuple
+
+
+MONTHS = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+
+DATE = (
+    r"(?:\d{4}[/-]\d{1,2}[/-]\d{1,2}"  # YYYY/MM/DD
+    r"|\d{1,2}[/-]\d{1,2}[/-]\d{2,4}"  # DD/MM/YYYY or DD-MM-YY
+    rf"|\d{{1,2}}\s+{MONTHS}(?:\s+\d{{4}})?)"  # DD MMM [YYYY]
+)
+
+# £12.99, -£12.99, 12.99£, (12.99), £12,99, 1,234.56 (not part of a longer number)
+AMOUNT = (
+    r"(?<![\w.,])"
+    r"(?P<neg>-\s*|\()?"
+    r"(?:[£$€]\s*)?"
+    r"(?P<int>\d{1,3}(?:,\d{3})+|\d+)"
+    r"[.,](?P<cents>\d{2})"
+    r"(?![\d.,]\d)"
+    r"\)?(?:\s*[£$€])?"
+)
+
+# The description must contain a letter, so dates/amounts alone never qualify
+DATED_LINE = re.compile(
+    rf"(?P<date>{DATE})\s*(?P<desc>.*?[^\W\d_].*?)\s*{AMOUNT}",
+    re.IGNORECASE,
+)
+AMOUNT_LINE = re.compile(rf"^(?P<desc>.*?[^\W\d_].*?)\s*{AMOUNT}", re.IGNORECASE)
+
+WHITESPACE = re.compile(r"\s+")
+
+HEADER_PREFIXES = ("date", "description", "amount", "balance", "transaction")
+
+
+class Transaction(NamedTuple):
+    """A transaction line from a statement. Amounts are absolute values."""
+
+    date: str
+    description: str
+    amount: float
+    raw_line: str
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+def _amount(match: re.Match) -> float:
+    return float(f"{match.group('int').replace(',', '')}.{match.group('cents')}")
+
+
+def tokenize_transactions(text: str) -> List[Transaction]:
+    """
+    Tokenize statement text into transactions in a single pass over its lines.
+
+    Args:
+        text: Extracted text from the statement PDF
+
+    Returns:
+        Dated transactions; if the text has none, the amount-only lines instead
+    """
+    dated: List[Transaction] = []
+    undated: List[Transaction] = []
+
+    for line in text.split("\n"):
+        line = line.strip()
+        if len(line) < 5:
+            continue
+
+        if len(line) >= 10:
+            match = DATED_LINE.search(line)
+            if match:
+                description = WHITESPACE.sub(" ", match.group("desc"))
+                if len(description) > 2:
+                    dated.append(
+                        Transaction(match.group("date"), description, _amount(match), line)
+                    )
+                    continue
+
+        # Only needed while no dated line has been seen
+        if dated:
+            continue
+        match = AMOUNT_LINE.search(line)
+        if match:
+            description = WHITESPACE.sub(" ", match.group("desc"))
+            if len(description) > 2 and not description.lower().startswith(HEADER_PREFIXES):
+                undated.append(Transaction("", description, _amount(match), line))
+
+    return dated or undated
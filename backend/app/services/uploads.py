@@ -0,0 +1,129 @@
+"""Bounded-memory ingestion of uploaded files.
+
+Declaring an `UploadFile` parameter makes FastAPI parse the whole multipart
+body before the endpoint runs, and reading it with `await file.read()` then
+holds the entire upload in memory. spool_upload() instead parses the request
+stream itself:
+
+- a Content-Length above the cap is rejected before any of the body is read
+- the raw stream is counted as it arrives, so chunked or lying clients are cut
+  off as soon as they exceed the cap
+- the file part is copied chunk by chunk into a named temporary file, which
+  the PDF workers memory-map instead of receiving the bytes, and hashed on
+  the way so duplicate uploads can be recognized without reading it again
+
+Peak memory per upload is a few chunks regardless of the file size.
+"""
+
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple, Optional
+
+from fastapi import Request
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class SpooledUpload(NamedTuple):
+    filename: str  # As sent by the client
+    path: str  # Temporary file holding the upload
+    sha256: str  # Hex digest of the file content
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds the size cap."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File is too large (max {max_bytes // (1024 * 1024)} MB)")
+        self.max_bytes = max_bytes
+
+
+async def _capped_stream(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(max_bytes - MULTIPART_OVERHEAD)
+        yield chunk
+
+
+@asynccontextmanager
+async def spool_upload(
+    request: Request,
+    max_bytes: int,
+    field: str = "file",
+    suffix: str = "",
+    delete: bool = True,
+) -> AsyncIterator[SpooledUpload]:
+    """
+    Spool a multipart file field to a size-capped temporary file.
+
+    Args:
+        request: Incoming multipart/form-data request
+        max_bytes: Maximum size of the file
+        field: Form field holding the file
+        suffix: Suffix for the temporary file name
+        delete: Delete the file when the block exits; if False, the caller takes
+            ownership of it once the block exits without an exception
+
+    Yields:
+        SpooledUpload with the client filename, temporary file path and SHA-256
+
+    Raises:
+        UploadTooLarge: If the upload exceeds max_bytes
+        ValueError: If the request is not multipart or the field is missing
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise ValueError("Expected a multipart/form-data upload")
+
+    content_length: Optional[str] = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+            raise UploadTooLarge(max_bytes)
+
+    parser = MultiPartParser(
+        request.headers,
+        _capped_stream(request, max_bytes + MULTIPART_OVERHEAD),
+        max_files=1,
+        max_fields=10,
+    )
+    try:
+        form = await parser.parse()
+    except MultiPartException as e:
+        raise ValueError(e.message)
+    upload = form.get(field)
+    path = None
+    keep = False
+    try:
+        if not isinstance(upload, UploadFile):
+            raise ValueError(f"Missing file field '{field}'")
+
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix="upload-")
+        written = 0
+        digest = hashlib.sha256()
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                out.write(chunk)
+                digest.update(chunk)
+
+        yield SpooledUpload(upload.filename or "", path, digest.hexdigest())
+        keep = not delete
+    finally:
+        await form.close()
+        if path is not None and not keep:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,202 @@
+"""Batched loader for the user -> memberships -> approved benefits graph.
+
+One joined query loads the graph for one or many users into a compact,
+immutable read model. BenefitView/MembershipView expose the same attribute
+names as the Benefit/Membership models, so (benefit, membership) pairs can be
+passed to the semantic matcher and chat service unchanged.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Benefit, Membership, UserMembership
+
+
+@dataclass(frozen=True, slots=True)
+class MembershipView:
+    id: int
+    name: str
+    provider_name: str | None
+    plan_name: str | None
+    provider_slug: str
+
+
+@dataclass(frozen=True, slots=True)
+class BenefitView:
+    id: int
+    membership_id: int
+    title: str
+    description: str | None
+    category: str | None
+    vendor_name: str | None
+    vendor_domain: str | None
+    source_url: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class UserBenefitGraph:
+    """A user's memberships and the approved benefits of each."""
+
+    user_id: int
+    memberships: Tuple[MembershipView, ...]
+    benefits_by_membership: Dict[int, Tuple[BenefitView, ...]]
+
+    @property
+    def membership_ids(self) -> List[int]:
+        return [m.id for m in self.memberships]
+
+    @property
+    def benefits_count(self) -> int:
+        return sum(len(b) for b in self.benefits_by_membership.values())
+
+    def benefit_pairs(self) -> List[Tuple[BenefitView, MembershipView]]:
+        """All approved benefits as (benefit, membership) tuples."""
+        return [
+            (benefit, membership)
+            for membership in self.memberships
+            for benefit in self.benefits_by_membership[membership.id]
+        ]
+
+
+_MEMBERSHIP_COLUMNS = (
+    Membership.id,
+    Membership.name,
+    Membership.provider_name,
+    Membership.plan_name,
+    Membership.provider_slug,
+)
+_BENEFIT_COLUMNS = (
+    Benefit.id,
+    Benefit.membership_id,
+    Benefit.title,
+    Benefit.description,
+    Benefit.category,
+    Benefit.vendor_name,
+    Benefit.vendor_domain,
+    Benefit.source_url,
+)
+
+
+def _graph_statement(user_ids: List[int]):
+    return (
+        select(UserMembership.user_id, *_MEMBERSHIP_COLUMNS, *_BENEFIT_COLUMNS)
+        .join(Membership, UserMembership.membership_id == Membership.id)
+        .outerjoin(
+            Benefit,
+            and_(
+                Benefit.membership_id == Membership.id,
+                Benefit.validation_status == "approved",
+            ),
+        )
+        .where(UserMembership.user_id.in_(user_ids))
+        .order_by(UserMembership.user_id, UserMembership.id, Benefit.id)
+    )
+
+
+def _build_graphs(user_ids: List[int], rows: Iterable) -> Dict[int, UserBenefitGraph]:
+    membership_width = len(_MEMBERSHIP_COLUMNS)
+    memberships: Dict[int, Dict[int, MembershipView]] = {uid: {} for uid in user_ids}
+    benefits: Dict[int, Dict[int, Dict[int, BenefitView]]] = {uid: {} for uid in user_ids}
+
+    for row in rows:
+        user_id = row[0]
+        membership_row = row[1 : 1 + membership_width]
+        benefit_row = row[1 + membership_width :]
+
+        membership_id = membership_row[0]
+        if membership_id not in memberships[user_id]:
+            memberships[user_id][membership_id] = MembershipView(*membership_row)
+            benefits[user_id][membership_id] = {}
+
+        # Outer join: memberships without approved benefits have a NULL benefit
+        if benefit_row[0] is not None:
+            benefits[user_id][membership_id][benefit_row[0]] = BenefitView(*benefit_row)
+
+    return {
+        uid: UserBenefitGraph(
+            user_id=uid,
+            memberships=tuple(memberships[uid].values()),
+            benefits_by_membership={
+                mid: tuple(by_id.values()) for mid, by_id in benefits[uid].items()
+            },
+        )
+        for uid in user_ids
+    }
+
+
+def load_user_benefit_graphs(
+    db: Session, user_ids: Iterable[int]
+) -> Dict[int, UserBenefitGraph]:
+    """
+    Load the benefit graphs of several users in one query.
+
+    Args:
+        db: Database session
+        user_ids: Users to load
+
+    Returns:
+        Dict of user_id -> UserBenefitGraph (empty graph for users without memberships)
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return {}
+    rows = db.execute(_graph_statement(user_ids)).all()
+    return _build_graphs(user_ids, rows)
+
+
+def load_user_benefit_graph(db: Session, user_id: int) -> UserBenefitGraph:
+    """Load one user's benefit graph in one query."""
+    return load_user_benefit_graphs(db, [user_id])[user_id]
+
+
+async def load_user_benefit_graph_async(
+    db: AsyncSession, user_id: int
+) -> UserBenefitGraph:
+    """Async variant of load_user_benefit_graph for endpoints using get_async_db."""
+    result = await db.execute(_graph_statement([user_id]))
+    return _build_graphs([user_id], result.all())[user_id]
+
+
+def count_user_benefits(
+    db: Session, user_ids: Iterable[int]
+) -> Dict[int, Tuple[int, int]]:
+    """
+    Count memberships and approved benefits for several users in one query.
+
+    Use this instead of loading full graphs when only the totals are shown.
+
+    Args:
+        db: Database session
+        user_ids: Users to count
+
+    Returns:
+        Dict of user_id -> (memberships_count, benefits_count)
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    counts = {uid: (0, 0) for uid in user_ids}
+    if not user_ids:
+        return counts
+
+    rows = db.execute(
+        select(
+            UserMembership.user_id,
+            func.count(func.distinct(UserMembership.membership_id)),
+            func.count(func.distinct(Benefit.id)),
+        )
+        .outerjoin(
+            Benefit,
+            and_(
+                Benefit.membership_id == UserMembership.membership_id,
+                Benefit.validation_status == "approved",
+            ),
+        )
+        .where(UserMembership.user_id.in_(user_ids))
+        .group_by(UserMembership.user_id)
+    ).all()
+    for user_id, memberships_count, benefits_count in rows:
+        counts[user_id] = (memberships_count, benefits_count)
+    return counts
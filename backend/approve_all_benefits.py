@@ -7,29 +7,33 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+from sqlalchemy import func, select
+
 from app.core.db import SessionLocal
 from app.models import Benefit
+from app.services.catalog_import import approve_pending_benefits
 
 
 def main():
     db = SessionLocal()
 
     try:
-        # Get all benefits
-        all_benefits = db.query(Benefit).all()
-        pending = [b for b in all_benefits if b.validation_status != "approved"]
+        # Count by status in one query instead of loading every row
+        total, pending = db.execute(
+            select(
+                func.count(Benefit.id),
+                func.count(Benefit.id).filter(Benefit.validation_status != "approved"),
+            )
+        ).one()
 
         print(f"📊 Benefits status:")
-        print(f"   Total: {len(all_benefits)}")
-        print(f"   Pending: {len(pending)}")
-        print(f"   Approved: {len(all_benefits) - len(pending)}")
+        print(f"   Total: {total}")
+        print(f"   Pending: {pending}")
+        print(f"   Approved: {total - pending}")
 
         if pending:
-            print(f"\n✨ Approving {len(pending)} pending benefits...")
-            for benefit in pending:
-                benefit.validation_status = "approved"
-
-            db.commit()
+            print(f"\n✨ Approving {pending} pending benefits...")
+            approve_pending_benefits(db)
             print(f"✅ All benefits approved!")
             print("\n🎉 Extension will now show recommendations!")
         else:
@@ -3,6 +3,12 @@ import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import api_router
+from app.core.db import async_engine
+from app.services.catalog import start_catalog_listener, stop_catalog_listener
+from app.services.event_buffer import event_buffer
+from app.services.analytics_partitions import ensure_partitions
+from app.services.pdf_pool import shutdown_pdf_pool
+from app.services.statement_jobs import start_statement_job_sweeper, stop_statement_jobs
 
 app = FastAPI(
     title="VogPlus.app API",
@@ -43,12 +49,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers read the pagination cursor of list endpoints
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API routes
 app.include_router(api_router)
 
 
+@app.on_event("startup")
+def start_background_listeners():
+    """Listen for catalog change notifications and start the analytics flusher."""
+    start_catalog_listener()
+    try:
+        ensure_partitions()
+    except Exception as e:
+        # Events still land in the default partition until the retention job runs
+        print(f"⚠️  Could not create analytics partitions: {e}")
+    event_buffer.start()
+
+
+@app.on_event("startup")
+async def recover_statement_jobs():
+    """Periodically fail statement jobs left unfinished by crashed workers."""
+    start_statement_job_sweeper()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    """Stop background work and close pooled asyncpg connections on shutdown."""
+    stop_catalog_listener()
+    event_buffer.stop()
+    await stop_statement_jobs()
+    shutdown_pdf_pool()
+    await async_engine.dispose()
+
+
 @app.get("/healthz")
 def health_check():
     """Health check endpoint."""
@@ -12,9 +12,9 @@ from sqlalchemy.orm import Session
 from app.core.db import SessionLocal, engine, Base
 from app.core.config import settings
 from app.core.security import hash_password
-from app.models import Membership, Benefit, Vendor, User
+from app.models import User
 from app.models.user import UserRole
-from app.services.membership_tiers import get_plan_tier
+from app.services.catalog_import import import_catalog
 
 
 def create_tables():
@@ -31,81 +31,23 @@ def load_seed_data() -> dict:
         return json.load(f)
 
 
-def upsert_vendor(db: Session, domain: str, name: str) -> Vendor:
-    """Create or update a vendor."""
-    vendor = db.query(Vendor).filter(Vendor.domain == domain).first()
-    if not vendor:
-        vendor = Vendor(domain=domain, name=name)
-        db.add(vendor)
-        db.flush()
-    return vendor
-
-
-def upsert_membership(
-    db: Session,
-    name: str,
-    provider_slug: str,
-    provider_name: str = None,
-    plan_name: str = None,
-) -> Membership:
-    """Create or update a membership."""
-    membership = (
-        db.query(Membership).filter(Membership.provider_slug == provider_slug).first()
-    )
-
-    plan_tier = get_plan_tier(provider_name or "", plan_name or "")
-    
-    if membership:
-        membership.name = name
-        membership.provider_name = provider_name
-        membership.plan_name = plan_name
-        # Update tier if not set or if provider/plan changed
-        if membership.plan_tier is None:
-            membership.plan_tier = plan_tier
-    else:
-        membership = Membership(
-            name=name,
-            provider_slug=provider_slug,
-            provider_name=provider_name,
-            plan_name=plan_name,
-            plan_tier=plan_tier,
-        )
-        db.add(membership)
-        db.flush()
-
-    return membership
+def with_provider_and_plan(memberships):
+    """Fill in provider_name/plan_name from the membership name when missing."""
+    for membership_data in memberships:
+        provider_name = membership_data.get("provider_name")
+        plan_name = membership_data.get("plan_name")
 
+        # If not provided, try to parse from name
+        if not provider_name or not plan_name:
+            parts = membership_data["name"].split()
+            if len(parts) >= 2:
+                provider_name = parts[0]
+                plan_name = " ".join(parts[1:])
+            else:
+                provider_name = membership_data["name"]
+                plan_name = "Standard"
 
-def upsert_benefit(db: Session, membership_id: int, benefit_data: dict):
-    """Create or update a benefit."""
-    benefit = (
-        db.query(Benefit)
-        .filter(
-            Benefit.membership_id == membership_id,
-            Benefit.title == benefit_data["title"],
-        )
-        .first()
-    )
-
-    if benefit:
-        # Update existing
-        benefit.description = benefit_data.get("description")
-        benefit.vendor_domain = benefit_data.get("vendor_domain")
-        benefit.category = benefit_data.get("category")
-        benefit.source_url = benefit_data.get("source_url")
-        benefit.expires_at = benefit_data.get("expires_at")
-    else:
-        # Create new
-        benefit = Benefit(
-            membership_id=membership_id,
-            title=benefit_data["title"],
-            description=benefit_data.get("description"),
-            vendor_domain=benefit_data.get("vendor_domain"),
-            category=benefit_data.get("category"),
-            source_url=benefit_data.get("source_url"),
-            expires_at=benefit_data.get("expires_at"),
-        )
-        db.add(benefit)
+        yield {**membership_data, "provider_name": provider_name, "plan_name": plan_name}
 
 
 def create_initial_users(db: Session):
@@ -172,70 +114,26 @@ def seed_database():
         create_initial_users(db)
         db.commit()
 
-        # Process memberships and benefits
-        membership_count = 0
-        benefit_count = 0
-        vendor_domains = set()
-
-        for membership_data in data["memberships"]:
-            print(f"\nProcessing: {membership_data['name']}")
-
-            # Extract provider and plan from name
-            provider_name = membership_data.get("provider_name")
-            plan_name = membership_data.get("plan_name")
-
-            # If not provided, try to parse from name
-            if not provider_name or not plan_name:
-                parts = membership_data["name"].split()
-                if len(parts) >= 2:
-                    provider_name = parts[0]
-                    plan_name = " ".join(parts[1:])
-                else:
-                    provider_name = membership_data["name"]
-                    plan_name = "Standard"
-
-            # Upsert membership
-            membership = upsert_membership(
-                db,
-                membership_data["name"],
-                membership_data["provider_slug"],
-                provider_name,
-                plan_name,
-            )
-            
-            # Calculate and set plan_tier if not set
-            if membership.plan_tier is None:
-                membership.plan_tier = get_plan_tier(provider_name or "", plan_name or "")
-                db.flush()
-            
-            membership_count += 1
-
-            # Process benefits
-            for benefit_data in membership_data["benefits"]:
-                upsert_benefit(db, membership.id, benefit_data)
-                benefit_count += 1
-
-                # Track vendor domains
-                if benefit_data.get("vendor_domain"):
-                    vendor_domains.add(benefit_data["vendor_domain"])
-
-                    # Create vendor if doesn't exist
-                    upsert_vendor(
-                        db,
-                        benefit_data["vendor_domain"],
-                        benefit_data.get("title", benefit_data["vendor_domain"]),
-                    )
-
-            print(f"  ✓ Added {len(membership_data['benefits'])} benefits")
-
-        # Commit all changes
-        db.commit()
+        # Upsert memberships, benefits and vendors in a few set-based statements
+        print("\nImporting catalog...")
+        summary = import_catalog(
+            db,
+            with_provider_and_plan(data["memberships"]),
+            approve=False,
+            with_vendors=True,
+        )
 
         print("\n" + "=" * 50)
         print("✅ Seed completed successfully!")
-        print(f"   Memberships: {membership_count}")
-        print(f"   Benefits: {benefit_count}")
-        print(f"   Vendors: {len(vendor_domains)}")
+        print(
+            f"   Memberships: {summary.memberships_added} added, "
+            f"{summary.memberships_updated} updated, {summary.memberships_unchanged} unchanged"
+        )
+        print(
+            f"   Benefits: {summary.benefits_added} added, "
+            f"{summary.benefits_updated} updated, {summary.benefits_unchanged} unchanged"
+        )
+        print(f"   Vendors: {summary.vendors_added} added")
         print("=" * 50)
 
     except Exception as e:
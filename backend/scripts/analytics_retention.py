@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Daily analytics_events partition maintenance.
+
+Creates the upcoming monthly partitions and drops (or detaches) partitions
+older than ANALYTICS_RETENTION_MONTHS once their events are in the rollups.
+
+    # Run daily at 3 AM
+    0 3 * * * cd /path/to/vogo/backend && /path/to/python scripts/analytics_retention.py
+
+Or run manually:
+    python scripts/analytics_retention.py --dry-run
+    python scripts/analytics_retention.py --retention-months 6 --detach-only
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.analytics_partitions import apply_retention, ensure_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain analytics_events partitions")
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=None,
+        help="Months of raw events to keep besides the current one (default: from settings)",
+    )
+    parser.add_argument(
+        "--detach-only",
+        action="store_true",
+        help="Detach expired partitions instead of dropping them",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report expired partitions without changing anything",
+    )
+    args = parser.parse_args()
+
+    try:
+        if not args.dry_run:
+            created = ensure_partitions()
+            print(f"✅ Partitions ready: {', '.join(created)}")
+        result = apply_retention(
+            retention_months=args.retention_months,
+            detach_only=args.detach_only,
+            dry_run=args.dry_run,
+        )
+        print(f"✅ {len(result['removed'])} expired partition(s) handled")
+    except Exception as e:
+        print(f"\n❌ Partition maintenance failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily analytics rollups from the raw analytics_events table.
+
+Run once after the rollup migration to cover historical data, or again for any
+range that needs repair. Safe to run while the API is ingesting events.
+
+    python scripts/backfill_analytics_rollups.py              # all history
+    python scripts/backfill_analytics_rollups.py --days 30    # last 30 days
+    python scripts/backfill_analytics_rollups.py --start 2025-10-01 --end 2025-10-31
+"""
+
+import sys
+import argparse
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import func, select
+
+from app.core.db import SessionLocal
+from app.models import AnalyticsEvent
+from app.services.analytics_rollups import backfill_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild daily analytics rollups from analytics_events"
+    )
+    parser.add_argument("--days", type=int, help="Rebuild the last N days (including today)")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    today = datetime.utcnow().date()
+    end_day = args.end or today
+    if args.days:
+        start_day = today - timedelta(days=args.days - 1)
+    elif args.start:
+        start_day = args.start
+    else:
+        db = SessionLocal()
+        try:
+            first_event = db.execute(select(func.min(AnalyticsEvent.created_at))).scalar()
+        finally:
+            db.close()
+        if first_event is None:
+            print("No analytics events to roll up")
+            return
+        start_day = first_event.date()
+
+    print(f"📊 Rebuilding analytics rollups for {start_day} .. {end_day}")
+    try:
+        total = backfill_rollups(start_day, end_day)
+    except Exception as e:
+        print(f"\n❌ Backfill failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    print(f"✅ Rolled up {total} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Bulk import catalog memberships and benefits.
+
+Reads membership records (with nested benefits) from a JSON/JSONL file or the
+built-in UK catalog, diffs them against the database and applies the changes
+with set-based upserts.
+
+    python scripts/import_catalog.py ops/seed_benefits.json
+    python scripts/import_catalog.py catalog.jsonl --dry-run
+    python scripts/import_catalog.py --uk --insert-only
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path so we can import app modules
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.db import SessionLocal
+from app.data.uk_memberships import UK_MEMBERSHIPS
+from app.services.catalog_import import import_catalog, iter_catalog_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import catalog memberships and benefits")
+    parser.add_argument("path", nargs="?", type=Path, help="JSON or JSONL file of memberships")
+    parser.add_argument("--uk", action="store_true", help="Import app/data/uk_memberships.py")
+    parser.add_argument(
+        "--insert-only",
+        action="store_true",
+        help="Skip memberships that already exist instead of updating them",
+    )
+    parser.add_argument(
+        "--no-create",
+        action="store_true",
+        help="Only load benefits for memberships that already exist",
+    )
+    parser.add_argument(
+        "--benefits-only",
+        action="store_true",
+        help="Leave the fields of existing memberships unchanged",
+    )
+    parser.add_argument("--vendors", action="store_true", help="Also create vendors rows")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Memberships per round")
+    args = parser.parse_args()
+
+    if bool(args.path) == args.uk:
+        parser.error("Pass either a file path or --uk")
+
+    records = UK_MEMBERSHIPS if args.uk else iter_catalog_records(args.path)
+
+    db = SessionLocal()
+    try:
+        summary = import_catalog(
+            db,
+            records,
+            update_existing=not args.insert_only,
+            create_memberships=not args.no_create,
+            update_memberships=not args.benefits_only,
+            with_vendors=args.vendors,
+            dry_run=args.dry_run,
+            chunk_size=args.chunk_size,
+        )
+    except Exception as e:
+        print(f"\n❌ Import failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"{'🔍 Would apply' if args.dry_run else '✅ Applied'}:")
+    for name, count in summary.to_dict().items():
+        print(f"   {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
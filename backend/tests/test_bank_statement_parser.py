@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+from app.services import bank_statement_parser
+
+
+class FakeNameIndex:
+    def __init__(self, names):
+        self.names = names
+
+    def match_many(self, names, threshold=80):
+        return [SimpleNamespace(name=self.names[n]) if n in self.names else None for n in names]
+
+
+def monthly(description, amount, day="03"):
+    return [
+        {"date": f"{day}/{month:02d}/2025", "description": description, "amount": amount}
+        for month in (1, 2, 3, 4)
+    ]
+
+
+def test_only_confident_catalog_matches_skip_the_llm(monkeypatch):
+    sent = []
+    monkeypatch.setattr(bank_statement_parser, "lookup_descriptors", lambda keys: {})
+    monkeypatch.setattr(
+        bank_statement_parser, "get_membership_name_index",
+        lambda: FakeNameIndex({"netflix": "Netflix"}),
+    )
+    monkeypatch.setattr(
+        bank_statement_parser,
+        "identify_subscriptions_with_llm",
+        lambda transactions: sent.extend(transactions) or [],
+    )
+    netflix = monthly("DD NETFLIX.COM", 10.99)
+    gym = monthly("LOCAL GYM CLUB", 30.00, day="10")
+    tesco = [
+        {"date": "02/01/2025", "description": "TESCO STORES 2041", "amount": 20.00},
+        {"date": "01/02/2025", "description": "TESCO STORES 2041", "amount": 21.00},
+    ]
+
+    subscriptions = bank_statement_parser.identify_subscriptions(netflix + gym + tesco)
+
+    assert [s["membership_name"] for s in subscriptions] == ["Netflix"]
+    # Recurring but not in the catalog, and not recurring enough: both to the LLM
+    assert sent == gym + tesco
+
+
+def completion(content, finish_reason="stop"):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+def test_truncated_chunk_falls_back_to_the_tokenizer(monkeypatch):
+    requested = []
+
+    def chat_completion(call_site, client, **kwargs):
+        requested.append(kwargs["max_tokens"])
+        return completion('[{"date": "03/01/2025", "description": "NETF', "length")
+
+    monkeypatch.setattr(bank_statement_parser, "openai_client", object())
+    monkeypatch.setattr(bank_statement_parser.llm_metrics, "chat_completion", chat_completion)
+    monkeypatch.setattr(bank_statement_parser.llm_metrics, "record_fallback", lambda *args: None)
+    text = "\n".join(f"{day:02d}/01/2025 NETFLIX.COM 10.99" for day in range(1, 29))
+
+    transactions = bank_statement_parser.extract_transactions_with_llm(text)
+
+    assert len(transactions) == 28
+    # Room to echo every line of the chunk back as JSON
+    assert requested[0] > 2 * bank_statement_parser.estimate_tokens(text)
@@ -0,0 +1,30 @@
+from app.services import catalog
+
+
+class FakeSession:
+    def close(self):
+        pass
+
+
+def test_version_change_is_rebuilt_again_on_the_next_poll(monkeypatch):
+    versions = iter([1, 2, 2, 2])
+    builds = []
+
+    def build(db, version):
+        builds.append(version)
+        return catalog.CatalogSnapshot(version=version, memberships=(), benefits=())
+
+    monkeypatch.setattr(catalog, "SessionLocal", FakeSession)
+    monkeypatch.setattr(catalog, "_read_version", lambda db: next(versions))
+    monkeypatch.setattr(catalog, "_build_snapshot", build)
+    monkeypatch.setattr(catalog.settings, "catalog_poll_interval_s", 0)
+    monkeypatch.setattr(catalog, "_snapshot", None)
+    monkeypatch.setattr(catalog, "_recheck", False)
+    catalog._stale.clear()
+
+    for _ in range(4):
+        catalog.get_catalog()
+
+    # v2 may have been read before its write committed, so it is built twice;
+    # after that an unchanged version is served from memory
+    assert builds == [1, 2, 2]
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.catalog_import import ImportSummary, _apply_memberships, _merge_by_slug
+
+
+class FakeSession:
+    """Answers the existing-memberships SELECT and records the upsert."""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.upserts = []
+
+    def execute(self, stmt):
+        if getattr(stmt, "is_insert", False):
+            self.upserts.append(stmt)
+            return [(99, "netflix")]
+        return self.existing
+
+
+def membership(**fields):
+    row = dict(id=1, provider_slug="amazon-prime", name="Amazon Prime",
+               provider_name="Amazon", plan_name="Prime")
+    row.update(fields)
+    return SimpleNamespace(**row)
+
+
+def test_records_sharing_a_slug_keep_all_benefits():
+    merged = _merge_by_slug([
+        {"provider_slug": "amazon-prime", "name": "Amazon Prime", "plan_name": "Prime",
+         "benefits": [{"title": "Prime Video"}]},
+        {"provider_slug": "amazon-prime", "name": "Amazon Prime", "plan_name": None,
+         "benefits": [{"title": "Free delivery"}]},
+    ])
+
+    assert list(merged) == ["amazon-prime"]
+    assert merged["amazon-prime"]["plan_name"] == "Prime"
+    assert [b["title"] for b in merged["amazon-prime"]["benefits"]] == ["Prime Video", "Free delivery"]
+
+
+def test_missing_fields_do_not_count_as_changes():
+    db = FakeSession([membership()])
+    summary = ImportSummary()
+    records = {"amazon-prime": {"provider_slug": "amazon-prime", "name": "Amazon Prime"}}
+
+    ids = _apply_memberships(db, records, True, True, True, False, summary)
+
+    assert ids == {"amazon-prime": 1}
+    assert summary.memberships_unchanged == 1
+    assert db.upserts == []
+
+
+def test_benefits_only_leaves_existing_memberships_alone():
+    db = FakeSession([membership()])
+    summary = ImportSummary()
+    records = {"amazon-prime": {"provider_slug": "amazon-prime", "name": "Prime"}}
+
+    ids = _apply_memberships(db, records, True, False, False, False, summary)
+
+    assert ids == {"amazon-prime": 1}
+    assert summary.memberships_updated == 0
+    assert db.upserts == []
+
+
+def test_upsert_keeps_current_values_for_missing_fields():
+    db = FakeSession([])
+    summary = ImportSummary()
+    records = {"netflix": {"provider_slug": "netflix", "name": "Netflix"}}
+
+    ids = _apply_memberships(db, records, True, True, True, False, summary)
+
+    assert ids == {"netflix": 99}
+    sql = str(db.upserts[0].compile(dialect=postgresql.dialect()))
+    assert "provider_name = coalesce(excluded.provider_name, memberships.provider_name)" in sql
+    assert "plan_name = coalesce(excluded.plan_name, memberships.plan_name)" in sql
@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from app.services.chat_service import chat_fingerprint
+
+
+def benefits(*pairs):
+    return [(SimpleNamespace(id=b), SimpleNamespace(id=m)) for b, m in pairs]
+
+
+HISTORY = [
+    {"role": "user", "content": "Do I have travel insurance?"},
+    {"role": "assistant", "content": "Yes, with Revolut Premium."},
+]
+
+
+def test_fingerprint_ignores_benefit_order():
+    assert chat_fingerprint(1, benefits((1, 10), (2, 20)), False, []) == chat_fingerprint(
+        1, benefits((2, 20), (1, 10)), False, []
+    )
+
+
+def test_fingerprint_is_per_user():
+    same_benefits = benefits((1, 10))
+    assert chat_fingerprint(1, same_benefits, False, []) != chat_fingerprint(2, same_benefits, False, [])
+
+
+def test_fingerprint_depends_on_recent_history():
+    base = chat_fingerprint(1, benefits((1, 10)), False, [])
+    follow_up = chat_fingerprint(1, benefits((1, 10)), False, HISTORY)
+    assert base != follow_up
+
+
+def test_fingerprint_ignores_history_not_sent_to_the_llm():
+    old = [{"role": "user", "content": f"question {i}"} for i in range(4)]
+    recent = HISTORY * 3
+    assert chat_fingerprint(1, [], False, old + recent) == chat_fingerprint(1, [], False, recent)
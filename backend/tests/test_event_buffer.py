@@ -0,0 +1,91 @@
+from sqlalchemy.exc import DataError, OperationalError, ProgrammingError
+
+from app.services.event_buffer import EventBuffer
+
+
+def make_buffer(**overrides):
+    options = dict(flush_size=100, flush_interval_s=0.01, max_pending=1000, enqueue_timeout_s=0.01)
+    options.update(overrides)
+    return EventBuffer(**options)
+
+
+def rows(n):
+    return [{"event_name": "view", "payload": {"i": i}} for i in range(n)]
+
+
+def test_rejected_rows_are_isolated_and_dropped(monkeypatch):
+    buffer = make_buffer()
+    written = []
+
+    def write(batch):
+        if any(row["payload"]["i"] in (3, 11) for row in batch):
+            raise DataError("INSERT", {}, Exception("unsupported Unicode escape sequence"))
+        written.extend(batch)
+
+    monkeypatch.setattr(buffer, "_write", write)
+    buffer.enqueue(rows(16))
+
+    assert buffer.flush() == 14
+    assert [row["payload"]["i"] for row in written] == [i for i in range(16) if i not in (3, 11)]
+    assert buffer.invalid == 2
+    assert buffer.pending() == 0
+
+    # The next flush is unaffected
+    buffer.enqueue(rows(2))
+    assert buffer.flush() == 2
+
+
+def test_transient_errors_requeue_until_retries_run_out(monkeypatch):
+    buffer = make_buffer(max_retries=2)
+
+    def write(batch):
+        raise OperationalError("INSERT", {}, Exception("connection refused"))
+
+    monkeypatch.setattr(buffer, "_write", write)
+    buffer.enqueue(rows(5))
+
+    assert buffer.flush() == 0
+    assert buffer.pending() == 5
+    assert buffer.flush() == 0
+    assert buffer.pending() == 5
+    assert buffer.flush() == 0
+    assert buffer.pending() == 0
+    assert buffer.dropped == 5
+    assert buffer.invalid == 0
+
+
+def test_transient_error_mid_bisect_requeues_unwritten_rows_in_order(monkeypatch):
+    buffer = make_buffer()
+    calls = []
+
+    def write(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise DataError("INSERT", {}, Exception("bad row"))
+        if len(calls) == 3:
+            raise OperationalError("INSERT", {}, Exception("server closed the connection"))
+
+    monkeypatch.setattr(buffer, "_write", write)
+    buffer.enqueue(rows(8))
+
+    # Whole batch rejected, first half written, then the connection drops
+    assert buffer.flush() == 4
+    assert [row["payload"]["i"] for row in buffer._rows] == [4, 5, 6, 7]
+
+
+def test_schema_errors_are_requeued_not_dropped(monkeypatch):
+    buffer = make_buffer(max_retries=3)
+    calls = []
+
+    def write(batch):
+        calls.append(len(batch))
+        raise ProgrammingError("INSERT", {}, Exception('relation "analytics_events" does not exist'))
+
+    monkeypatch.setattr(buffer, "_write", write)
+    buffer.enqueue(rows(8))
+
+    # Not bisected: the rows are fine, so they stay queued for the next flush
+    assert buffer.flush() == 0
+    assert calls == [8]
+    assert buffer.invalid == 0
+    assert [row["payload"]["i"] for row in buffer._rows] == list(range(8))
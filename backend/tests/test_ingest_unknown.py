@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from app.services import gpt_websearch, ingest_unknown
+
+
+class FakeQuery:
+    def __init__(self, session, model):
+        self.session = session
+        self.model = model
+
+    def filter(self, *criteria):
+        return self
+
+    def first(self):
+        # Nothing with this slug yet when discovery starts
+        return None
+
+    def one(self):
+        return self.session.winner
+
+    def all(self):
+        return []
+
+
+class FakeSession:
+    """A session whose membership INSERT loses to a concurrent discovery."""
+
+    def __init__(self, winner):
+        self.winner = winner
+        self.added = []
+        self.committed = False
+
+    def query(self, model):
+        return FakeQuery(self, model)
+
+    def execute(self, stmt):
+        return SimpleNamespace(scalar=lambda: None)  # ON CONFLICT DO NOTHING
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        self.committed = True
+
+
+def test_concurrent_discovery_reuses_the_winning_membership(monkeypatch):
+    monkeypatch.setattr(
+        gpt_websearch,
+        "search_and_extract_benefits_with_gpt",
+        lambda name: ([{"title": "Ad-free streaming"}], []),
+    )
+    winner = SimpleNamespace(
+        id=7, name="Netflix", provider_slug="netflix", status="active", is_catalog=True
+    )
+    db = FakeSession(winner)
+
+    result = ingest_unknown.ingest_unknown_membership(db, 1, "Netflix")
+
+    assert result["membership"]["id"] == 7
+    assert db.added == []
+    assert not db.committed
@@ -0,0 +1,60 @@
+import pytest
+
+from app.services import bank_statement_parser
+from app.services.merchant_descriptors import is_learnable, normalize_descriptor
+
+
+@pytest.mark.parametrize(
+    "description, key",
+    [
+        ("DD NETFLIX.COM 866-579-7172", "netflix"),
+        ("AMAZON PRIME*2K4HT1234 GB", "amazon prime"),
+        ("CARD PAYMENT TO SPOTIFY P1A2B3 ON 03-01", "spotify"),
+        ("PAYPAL *NETFLIX", "paypal netflix"),
+        ("PAYPAL *SPOTIFY", "paypal spotify"),
+        ("PAYPAL *DISNEYPLUS 35314369001", "paypal disneyplus"),
+        ("GOOGLE *YouTube Premium", "google youtube premium"),
+        ("GOOGLE *Google Storage", "google storage"),
+        ("SQ *COFFEE HOUSE*REF99", "sq coffee house"),
+        ("UBER *TRIP", "uber trip"),
+        ("CARD PAYMENT TO PAYPAL *NETFLIX.COM ON 03-01", "paypal netflix"),
+    ],
+)
+def test_normalize_descriptor(description, key):
+    assert normalize_descriptor(description) == key
+
+
+def test_processor_merchants_stay_distinct():
+    descriptors = [
+        "PAYPAL *NETFLIX", "PAYPAL *SPOTIFY", "PAYPAL *DISNEYPLUS",
+        "GOOGLE *YouTube Premium", "GOOGLE *Google Storage",
+    ]
+    assert len({normalize_descriptor(d) for d in descriptors}) == len(descriptors)
+
+
+def test_bare_processor_is_not_learnable():
+    assert normalize_descriptor("PAYPAL *1234ABCD") == "paypal"
+    assert not is_learnable("paypal")
+    assert not is_learnable("")
+    assert is_learnable("paypal netflix")
+
+
+def test_identify_subscriptions_sends_every_unknown_transaction(monkeypatch):
+    sent = []
+    monkeypatch.setattr(bank_statement_parser, "lookup_descriptors", lambda keys: {})
+    monkeypatch.setattr(bank_statement_parser, "detect_recurring", lambda transactions: [])
+    monkeypatch.setattr(
+        bank_statement_parser,
+        "identify_subscriptions_with_llm",
+        lambda transactions: sent.extend(transactions) or [],
+    )
+    transactions = [
+        {"date": "01/01/2025", "description": "PAYPAL *NETFLIX", "amount": 10.99},
+        {"date": "02/01/2025", "description": "PAYPAL *SPOTIFY", "amount": 11.99},
+        {"date": "03/01/2025", "description": "PAYPAL *1234ABCD", "amount": 4.99},
+        {"date": "04/01/2025", "description": "PAYPAL *5678EFGH", "amount": 7.99},
+    ]
+
+    bank_statement_parser.identify_subscriptions(transactions)
+
+    assert sent == transactions
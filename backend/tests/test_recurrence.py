@@ -0,0 +1,81 @@
+from datetime import date
+
+import pytest
+
+from app.services.recurrence import detect_recurring, parse_statement_date
+
+
+def charges(description, dates, amounts):
+    if not isinstance(amounts, list):
+        amounts = [amounts] * len(dates)
+    return [
+        {"date": d, "description": description, "amount": amount}
+        for d, amount in zip(dates, amounts)
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("03/01/2025", date(2025, 1, 3)),
+        ("03-01-25", date(2025, 1, 3)),
+        ("2025-01-03", date(2025, 1, 3)),
+        ("3 Jan 2025", date(2025, 1, 3)),
+        ("3 January", date(2024, 1, 3)),
+        ("03 Sept 2025", date(2025, 9, 3)),
+    ],
+)
+def test_parse_statement_date(value, expected):
+    assert parse_statement_date(value, 2024) == expected
+
+
+@pytest.mark.parametrize("value", ["", "31/02/2025", "13 Foo 2025", "not a date", "2025"])
+def test_parse_statement_date_rejects_invalid(value):
+    assert parse_statement_date(value, 2025) is None
+
+
+def test_monthly_subscription():
+    found = detect_recurring(
+        charges("DD NETFLIX.COM", ["03/01/2025", "03/02/2025", "03/03/2025", "03/04/2025"], 10.99)
+    )
+
+    assert len(found) == 1
+    assert found[0].descriptor == "netflix"
+    assert found[0].frequency == "monthly"
+    assert found[0].payments == 4
+    assert found[0].confidence >= 0.9
+    assert isinstance(found[0].confidence, float)
+
+
+def test_two_monthly_payments_are_not_enough():
+    assert detect_recurring(charges("TESCO STORES 2041", ["02/01/2025", "01/02/2025"], [20.0, 21.0])) == []
+
+
+def test_weekly_needs_four_payments():
+    dates = ["06/01/2025", "13/01/2025", "20/01/2025"]
+    assert detect_recurring(charges("COSTA COFFEE", dates, 3.10)) == []
+
+    found = detect_recurring(charges("COSTA COFFEE", dates + ["27/01/2025"], 3.10))
+    assert [p.frequency for p in found] == ["weekly"]
+
+
+def test_unstable_amounts_are_rejected():
+    dates = ["03/01/2025", "03/02/2025", "03/03/2025"]
+    assert detect_recurring(charges("SAINSBURYS S/MKT", dates, [12.50, 48.20, 31.75])) == []
+
+
+def test_processor_merchants_are_grouped_separately():
+    dates = ["03/01/2025", "03/02/2025", "03/03/2025"]
+    transactions = charges("PAYPAL *NETFLIX", dates, 10.99) + charges(
+        "PAYPAL *SPOTIFY", ["17/01/2025", "17/02/2025", "17/03/2025"], 11.99
+    )
+
+    found = detect_recurring(transactions)
+
+    assert sorted(p.descriptor for p in found) == ["paypal netflix", "paypal spotify"]
+    assert all(p.frequency == "monthly" for p in found)
+
+
+def test_bare_processor_is_ignored():
+    dates = ["03/01/2025", "03/02/2025", "03/03/2025"]
+    assert detect_recurring(charges("PAYPAL *1234ABCD", dates, 9.99)) == []
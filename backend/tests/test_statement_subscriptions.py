@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import statement_subscriptions
+
+
+def test_same_slug_subscriptions_create_one_membership(monkeypatch):
+    created = []
+    linked = []
+
+    async def match_subscriptions(names, threshold=80):
+        return [None] * len(names)
+
+    async def get_catalog_async():
+        return SimpleNamespace(memberships_by_id={})
+
+    async def process_subscription(db, db_lock, user_id, subscription, existing_membership):
+        created.append(subscription['membership_name'])
+        await asyncio.sleep(0.01)
+        return {
+            'membership_id': len(created),
+            'membership_name': subscription['membership_name'],
+            'action': 'created_new',
+            'amount': subscription['amount'],
+        }
+
+    async def link_membership(db, db_lock, user_id, membership_id, notes):
+        linked.append(membership_id)
+        return False
+
+    async def learn_confirmed_descriptors(subscriptions, outcomes):
+        pass
+
+    for name, fn in {
+        "match_subscriptions": match_subscriptions,
+        "get_catalog_async": get_catalog_async,
+        "process_subscription": process_subscription,
+        "link_membership": link_membership,
+        "learn_confirmed_descriptors": learn_confirmed_descriptors,
+    }.items():
+        monkeypatch.setattr(statement_subscriptions, name, fn)
+
+    subscriptions = [
+        {'membership_name': 'Local Gym', 'amount': 30.0},
+        {'membership_name': 'LOCAL GYM', 'amount': 30.0},
+        {'membership_name': 'Book Club', 'amount': 9.0},
+    ]
+    processed, errors = asyncio.run(
+        statement_subscriptions.process_subscriptions(None, 1, subscriptions)
+    )
+
+    assert errors == []
+    assert sorted(created) == ['Book Club', 'Local Gym']
+    assert processed[1]['membership_id'] == processed[0]['membership_id']
+    assert processed[1]['action'] == 'already_exists'
+    assert linked == [processed[0]['membership_id']]
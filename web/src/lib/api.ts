@@ -156,6 +156,40 @@ export interface ValidateMembershipResponse {
   };
 }
 
+export interface BankStatementResult {
+  summary: {
+    total_transactions: number;
+    subscriptions_found: number;
+    monthly_subscription_cost: number;
+    annual_subscription_cost: number;
+  };
+  subscriptions_found: number;
+  subscriptions_processed: number;
+  processed: Array<{
+    membership_id: number;
+    membership_name: string;
+    action: string;
+    amount: number;
+  }>;
+  errors: Array<{ subscription: string; error: string }>;
+  message: string;
+}
+
+export interface StatementJob {
+  job_id: string;
+  status: "queued" | "running" | "completed" | "failed";
+  stage: "queued" | "extracting_text" | "analyzing" | "processing" | "done";
+  filename: string | null;
+  subscriptions_total: number | null;
+  subscriptions_done: number;
+  results: Array<Record<string, unknown> & { index: number }>;
+  result: BankStatementResult | null;
+  error: string | null;
+  created_at: string | null;
+  updated_at: string | null;
+  finished_at: string | null;
+}
+
 class ApiClient {
   private baseUrl: string;
 
@@ -452,26 +486,45 @@ class ApiClient {
     return response.json();
   }
 
-  // Bank statement upload
-  async uploadBankStatement(file: File): Promise<{
-    summary: {
-      total_transactions: number;
-      subscriptions_found: number;
-      monthly_subscription_cost: number;
-      annual_subscription_cost: number;
-    };
-    subscriptions_found: number;
-    subscriptions_processed: number;
-    processed: Array<{
-      membership_id: number;
-      membership_name: string;
-      action: string;
-      amount: number;
-    }>;
-    errors: Array<{ subscription: string; error: string }>;
-    message: string;
-  }> {
-    return this.uploadFile("/api/bank-statement/upload", file);
+  // Bank statement upload: the statement is processed as a background job,
+  // polled until it finishes (reloading the page never re-uploads it)
+  async uploadBankStatement(file: File): Promise<BankStatementResult> {
+    const job = await this.uploadFile<{
+      job_id: string;
+      result?: BankStatementResult | null;
+    }>("/api/bank-statement/upload", file);
+    // Re-uploads of an already processed statement return the stored result
+    if (job.result) {
+      return job.result;
+    }
+    return this.waitForStatementJob(job.job_id);
+  }
+
+  async getStatementJob(jobId: string): Promise<StatementJob> {
+    return this.request<StatementJob>(`/api/bank-statement/jobs/${jobId}`);
+  }
+
+  async waitForStatementJob(
+    jobId: string,
+    onProgress?: (job: StatementJob) => void,
+    intervalMs = 1500,
+    timeoutMs = 10 * 60 * 1000
+  ): Promise<BankStatementResult> {
+    const deadline = Date.now() + timeoutMs;
+    for (;;) {
+      if (Date.now() > deadline) {
+        throw new Error("Processing the bank statement is taking too long, please try again later");
+      }
+      const job = await this.getStatementJob(jobId);
+      onProgress?.(job);
+      if (job.status === "completed" && job.result) {
+        return job.result;
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error || "Failed to process bank statement");
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
   }
 }
 